@@ -0,0 +1,59 @@
+"""Benchmark distance-matrix construction
+
+Usage: python benchmarks/bench_distance_matrix.py [n ...]
+
+Times build_distance_matrix at 1k, 5k and 20k cities (or the sizes given
+on the command line) in float64 and float32, and the old per-pair Python
+loop for the smallest size as a baseline.
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from distances import build_distance_matrix  # noqa: E402
+
+
+def naive_distance_matrix(cities):
+    """The double loop previously used in generate_cities"""
+    n = len(cities)
+    distances = np.zeros((n, n))
+    for i in range(n):
+        for j in range(n):
+            if i != j:
+                distances[i][j] = np.sqrt((cities[i][0] - cities[j][0])**2 +
+                                          (cities[i][1] - cities[j][1])**2)
+    return distances
+
+
+def time_call(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 5000, 20000]
+    rng = np.random.default_rng(0)
+
+    print(f"{'cities':>8} {'variant':>22} {'seconds':>10} {'MB':>8}")
+    for n in sizes:
+        cities = rng.random((n, 2)) * 100
+
+        if n == min(sizes) and n <= 2000:
+            elapsed, _ = time_call(naive_distance_matrix, [tuple(c) for c in cities])
+            print(f"{n:>8} {'python loop':>22} {elapsed:>10.3f} {n * n * 8 / 1e6:>8.0f}")
+
+        for dtype in (np.float64, np.float32):
+            for symmetric in (False, True):
+                label = f"{np.dtype(dtype).name} {'upper' if symmetric else 'full'}"
+                elapsed, matrix = time_call(build_distance_matrix, cities,
+                                            dtype=dtype, symmetric=symmetric)
+                print(f"{n:>8} {label:>22} {elapsed:>10.3f} {matrix.nbytes / 1e6:>8.0f}")
+                del matrix
+
+
+if __name__ == "__main__":
+    main()
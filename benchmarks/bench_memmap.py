@@ -0,0 +1,52 @@
+"""Benchmark in-memory versus memory-mapped distance matrices
+
+Usage: python benchmarks/bench_memmap.py [cities ...]
+
+For each size, times building the dense float64 matrix in memory, the
+first open_distance_matrix call (which builds and writes the float32
+file) and a second call on the same cities (which only maps the file),
+then the time to read 1000 random rows from the mapped matrix.
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from distances import build_distance_matrix, open_distance_matrix  # noqa: E402
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 5000, 10000]
+    print(f"{'cities':>8} {'in memory':>10} {'first open':>11} {'reopen ms':>10} {'1000 rows':>10} {'file MB':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for n in sizes:
+            points = np.random.default_rng(n).random((n, 2)) * 100
+
+            start = time.perf_counter()
+            matrix = build_distance_matrix(points)
+            in_memory = time.perf_counter() - start
+            del matrix
+
+            start = time.perf_counter()
+            open_distance_matrix(points, directory)
+            first = time.perf_counter() - start
+
+            start = time.perf_counter()
+            distances = open_distance_matrix(points, directory)
+            reopen = time.perf_counter() - start
+
+            rows = np.random.default_rng(0).integers(0, n, 1000)
+            start = time.perf_counter()
+            total = sum(float(distances[row].sum()) for row in rows)
+            read = time.perf_counter() - start
+
+            size = os.path.getsize(distances.filename) / 1e6
+            print(f"{n:>8} {in_memory:>10.3f} {first:>11.3f} {reopen * 1000:>10.2f} {read:>10.3f} {size:>8.0f}")
+            assert total > 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Benchmark wall-clock time to a target cost for the parallel solvers
+
+Usage: python benchmarks/bench_parallel.py [cities] [workers ...]
+
+For the island GA and the multi-colony ACO, the target is the worst final
+cost of three single-process runs. Island and colony counts default to
+1, 2, 4 and 8; each is timed until its global best first reaches the
+target (checked at every exchange). Simulated Annealing is compared as
+a single run, multi-start and parallel tempering with the same number of
+moves per replica.
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import parallel  # noqa: E402
+import solvers  # noqa: E402
+from distances import build_distance_matrix, nearest_neighbors  # noqa: E402
+
+
+def time_to_target(run, target):
+    """Seconds until run's progress callback first reports a cost at or below target"""
+    start = time.perf_counter()
+    reached = []
+
+    def progress(iteration, best_cost):
+        if best_cost <= target and not reached:
+            reached.append(time.perf_counter() - start)
+
+    result = run(progress)
+    if result.cost <= target and not reached:
+        reached.append(result.elapsed)
+    return reached[0] if reached else float('inf'), result
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    counts = [int(arg) for arg in sys.argv[2:]] or [1, 2, 4, 8]
+    points = np.random.default_rng(0).random((n, 2)) * 100
+    distances = build_distance_matrix(points)
+    candidates = nearest_neighbors(points, 10)
+    print(f"{os.cpu_count()} CPUs")
+
+    params = solvers.GAParams(generations=400)
+
+    target = max(solvers.genetic_algorithm(distances, params, seed=seed).cost for seed in range(3))
+    print(f"GA, {n} cities, target cost {target:.1f}")
+    print(f"{'islands':>8} {'seconds':>10} {'final cost':>12}")
+    for islands in counts:
+        island_params = parallel.IslandParams(islands=islands, migration_interval=10)
+        elapsed, result = time_to_target(
+            lambda progress: parallel.island_genetic_algorithm(
+                distances, params, island_params, seed=0, progress=progress), target)
+        print(f"{islands:>8} {elapsed:>10.2f} {result.cost:>12.1f}")
+
+    aco_params = solvers.ACOTSPParams(n_iterations=200)
+    target = max(solvers.aco_tsp(distances, aco_params, seed=seed, candidates=candidates).cost
+                 for seed in range(3))
+    print(f"ACO, {n} cities, target cost {target:.1f}")
+    print(f"{'colonies':>8} {'seconds':>10} {'final cost':>12}")
+    for colonies in counts:
+        colony_params = parallel.ColonyParams(colonies=colonies, exchange_interval=10)
+        elapsed, result = time_to_target(
+            lambda progress: parallel.multi_colony_aco_tsp(
+                distances, aco_params, colony_params, seed=0, progress=progress, candidates=candidates),
+            target)
+        print(f"{colonies:>8} {elapsed:>10.2f} {result.cost:>12.1f}")
+
+    sa_params = solvers.SAParams(neighbor_method="2-opt", iterations=100000)
+    print(f"SA, {n} cities")
+    print(f"{'mode':>12} {'replicas':>8} {'seconds':>10} {'cost':>12}")
+    result = solvers.simulated_annealing(distances, sa_params, seed=0, candidates=candidates)
+    print(f"{'single':>12} {1:>8} {result.elapsed:>10.2f} {result.cost:>12.1f}")
+    for replicas in counts[1:]:
+        result = parallel.multi_start_annealing(distances, sa_params, starts=replicas, seed=0,
+                                                candidates=candidates)
+        print(f"{'multi-start':>12} {replicas:>8} {result.elapsed:>10.2f} {result.cost:>12.1f}")
+        result = parallel.parallel_tempering(distances, sa_params, parallel.TemperingParams(replicas=replicas),
+                                             seed=0, candidates=candidates)
+        print(f"{'tempering':>12} {replicas:>8} {result.elapsed:>10.2f} {result.cost:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""Distance-matrix construction shared by the GUI and the headless solvers.
+
+Planar (Euclidean) matrices cover the 0-100 plot coordinates, great-circle
+(haversine) ones the cities' latitude and longitude in km. Large matrices
+can live in .npy files that are memory-mapped (open_distance_matrix), so
+rows are read lazily and processes share the same pages.
+"""
+import hashlib
+import os
+
+import numpy as np
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # SciPy is optional, fall back to blockwise brute force
+    cKDTree = None
+
+
+# Upper bound on the number of pairwise entries computed in one block,
+# keeps the temporary arrays around 32 MB regardless of instance size
+BLOCK_ELEMENTS = 4_000_000
+
+# Mean Earth radius used for great-circle distances
+EARTH_RADIUS_KM = 6371.0
+
+# Coordinates are rounded to this many decimals when hashing a coordinate set
+HASH_DECIMALS = 6
+
+
+def build_distance_matrix(points, dtype=np.float64, symmetric=True, out=None):
+    """Euclidean distance matrix for an (n, 2) array of points
+
+    Rows are processed in blocks with NumPy broadcasting. For symmetric
+    instances only the upper triangle of each block is computed and then
+    mirrored into the lower triangle. The matrix is written into out if
+    given, e.g. a memory map.
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    n = len(points)
+    distances = np.empty((n, n), dtype=dtype) if out is None else out
+    if n == 0:
+        return distances
+
+    x = points[:, 0]
+    y = points[:, 1]
+    block_size = max(1, BLOCK_ELEMENTS // n)
+
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        # Columns left of the block are already filled in by earlier mirrors
+        first_col = start if symmetric else 0
+        block = x[start:stop, None] - x[None, first_col:]
+        block *= block
+        dy = y[start:stop, None] - y[None, first_col:]
+        dy *= dy
+        block += dy
+        np.sqrt(block, out=block)
+        distances[start:stop, first_col:] = block
+        if symmetric:
+            distances[start:, start:stop] = block.T
+
+    np.fill_diagonal(distances, 0)
+    return distances
+
+
+def haversine(lat_lon_a, lat_lon_b):
+    """Great-circle distance in km between (lat, lon) points in degrees
+
+    Both arguments are arrays of shape (..., 2) and broadcast against
+    each other, e.g. a[:, None] and b[None, :] give every pair.
+    """
+    a = np.radians(np.asarray(lat_lon_a, dtype=np.float64))
+    b = np.radians(np.asarray(lat_lon_b, dtype=np.float64))
+    h = (np.sin((b[..., 0] - a[..., 0]) / 2) ** 2
+         + np.cos(a[..., 0]) * np.cos(b[..., 0]) * np.sin((b[..., 1] - a[..., 1]) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(h, 1.0)))
+
+
+def build_haversine_matrix(lat_lon, dtype=np.float64, symmetric=True, out=None):
+    """Great-circle distance matrix in km for an (n, 2) array of (lat, lon) points
+
+    Like build_distance_matrix, rows are processed in blocks in the
+    requested dtype and, if symmetric, only the upper triangle is computed
+    and then mirrored.
+    """
+    radians = np.radians(np.asarray(lat_lon, dtype=np.float64).reshape(-1, 2)).astype(dtype)
+    n = len(radians)
+    distances = np.empty((n, n), dtype=dtype) if out is None else out
+    if n == 0:
+        return distances
+
+    lat = radians[:, 0]
+    lon = radians[:, 1]
+    cos_lat = np.cos(lat)
+    block_size = max(1, BLOCK_ELEMENTS // n)
+
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        first_col = start if symmetric else 0
+        block = np.sin((lat[start:stop, None] - lat[None, first_col:]) / 2)
+        block *= block
+        dlon = np.sin((lon[start:stop, None] - lon[None, first_col:]) / 2)
+        dlon *= dlon
+        # Multiply the cosines first so that both triangles round alike
+        dlon *= cos_lat[start:stop, None] * cos_lat[None, first_col:]
+        block += dlon
+        np.minimum(block, 1, out=block)
+        np.sqrt(block, out=block)
+        np.arcsin(block, out=block)
+        block *= 2 * EARTH_RADIUS_KM
+        distances[start:stop, first_col:] = block
+        if symmetric:
+            distances[start:, start:stop] = block.T
+
+    np.fill_diagonal(distances, 0)
+    return distances
+
+
+# Matrix builders by metric, for open_distance_matrix
+MATRIX_BUILDERS = {
+    "euclidean": build_distance_matrix,
+    "haversine": build_haversine_matrix,
+}
+
+
+def coordinate_hash(points, decimals=HASH_DECIMALS):
+    """Hex digest identifying an ordered set of 2-D coordinates"""
+    points = np.round(np.asarray(points, dtype=np.float64).reshape(-1, 2), decimals)
+    return hashlib.sha1(points.tobytes()).hexdigest()
+
+
+def open_distance_matrix(points, directory, metric="euclidean", dtype=np.float32, keep=None):
+    """Distance matrix of points memory-mapped read-only from an .npy file
+
+    Files are named by metric, dtype, size and coordinate_hash, so a
+    coordinate set seen before is opened without recomputing anything. A
+    new one is built into a temporary memory map, row block by row block,
+    and then renamed into place so concurrent callers never see a partial
+    file. With keep set, only that many of the most recently used matrix
+    files stay in directory (see prune_matrix_files).
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    n = len(points)
+    build = MATRIX_BUILDERS[metric]
+    if n == 0:
+        return build(points, dtype=dtype)
+
+    name = f"{metric}-{np.dtype(dtype).name}-{n}-{coordinate_hash(points)}.npy"
+    path = os.path.join(directory, name)
+    if os.path.exists(path):
+        # Reuse counts as use, so the file is the last one pruned
+        os.utime(path)
+    else:
+        os.makedirs(directory, exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        distances = np.lib.format.open_memmap(temporary, mode="w+", dtype=dtype, shape=(n, n))
+        # Whole rows per block keep the writes sequential in the file
+        build(points, dtype=dtype, symmetric=False, out=distances)
+        distances.flush()
+        del distances
+        os.replace(temporary, path)
+    if keep is not None:
+        prune_matrix_files(directory, keep, spare=path)
+    return np.load(path, mmap_mode="r")
+
+
+def prune_matrix_files(directory, keep, spare=None):
+    """Delete all but the keep most recently used .npy files in directory
+
+    The file at spare is never deleted. Files that cannot be removed (still
+    mapped by another process on Windows) are left for a later call.
+    """
+    paths = [os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".npy")]
+    paths.sort(key=os.path.getmtime, reverse=True)
+    for path in paths[keep:]:
+        if spare is not None and os.path.samefile(path, spare):
+            continue
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def nearest_neighbors(points, k):
+    """Indices of the k nearest other points for each of an (n, 2) array of points
+
+    Returns an (n, k) int32 array sorted from nearest to farthest (k is
+    capped at n - 1). Uses a KD-tree when SciPy is installed, otherwise
+    scans the points in blocks with NumPy.
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    n = len(points)
+    k = min(k, n - 1)
+    if k <= 0:
+        return np.empty((n, 0), dtype=np.int32)
+
+    if cKDTree is not None:
+        _, found = cKDTree(points).query(points, k=k + 1)
+        # Drop each point itself, which is usually but not always first when
+        # several points share a location
+        is_self = found == np.arange(n)[:, None]
+        order = np.argsort(is_self, axis=1, kind="stable")
+        return np.take_along_axis(found, order, axis=1)[:, :k].astype(np.int32)
+
+    neighbors = np.empty((n, k), dtype=np.int32)
+    block_size = max(1, BLOCK_ELEMENTS // n)
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        rows = np.arange(start, stop)
+        block = np.hypot(points[start:stop, None, 0] - points[None, :, 0],
+                         points[start:stop, None, 1] - points[None, :, 1])
+        block[rows - start, rows] = np.inf
+        neighbors[start:stop] = _k_smallest(block, k)
+    return neighbors
+
+
+def nearest_neighbors_from_matrix(distances, k):
+    """k nearest other cities of every city, read from a distance matrix
+
+    Useful when there are no planar coordinates, e.g. road distances.
+    """
+    distances = np.asarray(distances)
+    n = len(distances)
+    k = min(k, n - 1)
+    if k <= 0:
+        return np.empty((n, 0), dtype=np.int32)
+
+    neighbors = np.empty((n, k), dtype=np.int32)
+    block_size = max(1, BLOCK_ELEMENTS // n)
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        rows = np.arange(start, stop)
+        block = np.array(distances[start:stop], dtype=np.float64)
+        block[rows - start, rows] = np.inf
+        neighbors[start:stop] = _k_smallest(block, k)
+    return neighbors
+
+
+def _k_smallest(block, k):
+    """Column indices of the k smallest entries of each row, in ascending order"""
+    part = np.argpartition(block, k - 1, axis=1)[:, :k]
+    order = np.argsort(np.take_along_axis(block, part, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(part, order, axis=1)
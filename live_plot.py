@@ -0,0 +1,120 @@
+"""Live view of a running solver's best solution and convergence curve
+
+Only the two moving lines are redrawn while a solver runs. Everything else
+on the figure (cities, labels, axes) is rendered once, saved as a bitmap
+and restored before each frame (blitting). Redraws are capped at
+MAX_FPS, however often the solver improves.
+"""
+import time
+
+import numpy as np
+
+# Upper bound on redraws per second while a solver is running
+MAX_FPS = 10
+
+
+class LivePlot:
+    """Best-so-far route line and cost-vs-time curve drawn on a figure canvas
+
+    Feed it with add() from the solver's improvement events and call
+    refresh() from the UI loop; stop() hands the figure back for the final,
+    fully drawn solution and keeps the convergence curve.
+    """
+
+    def __init__(self, canvas, ax, convergence_ax, cities, color="blue", max_fps=MAX_FPS):
+        self.canvas = canvas
+        self.ax = ax
+        self.convergence_ax = convergence_ax
+        self.cities = np.asarray(cities, dtype=float).reshape(-1, 2)
+        self.min_interval = 1.0 / max_fps
+
+        convergence_ax.clear()
+        convergence_ax.set_xlabel("seconds", fontsize=8)
+        convergence_ax.set_ylabel("cost", fontsize=8)
+        convergence_ax.tick_params(labelsize=7)
+
+        self.route_line, = ax.plot([], [], color=color, linewidth=1, animated=True)
+        self.curve, = convergence_ax.plot([], [], color=color, linewidth=1, animated=True)
+        self.times = []
+        self.costs = []
+        self.solution = None
+        self.pending = False
+        self.last_draw = 0.0
+        self.background = None
+
+        # Every full redraw (first draw, resize, rescale) re-captures the background
+        self.draw_callback = canvas.mpl_connect("draw_event", self._on_draw)
+        canvas.draw()
+
+    def add(self, cost, elapsed, solution):
+        """Record a new best solution found after elapsed seconds"""
+        self.times.append(elapsed)
+        self.costs.append(cost)
+        self.solution = solution
+        self.pending = True
+
+    def refresh(self, force=False):
+        """Redraw the lines if there is news and the frame budget allows it"""
+        now = time.perf_counter()
+        if not self.pending or (not force and now - self.last_draw < self.min_interval):
+            return
+        self.pending = False
+        self.last_draw = now
+
+        self.route_line.set_data(*self._route_xy(self.solution))
+        self.curve.set_data(self.times, self.costs)
+        if self._rescale() or self.background is None:
+            self.canvas.draw()
+            return
+        self.canvas.restore_region(self.background)
+        self._draw_lines()
+        self.canvas.blit(self.canvas.figure.bbox)
+
+    def stop(self):
+        """Stop live drawing, dropping the route line and keeping the curve"""
+        self.refresh(force=True)
+        self.canvas.mpl_disconnect(self.draw_callback)
+        self.route_line.remove()
+        self.curve.set_animated(False)
+
+    def _on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        self._draw_lines()
+
+    def _draw_lines(self):
+        self.ax.draw_artist(self.route_line)
+        self.convergence_ax.draw_artist(self.curve)
+
+    def _route_xy(self, solution):
+        """x and y of a closed tour, or of routes separated by NaN gaps"""
+        if not solution:
+            return [], []
+        if np.ndim(solution[0]) == 0:
+            points = self.cities[list(solution) + [solution[0]]]
+        else:
+            gap = np.full((1, 2), np.nan)
+            points = np.concatenate([part for route in solution
+                                     for part in (self.cities[list(route)], gap)])
+        return points[:, 0], points[:, 1]
+
+    def _rescale(self):
+        """Grow the convergence axes to fit the curve, True if their limits changed"""
+        left, right = self.convergence_ax.get_xlim()
+        bottom, top = self.convergence_ax.get_ylim()
+        changed = False
+        if len(self.costs) == 1:
+            # Costs only go down, so the first one fixes the top
+            top = self.costs[0] * 1.05
+            bottom = self.costs[0] * 0.8
+            left, right = 0.0, max(1.0, self.times[0] * 2)
+            changed = True
+        if self.times[-1] > right:
+            right = max(right * 2, self.times[-1] * 1.5)
+            changed = True
+        if self.costs[-1] < bottom:
+            bottom = self.costs[-1] - 0.25 * (top - self.costs[-1])
+            changed = True
+        if changed:
+            self.convergence_ax.set_xlim(left, right)
+            self.convergence_ax.set_ylim(bottom, top)
+        return changed
@@ -0,0 +1,148 @@
+"""Local stand-in for the OpenRouteService endpoints the app uses
+
+Usage: python ors_standin.py [port]
+
+Serves /v2/directions/{profile}/geojson and /v2/matrix/{profile} without
+a network connection or API key. Roads are straight lines, ROAD_FACTOR
+times longer than the great-circle distance, driven at AVERAGE_SPEED.
+Matrix cells to or from an unreachable point are null, as ORS reports
+pairs it cannot route. It can also turn requests away with 429 and a
+Retry-After header, like a rate-limited plan. Point the app at it with
+ORS_URL=http://127.0.0.1:<port>.
+"""
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from distances import haversine
+
+# Detour of a road compared to the great circle
+ROAD_FACTOR = 1.3
+
+# Metres per second (80 km/h)
+AVERAGE_SPEED = 80 / 3.6
+
+# Most waypoints a directions request may have, as on the real service
+MAX_WAYPOINTS = 50
+
+
+def _great_circle(lon_lat_a, lon_lat_b):
+    """Metres between every point of (m, 2) and every point of (k, 2) [lon, lat] arrays"""
+    lat_lon_a = np.asarray(lon_lat_a, dtype=np.float64)[:, ::-1]
+    lat_lon_b = np.asarray(lon_lat_b, dtype=np.float64)[:, ::-1]
+    return 1000 * haversine(lat_lon_a[:, None], lat_lon_b[None, :])
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real service
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        parts = self.path.strip("/").split("/")
+        with self.server.lock:
+            self.server.requests += 1
+            rejected = self.server.reject > 0
+            self.server.reject -= rejected
+        if rejected:
+            self._reply(429, {"error": "Rate limit exceeded"}, {"Retry-After": self.server.retry_after})
+        elif len(parts) == 4 and parts[:2] == ["v2", "directions"] and parts[3] == "geojson":
+            if len(body["coordinates"]) > MAX_WAYPOINTS:
+                self._reply(400, {"error": f"Only {MAX_WAYPOINTS} waypoints are allowed"})
+            else:
+                self._reply(200, self._directions(body["coordinates"]))
+        elif len(parts) == 3 and parts[:2] == ["v2", "matrix"]:
+            self._reply(200, self._matrix(body))
+        else:
+            self._reply(404, {"error": f"unknown endpoint {self.path}"})
+
+    def _directions(self, coordinates):
+        """One LineString through all waypoints, with a midpoint on every leg"""
+        geometry = [coordinates[0]]
+        way_points = [0]
+        segments = []
+        for start, end in zip(coordinates[:-1], coordinates[1:]):
+            distance = ROAD_FACTOR * float(_great_circle([start], [end])[0, 0])
+            segments.append({"distance": distance, "duration": distance / AVERAGE_SPEED})
+            geometry += [[(start[0] + end[0]) / 2, (start[1] + end[1]) / 2], end]
+            way_points.append(len(geometry) - 1)
+        total = sum(segment["distance"] for segment in segments)
+        return {"type": "FeatureCollection", "features": [{
+            "type": "Feature",
+            "geometry": {"type": "LineString", "coordinates": geometry},
+            "properties": {"segments": segments, "way_points": way_points,
+                           "summary": {"distance": total, "duration": total / AVERAGE_SPEED}},
+        }]}
+
+    def _matrix(self, body):
+        locations = np.asarray(body["locations"], dtype=np.float64)
+        sources = body.get("sources", list(range(len(locations))))
+        destinations = body.get("destinations", list(range(len(locations))))
+        distances = ROAD_FACTOR * _great_circle(locations[sources], locations[destinations])
+        if len(self.server.unreachable):
+            cut_off = self._unreachable(locations)
+            distances[cut_off[sources][:, None] | cut_off[destinations][None, :]] = np.nan
+            distances[np.equal.outer(sources, destinations)] = 0.0
+        reply = {}
+        metrics = body.get("metrics", ["duration"])
+        if "distance" in metrics:
+            reply["distances"] = self._nulls(distances)
+        if "duration" in metrics:
+            reply["durations"] = self._nulls(distances / AVERAGE_SPEED)
+        return reply
+
+    def _unreachable(self, locations):
+        """Which [lon, lat] locations are one of the server's unreachable points"""
+        return np.isclose(locations[:, None, :], self.server.unreachable[None, :, :]).all(axis=2).any(axis=1)
+
+    @staticmethod
+    def _nulls(values):
+        return [[None if np.isnan(value) else value for value in row] for row in values.tolist()]
+
+    def _reply(self, status, payload, headers=None):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def serve(port=0, unreachable=(), reject=0, retry_after=1):
+    """Start the stand-in on a background thread, returning the server and its base URL
+
+    unreachable lists (lat, lon) points no road leads to or from. The
+    next reject requests are answered 429 with a Retry-After of
+    retry_after seconds; both can be changed later on the server. The
+    server counts handled requests in server.requests; call
+    server.shutdown() to stop it.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), StandInHandler)
+    server.lock = threading.Lock()
+    server.requests = 0
+    server.unreachable = np.asarray(unreachable, dtype=np.float64).reshape(-1, 2)[:, ::-1]
+    server.reject = reject
+    server.retry_after = str(retry_after)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def main():
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8080
+    server, url = serve(port)
+    print(f"OpenRouteService stand-in at {url}, Ctrl+C to stop")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
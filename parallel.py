@@ -0,0 +1,549 @@
+"""Process-pool variants of the headless solvers
+
+The distance matrix is copied into shared memory once per run and mapped
+by every worker process, so tasks only carry populations, tours and
+seeds rather than a pickled copy of the matrix. A matrix that is already
+memory-mapped from an .npy file is not copied at all: workers map the
+same file and share its pages.
+"""
+import multiprocessing
+import os
+import queue
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import ExitStack
+from dataclasses import dataclass, replace
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import solvers
+
+TOPOLOGIES = ("ring", "random")
+EXCHANGES = ("best_tour", "merge")
+
+
+@dataclass
+class IslandParams:
+    """Island-model settings for the parallel Genetic Algorithm"""
+    islands: int = 4
+    migration_interval: int = 20     # Generations between migrations
+    migrants: int = 2                # Best chromosomes each island sends per migration
+    topology: str = "ring"           # "ring" (to the next island) or "random" (to any other island)
+    workers: int = 0                 # Worker processes; 0 uses one per island up to the CPU count
+
+
+@dataclass
+class ColonyParams:
+    """Multi-colony settings for the parallel Ant Colony Optimization"""
+    colonies: int = 4
+    exchange_interval: int = 25      # Iterations between exchanges
+    exchange: str = "best_tour"      # "best_tour" (reinforce the overall best on every colony) or "merge" (average trails)
+    workers: int = 0                 # Worker processes; 0 uses one per colony up to the CPU count
+
+
+@dataclass
+class TemperingParams:
+    """Parallel tempering settings for Simulated Annealing
+
+    Replicas sit at fixed temperatures spaced geometrically between
+    coldest and hottest. Left at 0 these default to 1% and 50% of the
+    mean distance between cities, which suits any distance scale.
+    """
+    replicas: int = 8
+    coldest: float = 0.0
+    hottest: float = 0.0
+    exchange_interval: int = 2000    # Moves per replica between swap attempts
+    workers: int = 0                 # Worker processes; 0 uses one per replica up to the CPU count
+
+
+class SharedMatrix:
+    """A NumPy array copied into a named shared-memory block
+
+    Use as a context manager; the block is released on exit. Workers map
+    it with attach(spec) without copying. A whole memory-mapped file is
+    shared by its path instead of being copied.
+    """
+
+    def __init__(self, array):
+        if _mapped_file(array):
+            self.shm = None
+            self.array = array
+            self.spec = (array.filename, array.shape, array.dtype.str, array.offset)
+            return
+        array = np.ascontiguousarray(array)
+        self.shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        self.array = np.ndarray(array.shape, dtype=array.dtype, buffer=self.shm.buf)
+        self.array[...] = array
+        self.spec = (self.shm.name, array.shape, array.dtype.str)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        del self.array
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+
+
+def _mapped_file(array):
+    """True if array is a C-ordered memory map covering the rest of its file"""
+    return (isinstance(array, np.memmap) and array.filename is not None
+            and array.flags.c_contiguous
+            and os.path.getsize(array.filename) == array.offset + array.nbytes)
+
+
+def attach(spec):
+    """Map a SharedMatrix in this process, returning (block, array)
+
+    The block is None for a matrix shared as a memory-mapped file.
+    """
+    if len(spec) == 4:
+        path, shape, dtype, offset = spec
+        return None, np.memmap(path, dtype=dtype, mode="r", shape=shape, offset=offset)
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+# Per-process state set up once by _init_worker
+_worker = {}
+
+
+def _init_worker(spec, candidates, channel=None):
+    # Keep the block referenced so the mapping lives as long as the worker
+    _worker["shm"], _worker["distances"] = attach(spec)
+    _worker["candidates"] = candidates
+    _worker["channel"] = channel
+
+
+def _attached(spec):
+    """Array of a SharedMatrix, mapped once per worker process"""
+    name = spec[0]
+    if name not in _worker:
+        _worker[name] = attach(spec)
+    return _worker[name][1]
+
+
+def _pool(shared, candidates, tasks, workers, channel=None):
+    workers = workers or min(tasks, os.cpu_count() or 1)
+    # Spawn everywhere: forking the Tk process is unsafe, and frozen Windows builds only spawn
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                               initializer=_init_worker, initargs=(shared.spec, candidates, channel))
+
+
+def _seeds(seed, count):
+    """Independent, reproducible integer seed streams, one per task"""
+    streams = np.random.SeedSequence(seed).spawn(count)
+    return lambda task: int(streams[task].spawn(1)[0].generate_state(1)[0])
+
+
+def _evolve_island(params, depot, population, seed):
+    return solvers.genetic_algorithm(_worker["distances"], params, depot=depot, seed=seed,
+                                     candidates=_worker["candidates"], initial_population=population)
+
+
+def island_genetic_algorithm(distances, params=None, island_params=None, depot=0, seed=None,
+                             progress=None, candidates=None, improvement=None):
+    """Solve VRP with independent GA populations on separate processes
+
+    Each island runs genetic_algorithm for migration_interval generations
+    at a time. Between rounds every island sends copies of its best
+    chromosomes to a neighbour under the chosen topology, where they
+    replace the worst ones. Results are reproducible for a given seed.
+    """
+    params = params or solvers.GAParams()
+    island_params = island_params or IslandParams()
+    distances = np.asanyarray(distances)
+    solvers.check_split_limits(distances, depot, params)
+    islands = max(1, island_params.islands)
+    interval = max(1, island_params.migration_interval)
+    migrants = min(island_params.migrants, params.population_size - 1)
+
+    start_time = time.perf_counter()
+    next_seed = _seeds(seed, islands + 1)
+    topology_rng = np.random.default_rng(next_seed(islands))
+
+    best = None
+    time_to_best = 0.0
+    counters = {"evaluations": 0, "cache_hits": 0, "cache_misses": 0, "migrations": 0}
+    populations = [None] * islands
+    done = 0
+    stop_reason = "iterations"
+
+    with SharedMatrix(distances) as shared, \
+            _pool(shared, candidates, islands, island_params.workers) as executor:
+        while done < params.generations:
+            if progress is not None and best is not None and progress(done, best.cost):
+                stop_reason = "cancelled"
+                break
+
+            epoch_params = replace(params, generations=min(interval, params.generations - done))
+            futures = [executor.submit(_evolve_island, epoch_params, depot, populations[island],
+                                       next_seed(island))
+                       for island in range(islands)]
+            results = [future.result() for future in futures]
+            done += epoch_params.generations
+
+            previous_best = best
+            for result in results:
+                for key in ("evaluations", "cache_hits", "cache_misses"):
+                    counters[key] += result.counters[key]
+                if best is None or result.cost < best.cost:
+                    best = result
+                    time_to_best = time.perf_counter() - start_time
+            if improvement is not None and best is not previous_best:
+                improvement(done, best.cost, time_to_best, best.routes)
+            populations = [result.population for result in results]
+
+            if islands > 1 and migrants > 0 and done < params.generations:
+                _migrate(distances, populations, depot, params, migrants,
+                         island_params.topology, topology_rng)
+                counters["migrations"] += 1
+
+    # No generations ran: nothing found, like the serial genetic_algorithm
+    return solvers.SolverResult(
+        cost=best.cost if best is not None else float('inf'),
+        routes=best.routes if best is not None else [],
+        elapsed=time.perf_counter() - start_time,
+        time_to_best=time_to_best,
+        iterations=done,
+        stop_reason=stop_reason,
+        counters=counters,
+    )
+
+
+def _migrate(distances, populations, depot, params, migrants, topology, rng):
+    """Replace each receiving island's worst chromosomes with another island's best"""
+    rankings = [np.argsort(solvers.chromosome_fitness(distances, population, depot, params))
+                for population in populations]
+    emigrants = [population[ranking[:migrants]].copy()
+                 for population, ranking in zip(populations, rankings)]
+
+    islands = len(populations)
+    for source in range(islands):
+        if topology == "random":
+            target = (source + int(rng.integers(1, islands))) % islands
+        else:
+            target = (source + 1) % islands
+        worst = rankings[target][-migrants:]
+        populations[target][worst] = emigrants[source]
+        # Later senders to the same island replace the next-worst chromosomes
+        rankings[target] = rankings[target][:-migrants]
+
+
+def _run_colony(solver_name, params, kwargs, pheromone_spec, seed):
+    solver = getattr(solvers, solver_name)
+    return solver(_worker["distances"], params, seed=seed, candidates=_worker["candidates"],
+                  pheromone=_attached(pheromone_spec), **kwargs)
+
+
+def multi_colony_aco_tsp(distances, params=None, colony_params=None, seed=None, progress=None,
+                         candidates=None, improvement=None):
+    """Solve TSP with independent ant colonies on separate processes"""
+    return _multi_colony("aco_tsp", distances, params or solvers.ACOTSPParams(),
+                         colony_params, {}, seed, progress, candidates, improvement)
+
+
+def multi_colony_aco_vrp(distances, params=None, colony_params=None, depot=0, seed=None, progress=None,
+                         candidates=None, improvement=None):
+    """Solve VRP with independent ant colonies on separate processes"""
+    return _multi_colony("aco_vrp", distances, params or solvers.ACOVRPParams(),
+                         colony_params, {"depot": depot}, seed, progress, candidates, improvement)
+
+
+def _multi_colony(solver_name, distances, params, colony_params, kwargs, seed, progress, candidates,
+                  improvement):
+    """Run colonies for exchange_interval iterations at a time, then exchange
+
+    Every colony keeps its pheromone matrix (or sparse pheromone table) in
+    its own shared-memory block, which the workers update in place. Between rounds either the overall
+    best solution is deposited on every colony's trail ("best_tour"), or all
+    trails are replaced by their average ("merge"). Results are
+    reproducible for a given seed.
+    """
+    colony_params = colony_params or ColonyParams()
+    distances = np.asanyarray(distances)
+    num_cities = len(distances)
+    colonies = max(1, colony_params.colonies)
+    interval = max(1, colony_params.exchange_interval)
+
+    start_time = time.perf_counter()
+    next_seed = _seeds(seed, colonies)
+
+    best = None
+    time_to_best = 0.0
+    counters = {"exchanges": 0}
+    done = 0
+    stop_reason = "iterations"
+
+    with ExitStack() as stack:
+        shared = stack.enter_context(SharedMatrix(distances))
+        sparse = params.pheromone_storage == "sparse"
+        if sparse:
+            if candidates is None:
+                raise ValueError("Sparse pheromone storage needs candidate lists")
+            candidates = np.asarray(candidates)
+            trail_shape = (num_cities, candidates.shape[1] + 1)
+        else:
+            trail_shape = (num_cities, num_cities)
+        trails = [stack.enter_context(SharedMatrix(np.full(trail_shape, params.initial_pheromone)))
+                  for _ in range(colonies)]
+        executor = stack.enter_context(_pool(shared, candidates, colonies, colony_params.workers))
+
+        while done < params.n_iterations:
+            if progress is not None and best is not None and progress(done, best.cost):
+                stop_reason = "cancelled"
+                break
+
+            epoch_params = replace(params, n_iterations=min(interval, params.n_iterations - done))
+            futures = [executor.submit(_run_colony, solver_name, epoch_params, kwargs, trail.spec,
+                                       next_seed(colony))
+                       for colony, trail in enumerate(trails)]
+            results = [future.result() for future in futures]
+            done += epoch_params.n_iterations
+
+            previous_best = best
+            for result in results:
+                for key, value in result.counters.items():
+                    counters[key] = counters.get(key, 0) + value
+                if best is None or result.cost < best.cost:
+                    best = result
+                    time_to_best = time.perf_counter() - start_time
+            if improvement is not None and best is not previous_best:
+                improvement(done, best.cost, time_to_best, best.tour if best.tour is not None else best.routes)
+
+            if colonies > 1 and done < params.n_iterations:
+                if colony_params.exchange == "merge":
+                    average = sum(trail.array for trail in trails) / colonies
+                    for trail in trails:
+                        trail.array[...] = average
+                else:
+                    from_cities, to_cities = _solution_edges(best)
+                    amounts = np.full(len(from_cities), 2.0 / best.cost)
+                    for trail in trails:
+                        pheromone = solvers.SparsePheromone(candidates, trail.array) if sparse else trail.array
+                        solvers.deposit_pheromone(pheromone, from_cities, to_cities, amounts)
+                counters["exchanges"] += 1
+
+    # No iterations ran: nothing found, like the serial ACO solvers
+    return solvers.SolverResult(
+        cost=best.cost if best is not None else float('inf'),
+        tour=best.tour if best is not None else None,
+        routes=best.routes if best is not None else None,
+        elapsed=time.perf_counter() - start_time,
+        time_to_best=time_to_best,
+        iterations=done,
+        stop_reason=stop_reason,
+        counters=counters,
+    )
+
+
+def _solution_edges(result):
+    """(from, to) city arrays of every edge in a TSP tour or set of VRP routes"""
+    if result.tour is not None:
+        tour = np.asarray(result.tour)
+        return tour, np.roll(tour, -1)
+    from_cities = [city for route in result.routes for city in route[:-1]]
+    to_cities = [city for route in result.routes for city in route[1:]]
+    return np.array(from_cities), np.array(to_cities)
+
+
+def _anneal(params, initial_tour, seed):
+    return solvers.simulated_annealing(_worker["distances"], params, seed=seed,
+                                       candidates=_worker["candidates"], initial_tour=initial_tour)
+
+
+def _anneal_streaming(params, seed):
+    events, cancel = _worker["channel"]
+
+    def progress(iteration, best_cost):
+        events.put(("progress", iteration, best_cost))
+        return cancel.is_set()
+
+    def improvement(iteration, best_cost, elapsed, solution):
+        events.put(("improvement", iteration, best_cost, elapsed, list(solution)))
+
+    try:
+        return solvers.simulated_annealing(_worker["distances"], params, seed=seed, progress=progress,
+                                           candidates=_worker["candidates"], improvement=improvement)
+    finally:
+        # Queued after every event, so the caller knows none is still in transit
+        events.put(("done",))
+
+
+def annealing_process(distances, params=None, seed=None, progress=None, candidates=None, improvement=None):
+    """One Simulated Annealing chain on a worker process
+
+    The SA loop is pure Python and holds the GIL, so on a thread it takes
+    turns with everything else in the process. Here it runs on its own
+    core. The worker streams progress and improvements back, and they are
+    passed on from the calling thread. Stopping from progress cancels the
+    run at the worker's next progress check.
+    """
+    context = multiprocessing.get_context("spawn")
+    events, cancel = context.Queue(), context.Event()
+    with SharedMatrix(np.asanyarray(distances)) as shared, \
+            _pool(shared, candidates, 1, 1, channel=(events, cancel)) as executor:
+        future = executor.submit(_anneal_streaming, params or solvers.SAParams(), seed)
+        while True:
+            try:
+                kind, *event = events.get(timeout=0.05)
+            except queue.Empty:
+                # A worker that died never sends "done"
+                if future.done() and future.exception() is not None:
+                    break
+                continue
+            if kind == "done":
+                break
+            if kind == "progress":
+                if progress is not None and progress(*event):
+                    cancel.set()
+            elif improvement is not None:
+                improvement(*event)
+        return future.result()
+
+
+def multi_start_annealing(distances, params=None, starts=4, workers=0, seed=None, progress=None,
+                          candidates=None, improvement=None):
+    """Independent Simulated Annealing runs from different random tours
+
+    Returns the best run with replicas listing every run's outcome.
+    progress is called as runs finish, with the number finished so far.
+    Stopping from it drops the runs that have not started yet; runs
+    already going are waited for.
+    """
+    params = params or solvers.SAParams()
+    distances = np.asanyarray(distances)
+    starts = max(1, starts)
+    next_seed = _seeds(seed, starts)
+    start_time = time.perf_counter()
+
+    stop_reason = None
+    with SharedMatrix(distances) as shared, _pool(shared, candidates, starts, workers) as executor:
+        futures = [executor.submit(_anneal, params, None, next_seed(start)) for start in range(starts)]
+        best = None
+        for finished, future in enumerate(as_completed(futures), 1):
+            result = future.result()
+            if best is None or result.cost < best.cost:
+                best = result
+                if improvement is not None:
+                    improvement(finished, best.cost, time.perf_counter() - start_time, best.tour)
+            if progress is not None and finished < starts and progress(finished, best.cost):
+                stop_reason = "cancelled"
+                for pending in futures:
+                    pending.cancel()
+                break
+    # Leaving the pool waits for the runs that were already going
+    results = [future.result() for future in futures if not future.cancelled()]
+
+    best = min(results, key=lambda result: result.cost)
+    counters = {}
+    for result in results:
+        for key, value in result.counters.items():
+            counters[key] = counters.get(key, 0) + value
+    return solvers.SolverResult(
+        cost=best.cost,
+        tour=best.tour,
+        elapsed=time.perf_counter() - start_time,
+        time_to_best=best.time_to_best,
+        iterations=sum(result.iterations for result in results),
+        stop_reason=stop_reason or best.stop_reason,
+        counters=counters,
+        replicas=[{"cost": result.cost, "time_to_best": result.time_to_best,
+                   "stop_reason": result.stop_reason, **result.counters} for result in results],
+    )
+
+
+def parallel_tempering(distances, params=None, tempering_params=None, seed=None, progress=None,
+                       candidates=None, improvement=None):
+    """Simulated Annealing replicas at a temperature ladder, swapping tours
+
+    Every replica anneals at its own fixed temperature for
+    exchange_interval moves at a time. Then neighbouring temperatures try
+    to swap tours, accepted with the usual Metropolis criterion. Hot
+    replicas explore and pass promising tours down to the cold ones. Each
+    replica runs params.iterations moves, or until params.time_limit.
+    """
+    params = params or solvers.SAParams()
+    tempering_params = tempering_params or TemperingParams()
+    distances = np.asanyarray(distances)
+    replicas = max(1, tempering_params.replicas)
+    interval = max(1, tempering_params.exchange_interval)
+    mean_distance = float(distances.mean()) or 1.0
+    temperatures = np.geomspace(tempering_params.coldest or 0.01 * mean_distance,
+                                tempering_params.hottest or 0.5 * mean_distance, replicas).tolist()
+
+    start_time = time.perf_counter()
+    next_seed = _seeds(seed, replicas + 1)
+    swap_rng = np.random.default_rng(next_seed(replicas))
+
+    best = None
+    time_to_best = 0.0
+    tours = [None] * replicas
+    stats = [{"temperature": temperature, "cost": float('inf'), "evaluations": 0, "accepted": 0,
+              "swaps_attempted": 0, "swaps_accepted": 0} for temperature in temperatures]
+    done = 0
+    rounds = 0
+    stop_reason = "time_limit" if params.time_limit > 0 else "iterations"
+
+    def finished():
+        if params.time_limit > 0:
+            return time.perf_counter() - start_time >= params.time_limit
+        return done >= params.iterations
+
+    with SharedMatrix(distances) as shared, \
+            _pool(shared, candidates, replicas, tempering_params.workers) as executor:
+        while not finished():
+            if progress is not None and best is not None and progress(done, best.cost):
+                stop_reason = "cancelled"
+                break
+
+            moves = interval if params.time_limit > 0 else min(interval, params.iterations - done)
+            futures = [executor.submit(_anneal, replace(params, temperature=temperature, cooling_rate=1.0,
+                                                        cooling_schedule="geometric", iterations=moves,
+                                                        time_limit=0.0, stagnation_limit=0, reheat_after=0),
+                                       tours[replica], next_seed(replica))
+                       for replica, temperature in enumerate(temperatures)]
+            results = [future.result() for future in futures]
+            done += moves
+
+            energies = []
+            previous_best = best
+            for replica, result in enumerate(results):
+                tours[replica] = result.final_tour
+                energies.append(solvers.tour_distance(distances, result.final_tour))
+                stats[replica]["cost"] = min(stats[replica]["cost"], result.cost)
+                stats[replica]["evaluations"] += result.counters["evaluations"]
+                stats[replica]["accepted"] += result.counters["accepted"]
+                if best is None or result.cost < best.cost:
+                    best = result
+                    time_to_best = time.perf_counter() - start_time
+            if improvement is not None and best is not previous_best:
+                improvement(done, best.cost, time_to_best, best.tour)
+
+            # Alternate between even and odd neighbour pairs so every pair gets a turn
+            for cold in range(rounds % 2, replicas - 1, 2):
+                hot = cold + 1
+                stats[cold]["swaps_attempted"] += 1
+                exponent = (1.0 / temperatures[cold] - 1.0 / temperatures[hot]) * (energies[cold] - energies[hot])
+                if exponent >= 0 or swap_rng.random() < np.exp(exponent):
+                    tours[cold], tours[hot] = tours[hot], tours[cold]
+                    energies[cold], energies[hot] = energies[hot], energies[cold]
+                    stats[cold]["swaps_accepted"] += 1
+            rounds += 1
+
+    # No moves ran: nothing found
+    return solvers.SolverResult(
+        cost=best.cost if best is not None else float('inf'),
+        tour=best.tour if best is not None else None,
+        elapsed=time.perf_counter() - start_time,
+        time_to_best=time_to_best,
+        iterations=done,
+        stop_reason=stop_reason,
+        counters={"evaluations": sum(stat["evaluations"] for stat in stats),
+                  "accepted": sum(stat["accepted"] for stat in stats),
+                  "swaps": sum(stat["swaps_accepted"] for stat in stats)},
+        replicas=stats,
+    )
@@ -0,0 +1,447 @@
+"""Road geometry from OpenRouteService, fetched concurrently
+
+Legs are requested on a small thread pool over one keep-alive session.
+A token bucket keeps the request rate within the ORS quota, and requests
+answered with 429 (or a transient server error) are retried with
+exponential backoff. The service URL is configurable, so everything can
+run against a local stand-in server. Fetched legs can be kept in an
+on-disk LegCache, so only edges not seen before spend quota.
+
+Consecutive legs of a route are requested together as one multi-waypoint
+path (up to the provider's waypoint limit), and the returned geometry is
+split back into one LegResult per leg.
+
+distance_matrix builds a road-distance matrix for the solvers from the
+ORS matrix service in tiles, keeping it in a MatrixCache so only cells
+that were never fetched are requested again.
+"""
+import json
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+from distances import coordinate_hash, haversine
+
+ORS_URL = "https://api.openrouteservice.org"
+
+# Free ORS plan: 40 directions requests per minute
+ORS_REQUESTS_PER_MINUTE = 40
+
+# Most waypoints ORS accepts in one directions request
+ORS_MAX_WAYPOINTS = 50
+
+# Matrix requests are tiles of TILE_SIZE sources by TILE_SIZE destinations,
+# within the free plan's 3500 routes per request
+TILE_SIZE = 50
+
+# Unreachable pairs cost this many times their great-circle distance
+UNREACHABLE_FACTOR = 3.0
+
+# Status codes worth another try after waiting
+RETRY_STATUS = (429, 502, 503, 504)
+
+# Longest Retry-After the client waits out, in seconds; longer ones are returned to the caller
+MAX_RETRY_AFTER = 10
+
+# Coordinates are rounded to this many decimals in cache keys (about 1 m)
+CACHE_DECIMALS = 5
+
+# Cached legs are kept for 30 days, at most 100k of them; a full cache
+# drops its least recently used tenth at once
+CACHE_TTL = 30 * 24 * 3600
+CACHE_MAX_ENTRIES = 100_000
+CACHE_PRUNE_FRACTION = 0.1
+
+
+class TokenBucket:
+    """Thread-safe token bucket allowing rate requests per second with bursts of capacity"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, sleeping until one is available"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class LegCache:
+    """SQLite store of road legs keyed by rounded end points and profile
+
+    Entries older than ttl seconds are ignored and dropped; once there
+    are more than max_entries the least recently used CACHE_PRUNE_FRACTION
+    of them are evicted in one go. Safe to share between threads.
+    """
+
+    def __init__(self, path, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS legs (key TEXT PRIMARY KEY, coords TEXT NOT NULL, "
+                "distance REAL NOT NULL, created REAL NOT NULL, used REAL NOT NULL)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS legs_used ON legs (used)")
+            # Kept up to date by put and get so inserts need no COUNT(*)
+            self.count = self.connection.execute("SELECT COUNT(*) FROM legs").fetchone()[0]
+
+    @staticmethod
+    def key(profile, start, end):
+        """Cache key of a leg between two (lat, lon) points"""
+        points = ",".join(f"{round(value, CACHE_DECIMALS):.{CACHE_DECIMALS}f}" for value in (*start, *end))
+        return f"{profile}:{points}"
+
+    def get(self, key):
+        """(coords, distance) of a fresh entry, or None"""
+        now = time.time()
+        with self.lock, self.connection:
+            row = self.connection.execute(
+                "SELECT coords, distance, created FROM legs WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if now - row[2] > self.ttl:
+                self.connection.execute("DELETE FROM legs WHERE key = ?", (key,))
+                self.count -= 1
+                return None
+            self.connection.execute("UPDATE legs SET used = ? WHERE key = ?", (now, key))
+        return [tuple(point) for point in json.loads(row[0])], row[1]
+
+    def put(self, key, coords, distance):
+        now = time.time()
+        with self.lock, self.connection:
+            updated = self.connection.execute(
+                "UPDATE legs SET coords = ?, distance = ?, created = ?, used = ? WHERE key = ?",
+                (json.dumps(coords), distance, now, now, key))
+            if updated.rowcount == 0:
+                self.connection.execute(
+                    "INSERT INTO legs VALUES (?, ?, ?, ?, ?)", (key, json.dumps(coords), distance, now, now))
+                self.count += 1
+            if self.count > self.max_entries:
+                self._prune()
+
+    def _prune(self):
+        """Evict least recently used legs down to (1 - CACHE_PRUNE_FRACTION) * max_entries"""
+        # Recount, another process may share the file
+        count = self.connection.execute("SELECT COUNT(*) FROM legs").fetchone()[0]
+        excess = count - int(self.max_entries * (1 - CACHE_PRUNE_FRACTION))
+        if count > self.max_entries and excess > 0:
+            self.connection.execute(
+                "DELETE FROM legs WHERE key IN (SELECT key FROM legs ORDER BY used LIMIT ?)", (excess,))
+            count -= excess
+        self.count = count
+
+    def __len__(self):
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM legs").fetchone()[0]
+
+    def close(self):
+        self.connection.close()
+
+
+class MatrixCache:
+    """SQLite store of road-distance matrices keyed by profile and coordinate set
+
+    Matrices are kept whole, with NaN in cells that were never fetched.
+    Beyond max_entries the least recently used matrices are evicted. Safe
+    to share between threads.
+    """
+
+    def __init__(self, path, max_entries=100):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS matrices (key TEXT PRIMARY KEY, size INTEGER NOT NULL, "
+                "distances BLOB NOT NULL, used REAL NOT NULL)")
+
+    @staticmethod
+    def key(profile, lat_lon_cities):
+        """Cache key of the matrix over (lat, lon) points, in their order"""
+        return f"{profile}:{len(lat_lon_cities)}:{coordinate_hash(lat_lon_cities, CACHE_DECIMALS)}"
+
+    def get(self, key):
+        """The cached (n, n) matrix in metres, NaN where unknown, or None"""
+        with self.lock, self.connection:
+            row = self.connection.execute(
+                "SELECT size, distances FROM matrices WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self.connection.execute("UPDATE matrices SET used = ? WHERE key = ?", (time.time(), key))
+        return np.frombuffer(row[1], dtype=np.float64).reshape(row[0], row[0]).copy()
+
+    def put(self, key, distances):
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO matrices VALUES (?, ?, ?, ?)",
+                (key, len(distances), np.ascontiguousarray(distances, dtype=np.float64).tobytes(),
+                 time.time()))
+            count = self.connection.execute("SELECT COUNT(*) FROM matrices").fetchone()[0]
+            if count > self.max_entries:
+                self.connection.execute(
+                    "DELETE FROM matrices WHERE key IN (SELECT key FROM matrices ORDER BY used LIMIT ?)",
+                    (count - self.max_entries,))
+
+    def close(self):
+        self.connection.close()
+
+
+@dataclass
+class LegResult:
+    """Road geometry between two cities, or why there is none
+
+    coords are (lat, lon) pairs ready for folium and distance is in
+    metres. status is the last HTTP status (0 if no response arrived),
+    cached is True for legs read from the LegCache.
+    """
+    start: int
+    end: int
+    coords: List[Tuple[float, float]] = field(default_factory=list)
+    distance: float = 0.0
+    status: int = 0
+    error: Optional[str] = None
+    cached: bool = False
+
+    @property
+    def ok(self):
+        return self.error is None and bool(self.coords)
+
+
+def polyline_length(coords):
+    """Great-circle length in metres of a list of (lat, lon) points"""
+    if len(coords) < 2:
+        return 0.0
+    coords = np.asarray(coords, dtype=np.float64)
+    return 1000 * float(np.sum(haversine(coords[:-1], coords[1:])))
+
+
+class RouteClient:
+    """Concurrent, rate-limited OpenRouteService directions client"""
+
+    def __init__(self, api_key, base_url=ORS_URL, profile="driving-car",
+                 requests_per_minute=ORS_REQUESTS_PER_MINUTE, burst=10, workers=4,
+                 max_retries=3, backoff=1.0, timeout=30.0, cache=None):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.profile = profile
+        self.workers = workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.cache = cache
+        self.limiter = TokenBucket(requests_per_minute / 60.0, burst)
+
+        # One connection per worker, kept alive across requests
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            'Authorization': api_key,
+            'Content-Type': 'application/json; charset=utf-8'
+        })
+
+    def close(self):
+        self.session.close()
+
+    def cached_leg(self, start, end, lat_lon_cities):
+        """The leg between two cities from the cache, or None"""
+        if self.cache is None:
+            return None
+        found = self.cache.get(LegCache.key(self.profile, lat_lon_cities[start], lat_lon_cities[end]))
+        if found is None:
+            return None
+        return LegResult(start, end, coords=found[0], distance=found[1], status=200, cached=True)
+
+    def fetch_paths(self, paths, lat_lon_cities):
+        """Legs of every path (a list of city indices), one request per path, in the same order
+
+        A path with more than ORS_MAX_WAYPOINTS stops is sent as several
+        requests, each starting where the previous one ended.
+        """
+        chunks = [(index, path[start:start + ORS_MAX_WAYPOINTS])
+                  for index, path in enumerate(paths)
+                  for start in range(0, len(path) - 1, ORS_MAX_WAYPOINTS - 1)]
+        results = [[] for _ in paths]
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            legs = pool.map(lambda chunk: self.fetch_path(chunk[1], lat_lon_cities), chunks)
+            for (index, _), chunk_legs in zip(chunks, legs):
+                results[index].extend(chunk_legs)
+        return results
+
+    def fetch_path(self, stops, lat_lon_cities):
+        """Road geometry of each leg along stops given as city indices, retrying on 429
+
+        The whole path is one request; its geometry is split at the
+        waypoints into a LegResult per leg, each stored in the cache.
+        """
+        results = [LegResult(start, end) for start, end in zip(stops[:-1], stops[1:])]
+        data = {
+            # ORS expects [lon, lat]
+            "coordinates": [list(lat_lon_cities[stop][::-1]) for stop in stops],
+            "preference": "fastest",  # Use fastest route
+            "instructions": False,    # We don't need turn instructions
+            "avoid_features": ["ferries"]  # Avoid ferries/water crossings
+        }
+        try:
+            response = self._post(f"/v2/directions/{self.profile}/geojson", data)
+        except requests.RequestException as e:
+            for result in results:
+                result.error = f"Error: {str(e)[:30]}"
+            return results
+
+        for result in results:
+            result.status = response.status_code
+        if response.status_code != 200:
+            for result in results:
+                result.error = f"API error {response.status_code}: {response.text[:200]}"
+            return results
+
+        for feature in response.json().get('features', []):
+            if feature['geometry']['type'] != 'LineString':
+                continue
+            # Convert [lon, lat] to [lat, lon] for folium
+            coords = [(coord[1], coord[0]) for coord in feature['geometry']['coordinates']]
+            properties = feature.get('properties', {})
+            way_points = properties.get('way_points', [0, len(coords) - 1])
+            segments = properties.get('segments', [])
+            if len(way_points) != len(stops):
+                continue
+            for k, result in enumerate(results):
+                result.coords = coords[way_points[k]:way_points[k + 1] + 1]
+                if len(segments) == len(results):
+                    result.distance = segments[k].get('distance', 0)
+                elif len(results) == 1:
+                    result.distance = properties.get('summary', {}).get('distance', 0)
+                else:
+                    # Without segments, measure each leg along its geometry
+                    result.distance = polyline_length(result.coords)
+
+        if self.cache is not None:
+            for result in results:
+                if result.coords:
+                    self.cache.put(LegCache.key(self.profile, lat_lon_cities[result.start],
+                                                lat_lon_cities[result.end]),
+                                   result.coords, result.distance)
+        return results
+
+    def distance_matrix(self, lat_lon_cities, cache=None, tile_size=TILE_SIZE, progress=None):
+        """Road distances in metres between all (lat, lon) points, as an (n, n) array
+
+        Tiles of the matrix are requested concurrently, skipping cells
+        already in cache, and whatever was fetched is saved back to the
+        cache even if a request fails. Unreachable pairs get
+        UNREACHABLE_FACTOR times their great-circle distance. Raises
+        requests.HTTPError if the service refuses a tile.
+
+        progress(done, total) is called after every tile; if it returns
+        True the remaining tiles are dropped and None is returned, so a
+        later call with the same cache resumes where this one stopped.
+        """
+        points = np.asarray(lat_lon_cities, dtype=np.float64).reshape(-1, 2)
+        n = len(points)
+        key = MatrixCache.key(self.profile, points)
+        distances = cache.get(key) if cache is not None else None
+        if distances is None:
+            distances = np.full((n, n), np.nan)
+        np.fill_diagonal(distances, 0.0)
+
+        # Request only the rows and columns of each tile that still have gaps
+        tiles = []
+        for row in range(0, n, tile_size):
+            for col in range(0, n, tile_size):
+                missing = np.isnan(distances[row:row + tile_size, col:col + tile_size])
+                if missing.any():
+                    tiles.append((row + np.flatnonzero(missing.any(axis=1)),
+                                  col + np.flatnonzero(missing.any(axis=0))))
+
+        cancelled = False
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                futures = {pool.submit(self._matrix_tile, points, sources, destinations): (sources, destinations)
+                           for sources, destinations in tiles}
+                stored = set()
+                try:
+                    for done, future in enumerate(as_completed(futures), 1):
+                        distances[np.ix_(*futures[future])] = future.result()
+                        stored.add(future)
+                        if progress is not None and done < len(tiles) and progress(done, len(tiles)):
+                            cancelled = True
+                            break
+                finally:
+                    # After a cancel or a failed tile, drop the tiles not yet sent but
+                    # keep every one that was paid for, for the cache
+                    in_flight = [future for future in futures if future not in stored and not future.cancel()]
+                    for future in in_flight:
+                        if future.exception() is None:
+                            distances[np.ix_(*futures[future])] = future.result()
+        finally:
+            if cache is not None and tiles:
+                cache.put(key, distances)
+        if cancelled:
+            return None
+
+        unreachable = ~np.isfinite(distances)
+        if unreachable.any():
+            rows, cols = np.nonzero(unreachable)
+            distances[rows, cols] = UNREACHABLE_FACTOR * 1000 * haversine(points[rows], points[cols])
+        return distances
+
+    def _matrix_tile(self, points, sources, destinations):
+        """Distances from sources to destinations (city indices), inf where unreachable"""
+        locations, inverse = np.unique(np.concatenate([sources, destinations]), return_inverse=True)
+        data = {
+            # ORS expects [lon, lat]
+            "locations": points[locations][:, ::-1].tolist(),
+            "sources": inverse[:len(sources)].tolist(),
+            "destinations": inverse[len(sources):].tolist(),
+            "metrics": ["distance"],
+        }
+        response = self._post(f"/v2/matrix/{self.profile}", data)
+        response.raise_for_status()
+        tile = np.array(response.json()["distances"], dtype=np.float64)  # null becomes NaN
+        tile[np.isnan(tile)] = np.inf
+        return tile
+
+    def _post(self, path, data):
+        """POST within the rate limit, retrying transient failures with exponential backoff"""
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire()
+            try:
+                response = self.session.post(self.base_url + path, json=data, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.max_retries:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUS or attempt == self.max_retries:
+                    return response
+                retry_after = response.headers.get("Retry-After")
+                if retry_after and retry_after.isdigit():
+                    # Waiting out a long limit would stall the map; let the caller fall back
+                    if int(retry_after) > MAX_RETRY_AFTER:
+                        return response
+                    time.sleep(float(retry_after))
+                    continue
+            # Jitter keeps the workers from retrying in lockstep
+            time.sleep(self.backoff * 2 ** attempt * random.uniform(0.5, 1.0))
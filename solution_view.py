@@ -0,0 +1,145 @@
+"""Reusable matplotlib artists for cities and solutions
+
+Every solution axes in the GUI owns one SolutionView. Cities are a single
+scatter, each route is a single LineCollection, and city labels only
+exist while few enough cities are in view. New instances and solutions
+update these artists in place instead of clearing the axes and adding
+one artist per city and per edge.
+"""
+import numpy as np
+from matplotlib.collections import LineCollection
+
+# Cities are labelled only while at most this many are inside the view
+LABEL_LIMIT = 50
+
+# Direction arrows (and edge numbers on tours) are drawn up to this many cities
+ARROW_LIMIT = 20
+
+# Colors for different routes
+ROUTE_COLORS = ['red', 'green', 'blue', 'purple', 'orange', 'brown', 'pink', 'gray']
+
+# Cities live in a 0-100 square, with a margin around it
+VIEW_LIMITS = (-5, 105)
+
+
+class SolutionView:
+    """Cities, depot, labels and routes drawn on one axes"""
+
+    def __init__(self, ax):
+        self.ax = ax
+        self.cities = np.empty((0, 2))
+        self.labels = None
+        self.city_artist = ax.scatter([], [], c="black", s=36, zorder=3)
+        self.depot_artist = ax.scatter([], [], c="red", s=100, zorder=4)
+        self.depot_label = ax.annotate("DEPOT", (0, 0), xytext=(5, 0), textcoords="offset points",
+                                       fontsize=8, weight="bold", visible=False)
+        self.label_artists = []
+        self.route_artists = []
+        self.legend_artists = []
+        self.detail_artists = []   # Arrows and edge numbers of small solutions
+        ax.set_xlim(*VIEW_LIMITS)
+        ax.set_ylim(*VIEW_LIMITS)
+        # Zooming or panning decides again which labels to show
+        ax.callbacks.connect("xlim_changed", self._update_labels)
+        ax.callbacks.connect("ylim_changed", self._update_labels)
+
+    def show_cities(self, cities, labels=None, depot=None):
+        """Show a new set of cities and drop the current solution
+
+        labels holds one string per city; depot is the index of a city to
+        mark separately, or None.
+        """
+        self.cities = np.asarray(cities, dtype=float).reshape(-1, 2)
+        self.labels = labels
+        others = np.ones(len(self.cities), dtype=bool)
+        if depot is not None:
+            others[depot] = False
+            self.depot_artist.set_offsets(self.cities[[depot]])
+            self.depot_label.xy = tuple(self.cities[depot])
+        else:
+            self.depot_artist.set_offsets(np.empty((0, 2)))
+        self.depot_label.set_visible(depot is not None)
+        self.city_artist.set_offsets(self.cities[others])
+        self.clear_solution()
+        self._update_labels()
+
+    def show_tour(self, tour):
+        """Show a closed TSP tour given as city indices ending at its start"""
+        self.clear_solution()
+        points = self._route_segments(0, tour, "blue")
+        if len(self.cities) <= ARROW_LIMIT and len(points) > 1:
+            middles = self._add_arrows(points, "blue")
+            for i, (x, y) in enumerate(middles):
+                self.detail_artists.append(self.ax.text(
+                    x, y, f"{i}", fontsize=7, ha='center', va='center',
+                    bbox=dict(facecolor='white', alpha=0.7, edgecolor='none', pad=1)))
+
+    def show_routes(self, routes):
+        """Show VRP routes, each starting and ending at the depot, one color per vehicle"""
+        self.clear_solution()
+        for i, route in enumerate(routes):
+            color = ROUTE_COLORS[i % len(ROUTE_COLORS)]
+            points = self._route_segments(i, route, color)
+            if len(self.cities) <= ARROW_LIMIT and len(points) > 1:
+                self._add_arrows(points, color)
+
+            # Add text label for the vehicle
+            if i == len(self.legend_artists):
+                self.legend_artists.append(self.ax.text(
+                    0.02, 0.98 - (0.05 * i), "", horizontalalignment='left', verticalalignment='top',
+                    transform=self.ax.transAxes, bbox=dict(facecolor='white', alpha=0.7)))
+            legend = self.legend_artists[i]
+            legend.set_text(f"Vehicle {i+1}")
+            legend.set_color(color)
+            legend.set_visible(True)
+
+    def clear_solution(self):
+        """Hide the current solution, keeping its artists for the next one"""
+        for artist in self.route_artists:
+            artist.set_segments([])
+        for artist in self.legend_artists:
+            artist.set_visible(False)
+        for artist in self.detail_artists:
+            artist.remove()
+        self.detail_artists = []
+
+    def _route_segments(self, index, route, color):
+        """Put a route into the index-th LineCollection, returning its points"""
+        points = self.cities[np.asarray(route, dtype=int)]
+        if index == len(self.route_artists):
+            self.route_artists.append(self.ax.add_collection(LineCollection([], zorder=2)))
+        artist = self.route_artists[index]
+        artist.set_segments(np.stack([points[:-1], points[1:]], axis=1) if len(points) > 1 else [])
+        artist.set_color(color)
+        return points
+
+    def _add_arrows(self, points, color):
+        """One arrow in the middle of every edge, as a single quiver; returns the middles"""
+        starts = points[:-1]
+        direction = points[1:] - starts
+        length = np.hypot(direction[:, 0], direction[:, 1])
+        length[length == 0] = 1.0
+        arrows = direction / length[:, None] * 5  # Scale arrow size
+        middles = starts + 0.5 * direction
+        tails = middles - arrows / 2
+        self.detail_artists.append(self.ax.quiver(
+            tails[:, 0], tails[:, 1], arrows[:, 0], arrows[:, 1], color=color,
+            angles='xy', scale_units='xy', scale=1, width=0.004, headwidth=4, zorder=4))
+        return middles
+
+    def _update_labels(self, ax=None):
+        for artist in self.label_artists:
+            artist.remove()
+        self.label_artists = []
+        if not self.labels:
+            return
+
+        (left, right), (bottom, top) = self.ax.get_xlim(), self.ax.get_ylim()
+        x, y = self.cities[:, 0], self.cities[:, 1]
+        in_view = np.flatnonzero((x >= min(left, right)) & (x <= max(left, right))
+                                 & (y >= min(bottom, top)) & (y <= max(bottom, top)))
+        if len(in_view) > LABEL_LIMIT:
+            return
+        for i in in_view:
+            self.label_artists.append(self.ax.annotate(
+                self.labels[i], tuple(self.cities[i]), xytext=(5, 0), textcoords='offset points', fontsize=8))
@@ -0,0 +1,1317 @@
+"""Headless TSP/VRP solvers used by the OptimizationApp GUI.
+
+Nothing in here imports tkinter or matplotlib, so the solvers can run in
+batch workers on machines without a display. Every solver takes a NumPy
+distance matrix, a parameter object and an RNG seed and returns a
+SolverResult. Optional progress and improvement callbacks (see below)
+let a caller follow a run and stop it early.
+"""
+import itertools
+import math
+import random
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+
+# Called as progress(iteration, best_cost) every few iterations; returning
+# True stops the run early with stop_reason "cancelled"
+ProgressCallback = Callable[[int, float], Optional[bool]]
+
+# Called as improvement(iteration, best_cost, elapsed, solution) each time a
+# run finds a new best. solution is the tour, or the routes with the depot at
+# both ends, and is never modified afterwards.
+ImprovementCallback = Callable[[int, float, float, list], None]
+
+
+@dataclass
+class SAParams:
+    """Simulated Annealing parameters"""
+    temperature: float = 1000.0
+    cooling_rate: float = 0.9995         # Used by the "geometric" schedule
+    iterations: int = 100000             # Move budget, ignored when time_limit is set
+    neighbor_method: str = "swap"
+    time_limit: float = 0.0              # Seconds of search; 0 means use the move budget
+    stagnation_limit: int = 0            # Stop after this many moves without a new best; 0 disables
+    cooling_schedule: str = "geometric"  # "geometric" or "budget" (reach min_temperature as the budget runs out)
+    min_temperature: float = 0.01
+    reheat_after: int = 0                # Reheat after this many moves without a new best; 0 disables
+    reheat_temperature: float = 0.5      # Fraction of the initial temperature to reheat to
+
+
+@dataclass
+class ACOTSPParams:
+    """Ant Colony Optimization parameters for the TSP"""
+    n_ants: int = 30
+    n_iterations: int = 200
+    decay: float = 0.9
+    alpha: float = 1.0
+    beta: float = 3.0
+    initial_pheromone: float = 0.1
+    pheromone_storage: str = "dense"     # "dense" (n x n) or "sparse" (candidate edges only, needs candidates)
+
+
+@dataclass
+class GAParams:
+    """Genetic Algorithm parameters for the VRP"""
+    population_size: int = 100
+    generations: int = 300
+    mutation_rate: float = 0.2
+    crossover_rate: float = 0.8
+    num_vehicles: int = 5
+    selection_method: str = "tournament"
+    crossover_method: str = "ox"         # "ox" (order crossover) or "pmx" (partially mapped)
+    split_method: str = "optimal"        # "optimal" (Prins split) or "equal" (fixed-size chunks)
+    max_route_stops: int = 0             # Customers per route for the optimal split; 0 picks a default
+    max_route_length: float = 0.0        # Route length limit for the optimal split; 0 disables
+    fitness_cache_size: int = 4096       # Chromosomes whose fitness is remembered; 0 disables
+
+
+@dataclass
+class ACOVRPParams:
+    """Ant Colony Optimization parameters for the VRP"""
+    n_ants: int = 30
+    n_iterations: int = 200
+    decay: float = 0.9
+    alpha: float = 1.0
+    beta: float = 3.0
+    num_vehicles: int = 5
+    initial_pheromone: float = 0.1
+    pheromone_storage: str = "dense"     # "dense" (n x n) or "sparse" (candidate edges only, needs candidates)
+
+
+@dataclass
+class SolverResult:
+    """Outcome of a single solver run"""
+    cost: float
+    tour: Optional[List[int]] = None            # TSP visiting order (return leg implied)
+    routes: Optional[List[List[int]]] = None    # VRP routes, each starting and ending at the depot
+    elapsed: float = 0.0                        # Wall-clock seconds spent searching
+    time_to_best: float = 0.0                   # Seconds until the best solution was found
+    iterations: int = 0
+    stop_reason: str = "iterations"             # "iterations", "time_limit", "stagnation" or "cancelled"
+    counters: Dict[str, int] = field(default_factory=dict)
+    population: Optional[np.ndarray] = None     # Final GA population, for resuming a run
+    final_tour: Optional[List[int]] = None      # Tour SA ended on, for resuming a run
+    replicas: Optional[List[dict]] = None       # Per-replica statistics of parallel runs
+
+
+def route_distance(distances, route):
+    """Calculate the total distance of an open route"""
+    if len(route) < 2:
+        return 0.0
+    route = np.asarray(route)
+    return float(distances[route[:-1], route[1:]].sum())
+
+
+def tour_distance(distances, tour):
+    """Calculate the length of a closed tour, including the return leg"""
+    if len(tour) < 2:
+        return 0.0
+    tour = np.asarray(tour)
+    return float(distances[tour, np.roll(tour, -1)].sum())
+
+
+def swap_delta(dist, tour, i, j):
+    """Cost change of exchanging the cities at tour positions i and j
+
+    dist is a scalar lookup such as distances.item. Only the edges around
+    the two positions are touched, so this is O(1) in the tour length.
+    """
+    n = len(tour)
+    if i > j:
+        i, j = j, i
+    if j - i == n - 1:
+        # First and last position are neighbours on the cycle
+        i, j = j, i
+    a = tour[i]
+    b = tour[j]
+    prev_a = tour[i - 1]
+    next_b = tour[(j + 1) % n]
+    if (j - i) % n == 1:
+        # Adjacent cities: prev_a a b next_b -> prev_a b a next_b
+        return (dist(prev_a, b) + dist(b, a) + dist(a, next_b)
+                - dist(prev_a, a) - dist(a, b) - dist(b, next_b))
+    next_a = tour[i + 1]
+    prev_b = tour[j - 1]
+    return (dist(prev_a, b) + dist(b, next_a) + dist(prev_b, a) + dist(a, next_b)
+            - dist(prev_a, a) - dist(a, next_a) - dist(prev_b, b) - dist(b, next_b))
+
+
+def apply_swap(tour, i, j):
+    """Exchange the cities at tour positions i and j in place"""
+    tour[i], tour[j] = tour[j], tour[i]
+
+
+def insert_delta(dist, tour, i, j):
+    """Cost change of tour.insert(j, tour.pop(i)) on the closed tour"""
+    n = len(tour)
+    city = tour[i]
+    prev_city = tour[i - 1]
+    next_city = tour[(i + 1) % n]
+
+    # Cities either side of insertion index j once the city has been removed
+    before = (j - 1) % (n - 1)
+    after = j % (n - 1)
+    before = tour[before] if before < i else tour[before + 1]
+    after = tour[after] if after < i else tour[after + 1]
+    if before == prev_city and after == next_city:
+        return 0.0
+
+    return (dist(prev_city, next_city) - dist(prev_city, city) - dist(city, next_city)
+            + dist(before, city) + dist(city, after) - dist(before, after))
+
+
+def apply_insert(tour, i, j):
+    """Move the city at position i so that it ends up at position j"""
+    tour.insert(j, tour.pop(i))
+
+
+def two_opt_delta(dist, tour, i, j):
+    """Cost change of reversing the tour segment between positions i+1 and j
+
+    Assumes a symmetric matrix, since the reversed edges inside the
+    segment are taken to keep their length.
+    """
+    if i > j:
+        i, j = j, i
+    a = tour[i]
+    b = tour[i + 1]
+    c = tour[j]
+    e = tour[(j + 1) % len(tour)]
+    return dist(a, c) + dist(b, e) - dist(a, b) - dist(c, e)
+
+
+def apply_two_opt(tour, i, j):
+    """Reverse the tour segment between positions i+1 and j in place"""
+    if i > j:
+        i, j = j, i
+    tour[i + 1:j + 1] = tour[j:i:-1]
+
+
+def or_opt_delta(dist, tour, i, length, j):
+    """Cost change of moving tour[i:i+length] between positions j and j+1"""
+    n = len(tour)
+    prev_city = tour[i - 1]
+    first = tour[i]
+    last = tour[i + length - 1]
+    next_city = tour[(i + length) % n]
+    before = tour[j]
+    after = tour[(j + 1) % n]
+    return (dist(prev_city, next_city) - dist(prev_city, first) - dist(last, next_city)
+            + dist(before, first) + dist(last, after) - dist(before, after))
+
+
+def apply_or_opt(tour, i, length, j):
+    """Move tour[i:i+length] so it sits between positions j and j+1"""
+    segment = tour[i:i + length]
+    del tour[i:i + length]
+    insert_at = j + 1 if j < i else j - length + 1
+    tour[insert_at:insert_at] = segment
+
+
+def sample_pair(rand, n, partner):
+    """A random tour position and a partner position for it"""
+    i = int(rand() * n)
+    return i, partner(i)
+
+
+def sample_swap(rand, n, partner):
+    """Swap the partner into the slot after a random city, making them neighbours"""
+    i = int(rand() * n)
+    j = partner(i)
+    successor = (i + 1) % n
+    return (successor, j) if successor != j else (i, j)
+
+
+def sample_or_opt(rand, n, partner):
+    """A segment of one to three cities and a gap outside it to move it to"""
+    length = 1 + int(rand() * min(3, n - 3))
+    i = int(rand() * (n - length + 1))
+    # The segment goes after its partner unless that gap is right before the
+    # segment or inside it, in which case any other gap is picked at random
+    j = partner(i)
+    if (j - i + 1) % n <= length:
+        j = (i + length + int(rand() * (n - length - 1))) % n
+    return i, length, j
+
+
+def pair_positions(i, j):
+    """Tour positions whose city may change under a swap"""
+    return (i, j)
+
+
+def span_positions(i, j):
+    """Tour positions whose city may change under an insert or 2-opt move"""
+    return range(min(i, j), max(i, j) + 1)
+
+
+def or_opt_positions(i, length, j):
+    """Tour positions whose city may change under an Or-opt move"""
+    return range(min(i, j + 1), max(i + length - 1, j) + 1)
+
+
+# Neighbourhood name -> (move sampler, delta evaluation, in-place application,
+# positions touched by the move)
+NEIGHBORHOODS = {
+    "swap": (sample_swap, swap_delta, apply_swap, pair_positions),
+    "insert": (sample_pair, insert_delta, apply_insert, span_positions),
+    "2-opt": (sample_pair, two_opt_delta, apply_two_opt, span_positions),
+    "or-opt": (sample_or_opt, or_opt_delta, apply_or_opt, or_opt_positions),
+}
+
+
+# Clock checks and time-based temperature updates happen every this many moves
+SA_CHECK_INTERVAL = 256
+
+COOLING_SCHEDULES = ("geometric", "budget")
+
+
+def simulated_annealing(distances, params=None, seed=None, progress=None, candidates=None, initial_tour=None,
+                        improvement=None):
+    """Solve TSP using Simulated Annealing
+
+    Moves are scored from the handful of edges they change and only
+    applied to the tour once accepted, so each iteration costs O(1)
+    instead of a full copy and re-evaluation of the tour.
+
+    The run ends when the move budget (or time_limit) is used up or when
+    stagnation_limit moves pass without a new best tour. The temperature
+    never drops below min_temperature, so the search keeps going at low
+    temperature instead of stopping early.
+
+    With candidates, an (n, k) array of each city's nearest neighbours, a
+    move pairs a random city with one of its neighbours instead of with
+    any city in the tour.
+
+    initial_tour starts the search from a given tour (e.g. the final_tour
+    of an earlier run) instead of a random shuffle.
+    """
+    params = params or SAParams()
+    if params.neighbor_method not in NEIGHBORHOODS:
+        raise ValueError(f"Unknown neighbor method {params.neighbor_method!r}, "
+                         f"expected one of: {', '.join(NEIGHBORHOODS)}")
+    distances = np.asarray(distances)
+    num_cities = len(distances)
+    rng = random.Random(seed)
+    rand = rng.random
+
+    # Initial solution: random permutation
+    if initial_tour is not None:
+        current_solution = [int(city) for city in initial_tour]
+    else:
+        current_solution = list(range(num_cities))
+        rng.shuffle(current_solution)
+    if num_cities < 3:
+        return SolverResult(cost=tour_distance(distances, current_solution), tour=current_solution,
+                            final_tour=current_solution)
+    current_distance = tour_distance(distances, current_solution)
+
+    sample_move, move_delta, apply_move, touched = NEIGHBORHOODS[params.neighbor_method]
+    dist = distances.item
+
+    if candidates is not None and len(candidates[0]):
+        # Track where every city sits so a neighbour's position is O(1) to find
+        neighbor_lists = np.asarray(candidates).tolist()
+        k = len(neighbor_lists[0])
+        position = [0] * num_cities
+        for index, city in enumerate(current_solution):
+            position[city] = index
+
+        def partner(i):
+            return position[neighbor_lists[current_solution[i]][int(rand() * k)]]
+    else:
+        position = None
+
+        def partner(i):
+            j = int(rand() * (num_cities - 1))
+            return j + 1 if j >= i else j
+
+    best_solution = current_solution[:]
+    best_distance = current_distance
+    accepted = 0
+    reheats = 0
+    since_best = 0
+    since_reheat = 0
+
+    time_limit = params.time_limit
+    min_temperature = params.min_temperature
+    budget_schedule = params.cooling_schedule == "budget"
+
+    # The budget schedule cools geometrically from the start temperature to
+    # min_temperature over what is left of the budget. Reheating restarts
+    # it from the reheat temperature at the current point in the budget.
+    temperature = params.temperature
+    schedule_temp = temperature
+    schedule_start = 0.0
+    if budget_schedule and time_limit <= 0:
+        cooling_rate = (min_temperature / temperature) ** (1.0 / max(1, params.iterations))
+    elif budget_schedule:
+        cooling_rate = 1.0  # Temperature follows the clock instead
+    else:
+        cooling_rate = params.cooling_rate
+
+    start_time = time.perf_counter()
+    time_to_best = 0.0
+    stop_reason = "iterations"
+
+    iteration = 0
+    moves = range(params.iterations) if time_limit <= 0 else itertools.count()
+    for iteration in moves:
+        if iteration % SA_CHECK_INTERVAL == 0 and time_limit > 0:
+            elapsed = time.perf_counter() - start_time
+            if elapsed >= time_limit:
+                stop_reason = "time_limit"
+                break
+            if budget_schedule:
+                fraction = (elapsed / time_limit - schedule_start) / (1.0 - schedule_start)
+                temperature = max(schedule_temp * (min_temperature / schedule_temp) ** fraction,
+                                  min_temperature)
+
+        if progress is not None and iteration % 1000 == 0 and progress(iteration, best_distance):
+            stop_reason = "cancelled"
+            break
+
+        # Decide if we should accept the move
+        move = sample_move(rand, num_cities, partner)
+        delta = move_delta(dist, current_solution, *move)
+        if delta < 0 or rand() < math.exp(-delta / temperature):
+            apply_move(current_solution, *move)
+            if position is not None:
+                for index in touched(*move):
+                    position[current_solution[index]] = index
+            current_distance += delta
+            accepted += 1
+
+            # Update best solution if needed
+            if current_distance < best_distance:
+                best_solution = current_solution[:]
+                best_distance = current_distance
+                time_to_best = time.perf_counter() - start_time
+                if improvement is not None:
+                    improvement(iteration, best_distance, time_to_best, best_solution)
+                since_best = 0
+                since_reheat = 0
+
+        since_best += 1
+        since_reheat += 1
+        if params.stagnation_limit and since_best >= params.stagnation_limit:
+            stop_reason = "stagnation"
+            break
+
+        if params.reheat_after and since_reheat >= params.reheat_after:
+            # Stuck in a basin: heat up again and resume cooling from there
+            temperature = params.temperature * params.reheat_temperature
+            since_reheat = 0
+            reheats += 1
+            if budget_schedule and time_limit > 0:
+                schedule_temp = temperature
+                schedule_start = min((time.perf_counter() - start_time) / time_limit, 0.999)
+            elif budget_schedule:
+                remaining = max(1, params.iterations - iteration - 1)
+                cooling_rate = (min_temperature / temperature) ** (1.0 / remaining)
+
+        # Cool down
+        if temperature > min_temperature:
+            temperature = max(temperature * cooling_rate, min_temperature)
+
+    return SolverResult(
+        # Recomputed so rounding in the running deltas never leaks out
+        cost=tour_distance(distances, best_solution),
+        tour=best_solution,
+        elapsed=time.perf_counter() - start_time,
+        time_to_best=time_to_best,
+        iterations=iteration + 1,
+        stop_reason=stop_reason,
+        counters={"evaluations": iteration + 1, "accepted": accepted, "reheats": reheats},
+        final_tour=current_solution,
+    )
+
+
+def heuristic_matrix(distances, beta):
+    """Desirability eta^beta of every edge, with eta = 1 / distance"""
+    return (1.0 / np.maximum(distances, 0.1)) ** beta
+
+
+PHEROMONE_STORAGES = ("dense", "sparse")
+
+
+class SparsePheromone:
+    """Pheromone kept only on candidate edges, for instances too large for n x n
+
+    table is an (n, k + 1) float array: column j < k holds the trail on
+    the edge from city i to candidates[i, j], and the last column the
+    value every other edge leaving i reads as. Evaporation scales the whole
+    table, n * (k + 1) entries; deposits on non-candidate edges are
+    dropped. The table is used in place, so it can live in shared memory.
+    """
+
+    def __init__(self, candidates, table):
+        self.candidates = np.asarray(candidates)
+        self.table = table
+
+    @staticmethod
+    def new_table(num_cities, k, value):
+        return np.full((num_cities, k + 1), float(value))
+
+    @property
+    def candidate_values(self):
+        """(n, k) trail on each city's candidate edges"""
+        return self.table[:, :-1]
+
+    def __imul__(self, factor):
+        # Evaporation, defaults included
+        self.table *= factor
+        return self
+
+    def rows(self, cities):
+        """Dense trail rows of the given cities, shape (len(cities), n)"""
+        num_cities = len(self.table)
+        dense = np.repeat(self.table[cities, -1:], num_cities, axis=1)
+        dense[np.arange(len(cities))[:, None], self.candidates[cities]] = self.table[cities, :-1]
+        return dense
+
+    def lookup(self, city, options):
+        """Trail on the edges from one city to each of options"""
+        near = self.candidates[city]
+        if len(options) > len(near):
+            return self.rows([city])[0, options]
+        match = options[:, None] == near[None, :]
+        return np.where(match.any(axis=1), self.table[city, match.argmax(axis=1)], self.table[city, -1])
+
+    def deposit(self, from_cities, to_cities, amounts):
+        """Add amounts to the candidate edges among from -> to"""
+        match = self.candidates[from_cities] == to_cities[:, None]
+        hit = match.any(axis=1)
+        np.add.at(self.table, (from_cities[hit], match[hit].argmax(axis=1)), amounts[hit])
+
+
+def deposit_pheromone(pheromone, from_cities, to_cities, amounts):
+    """Add pheromone to a batch of edges and their mirrors in one scatter-add
+
+    Repeated edges accumulate, so the arrays can hold the edges of every
+    ant in the colony at once. pheromone is a dense array or a
+    SparsePheromone.
+    """
+    if isinstance(pheromone, SparsePheromone):
+        pheromone.deposit(np.concatenate([from_cities, to_cities]), np.concatenate([to_cities, from_cities]),
+                          np.concatenate([amounts, amounts]))
+        return
+    np.add.at(pheromone,
+              (np.concatenate([from_cities, to_cities]), np.concatenate([to_cities, from_cities])),
+              np.concatenate([amounts, amounts]))
+
+
+def _draw(weights, np_rng):
+    """Column sampled from each row of weights in proportion to its entries
+
+    Returns the sampled columns and a mask of rows whose weights sum to 0.
+    """
+    cumulative = np.cumsum(weights, axis=1)
+    totals = cumulative[:, -1]
+    draws = np_rng.random(len(weights)) * totals
+    return np.argmax(cumulative > draws[:, None], axis=1), ~(totals > 0)
+
+
+def construct_tours(num_cities, n_ants, choice_rows, np_rng, candidates=None, candidate_info=None):
+    """Build one tour per ant, advancing the whole colony a step at a time
+
+    choice_rows(cities) returns the choice-info rows tau^alpha * eta^beta
+    for the given cities. Each step masks out visited cities and samples
+    the next city with a cumulative-sum draw.
+
+    With candidates, an (n, k) array of each city's nearest neighbours, and
+    candidate_info, the matching (n, k) choice info, ants only look at the
+    unvisited candidates of their current city and fall back to the full
+    row once all of those are visited.
+    Returns an (n_ants, n) array of city indices.
+    """
+    ants = np.arange(n_ants)
+    tours = np.empty((n_ants, num_cities), dtype=np.int32)
+    unvisited = np.ones((n_ants, num_cities), dtype=bool)
+
+    # Start at a random city
+    current = np_rng.integers(num_cities, size=n_ants)
+    tours[:, 0] = current
+    unvisited[ants, current] = False
+
+    for step in range(1, num_cities):
+        if candidates is not None:
+            near = candidates[current]
+            picked, full = _draw(candidate_info[current] * unvisited[ants[:, None], near], np_rng)
+            next_city = near[ants, picked]
+        else:
+            next_city = np.empty(n_ants, dtype=np.intp)
+            full = np.ones(n_ants, dtype=bool)
+
+        if full.any():
+            next_city[full], _ = _draw(choice_rows(current[full]) * unvisited[full], np_rng)
+
+        # If every weight underflowed to 0, choose an unvisited city at random
+        stuck = ~unvisited[ants, next_city]
+        if stuck.any():
+            noise = np_rng.random((int(stuck.sum()), num_cities)) * unvisited[stuck]
+            next_city[stuck] = np.argmax(noise, axis=1)
+
+        tours[:, step] = next_city
+        unvisited[ants, next_city] = False
+        current = next_city
+
+    return tours
+
+
+def aco_tsp(distances, params=None, seed=None, progress=None, candidates=None, pheromone=None,
+            improvement=None):
+    """Solve TSP using Ant Colony Optimization
+
+    With candidates, an (n, k) array of each city's nearest neighbours,
+    tour construction only scores those k cities per step. Sparse
+    pheromone storage also keeps trails and heuristic values for those
+    edges only, so memory and evaporation grow with n * k.
+
+    pheromone, an (n, n) float array (an (n, k + 1) SparsePheromone table
+    with sparse storage), continues from an earlier trail instead of
+    initial_pheromone and is updated in place.
+    """
+    params = params or ACOTSPParams()
+    distances = np.asarray(distances)
+    num_cities = len(distances)
+    np_rng = np.random.default_rng(seed)
+    if candidates is not None and len(candidates[0]):
+        candidates = np.asarray(candidates)
+        candidate_rows = np.arange(num_cities)[:, None]
+    else:
+        candidates = None
+    sparse = params.pheromone_storage == "sparse"
+    if sparse and candidates is None:
+        raise ValueError("Sparse pheromone storage needs candidate lists")
+
+    # Initialize pheromone matrix
+    if pheromone is None:
+        pheromone = (SparsePheromone.new_table(num_cities, candidates.shape[1], params.initial_pheromone) if sparse
+                     else np.ones((num_cities, num_cities)) * params.initial_pheromone)
+    if sparse:
+        pheromone = SparsePheromone(candidates, pheromone)
+        candidate_eta = heuristic_matrix(distances[candidate_rows, candidates], params.beta)
+    else:
+        eta_beta = heuristic_matrix(distances, params.beta)
+
+    best_solution = None
+    best_distance = float('inf')
+    tours_built = 0
+
+    start_time = time.perf_counter()
+    time_to_best = 0.0
+
+    stop_reason = "iterations"
+    completed = 0
+    for iteration in range(params.n_iterations):
+        if progress is not None and iteration % 10 == 0 and progress(iteration, best_distance):
+            stop_reason = "cancelled"
+            break
+        completed += 1
+
+        # Probability weights are fixed for the whole iteration
+        if candidates is None:
+            choice_info = pheromone * eta_beta if params.alpha == 1 else pheromone ** params.alpha * eta_beta
+            tours = construct_tours(num_cities, params.n_ants, lambda rows: choice_info[rows], np_rng)
+        elif sparse:
+            # Full rows are only assembled for ants that ran out of candidates
+            candidate_info = pheromone.candidate_values ** params.alpha * candidate_eta
+            tours = construct_tours(num_cities, params.n_ants,
+                                    lambda rows: (pheromone.rows(rows) ** params.alpha
+                                                  * heuristic_matrix(distances[rows], params.beta)),
+                                    np_rng, candidates, candidate_info)
+        else:
+            # Only the candidate edges are needed up front, full rows on fallback
+            candidate_info = (pheromone[candidate_rows, candidates] ** params.alpha
+                              * eta_beta[candidate_rows, candidates])
+            tours = construct_tours(num_cities, params.n_ants,
+                                    lambda rows: pheromone[rows] ** params.alpha * eta_beta[rows],
+                                    np_rng, candidates, candidate_info)
+        ant_distances = distances[tours, np.roll(tours, -1, axis=1)].sum(axis=1)
+        tours_built += len(tours)
+
+        # Update best solution if needed
+        best_ant = int(np.argmin(ant_distances))
+        if ant_distances[best_ant] < best_distance:
+            best_solution = tours[best_ant].tolist() + [int(tours[best_ant, 0])]
+            best_distance = float(ant_distances[best_ant])
+            time_to_best = time.perf_counter() - start_time
+            if improvement is not None:
+                improvement(iteration, best_distance, time_to_best, best_solution[:-1])
+
+        # Update pheromone levels
+        pheromone *= params.decay
+
+        # Add new pheromones from ant trails, plus extra on the best tour (elitist strategy)
+        best_tour = np.asarray(best_solution[:-1])
+        deposit_pheromone(
+            pheromone,
+            np.concatenate([tours.ravel(), best_tour]),
+            np.concatenate([np.roll(tours, -1, axis=1).ravel(), np.roll(best_tour, -1)]),
+            np.concatenate([np.repeat(1.0 / ant_distances, num_cities),
+                            np.full(num_cities, 2.0 / best_distance)]),
+        )
+
+    return SolverResult(
+        cost=best_distance,
+        tour=best_solution[:-1] if best_solution else None,
+        elapsed=time.perf_counter() - start_time,
+        time_to_best=time_to_best,
+        iterations=completed,
+        stop_reason=stop_reason,
+        counters={"tours_built": tours_built},
+    )
+
+
+def split_into_routes(chromosome, num_vehicles):
+    """Split a chromosome into multiple vehicle routes"""
+    route_size = len(chromosome) // num_vehicles
+    routes = []
+
+    for i in range(num_vehicles):
+        start_idx = i * route_size
+        end_idx = (i + 1) * route_size if i < num_vehicles - 1 else len(chromosome)
+        routes.append(chromosome[start_idx:end_idx])
+
+    return routes
+
+
+def routes_distance(distances, routes, depot):
+    """Total distance of a set of routes that each start and end at the depot"""
+    total_distance = 0.0
+    for route in routes:
+        if len(route):  # Check if route is not empty
+            total_distance += route_distance(distances, [depot] + list(route) + [depot])
+    return total_distance
+
+
+# With no explicit per-route stop limit, optimal splitting allows each route
+# this much more than an even share of the customers. Without some limit the
+# best split of a giant tour is a single route, since depot legs only add length.
+AUTO_ROUTE_SLACK = 1.25
+
+SPLIT_METHODS = ("optimal", "equal")
+
+
+def auto_route_stops(num_customers, num_vehicles):
+    """Default stop limit per route for optimal splitting"""
+    return max(1, math.ceil(AUTO_ROUTE_SLACK * num_customers / num_vehicles))
+
+
+def _split_dp(distances, population, depot, max_vehicles=None, max_stops=0, max_length=0.0, track=False):
+    """Bellman shortest-path split of every giant tour in a 2-D population
+
+    A route serving tour[i:j] costs depot->tour[i], the legs along the tour
+    up to tour[j-1], and tour[j-1]->depot. Routes may hold at most
+    max_stops customers and be at most max_length long (0 disables either).
+    With max_vehicles, at most that many routes are used.
+
+    Returns the best split cost of every row (inf if no split satisfies
+    the limits) and, with track, predecessor tables for split_routes.
+    """
+    count, m = population.shape
+    window = min(max_stops or m, m)
+    to_first = distances[depot, population]
+    from_last = distances[population, depot]
+    along = np.zeros((count, m))
+    if m > 1:
+        np.cumsum(distances[population[:, :-1], population[:, 1:]], axis=1, out=along[:, 1:])
+
+    # Length of the route tour[i:j] is opening[:, i] + closing[:, j - 1]
+    opening = to_first - along
+    closing = along + from_last
+
+    if max_vehicles:
+        # One layer per vehicle, each built from the previous one at once
+        layers = []
+        previous = np.full((count, m + 1), np.inf)
+        previous[:, 0] = 0.0
+        best = np.full(count, np.inf)
+        for _ in range(max_vehicles):
+            start_cost = previous[:, :m] + opening
+            cheapest = np.full((count, m), np.inf)
+            chosen = np.zeros((count, m), dtype=np.int32) if track else None
+            for stops in range(1, window + 1):
+                candidate = start_cost[:, :m - stops + 1]
+                if max_length:
+                    too_long = opening[:, :m - stops + 1] + closing[:, stops - 1:] > max_length
+                    candidate = np.where(too_long, np.inf, candidate)
+                if track:
+                    better = candidate < cheapest[:, stops - 1:]
+                    chosen[:, stops - 1:][better] = stops
+                np.minimum(cheapest[:, stops - 1:], candidate, out=cheapest[:, stops - 1:])
+            current = np.full((count, m + 1), np.inf)
+            current[:, 1:] = cheapest + closing
+            best = np.minimum(best, current[:, m])
+            layers.append((current[:, m], chosen))
+            previous = current
+        return best, layers
+
+    # Unlimited vehicles: one pass over the tour positions
+    value = np.full((count, m + 1), np.inf)
+    value[:, 0] = 0.0
+    chosen = np.zeros((count, m + 1), dtype=np.int32) if track else None
+    for j in range(1, m + 1):
+        lo = max(0, j - window)
+        candidate = value[:, lo:j] + opening[:, lo:j]
+        if max_length:
+            too_long = opening[:, lo:j] + closing[:, j - 1:j] > max_length
+            candidate = np.where(too_long, np.inf, candidate)
+        pick = np.argmin(candidate, axis=1)
+        value[:, j] = candidate[np.arange(count), pick] + closing[:, j - 1]
+        if track:
+            chosen[:, j] = lo + pick
+    return value[:, m], chosen
+
+
+def split_fitness(distances, population, depot, max_vehicles=None, max_stops=0, max_length=0.0):
+    """Cost of the optimal split of every chromosome in a 2-D population"""
+    return _split_dp(distances, population, depot, max_vehicles, max_stops, max_length)[0]
+
+
+def optimal_split(distances, chromosome, depot, max_vehicles=None, max_stops=0, max_length=0.0):
+    """Split one giant tour into its cheapest set of routes (Prins split)
+
+    Returns the routes as arrays of customers without the depot, or an
+    empty list if no split satisfies the limits.
+    """
+    chromosome = np.asarray(chromosome)
+    cost, tables = _split_dp(distances, chromosome[None, :], depot, max_vehicles,
+                             max_stops, max_length, track=True)
+    if not np.isfinite(cost[0]):
+        return []
+
+    routes = []
+    end = len(chromosome)
+    if max_vehicles:
+        # Use the fewest layers that reach the optimum, then walk back through them
+        layer = next(k for k, (final, _) in enumerate(tables) if final[0] == cost[0])
+        for k in range(layer, -1, -1):
+            stops = int(tables[k][1][0, end - 1])
+            routes.append(chromosome[end - stops:end])
+            end -= stops
+    else:
+        while end > 0:
+            start = int(tables[0, end])
+            routes.append(chromosome[start:end])
+            end = start
+    return routes[::-1]
+
+
+def route_bounds(length, num_vehicles):
+    """Start and end (exclusive) of each non-empty route from split_into_routes"""
+    route_size = length // num_vehicles
+    bounds = np.append(np.arange(num_vehicles) * route_size, length)
+    starts = bounds[:-1]
+    ends = bounds[1:]
+    keep = ends > starts
+    return starts[keep], ends[keep]
+
+
+def population_fitness(distances, population, depot, num_vehicles):
+    """Total route distance of every chromosome in a 2-D population array
+
+    Gathers every consecutive city pair of every row in one indexing
+    operation, drops the pairs that straddle a route boundary and adds
+    the depot legs at each route's start and end instead.
+    """
+    starts, ends = route_bounds(population.shape[1], num_vehicles)
+    legs = distances[population[:, :-1], population[:, 1:]]
+    inside_route = np.ones(legs.shape[1], dtype=bool)
+    inside_route[starts[1:] - 1] = False
+    return (legs[:, inside_route].sum(axis=1)
+            + distances[depot, population[:, starts]].sum(axis=1)
+            + distances[population[:, ends - 1], depot].sum(axis=1))
+
+
+class FitnessCache:
+    """Bounded least-recently-used memo of chromosome fitness
+
+    Keys are the raw bytes of each chromosome row, which hash quickly and
+    compare exactly, so a hash collision can never return a wrong fitness.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def evaluate(self, population, fitness_function):
+        """Fitness of every row, calling fitness_function only on unseen rows
+
+        fitness_function takes a 2-D array of chromosomes and returns their
+        fitness; duplicates within the population are evaluated once.
+        """
+        fitness_scores = np.empty(len(population))
+        pending = {}
+        for index, row in enumerate(population):
+            key = row.tobytes()
+            cached = self.entries.get(key)
+            if cached is not None:
+                self.entries.move_to_end(key)
+                fitness_scores[index] = cached
+                self.hits += 1
+            elif key in pending:
+                pending[key].append(index)
+                self.hits += 1
+            else:
+                pending[key] = [index]
+                self.misses += 1
+
+        if pending:
+            first = [indices[0] for indices in pending.values()]
+            computed = fitness_function(population[first])
+            for (key, indices), value in zip(pending.items(), computed.tolist()):
+                fitness_scores[indices] = value
+                self.entries[key] = value
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+        return fitness_scores
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def tournament_selection(population, fitness_scores, rng, tournament_size=3):
+    """Tournament selection for GA"""
+    tournament_indices = rng.sample(range(len(population)), tournament_size)
+    tournament_fitness = [fitness_scores[i] for i in tournament_indices]
+    winner_idx = tournament_indices[tournament_fitness.index(min(tournament_fitness))]
+    return population[winner_idx]
+
+
+def roulette_selection(population, fitness_scores, np_rng):
+    """Roulette wheel selection for GA"""
+    # Since we want to minimize distance, invert fitness scores
+    # Add a small constant to avoid division by zero
+    inverted_scores = 1.0 / (np.asarray(fitness_scores) + 0.1)
+
+    # Infeasible chromosomes cost inf and get no weight; if none is feasible pick uniformly
+    total = inverted_scores.sum()
+    if total == 0:
+        return population[np_rng.integers(len(population))]
+
+    # Normalize to get probabilities
+    selection_probs = inverted_scores / total
+
+    selected_idx = np_rng.choice(len(population), p=selection_probs)
+    return population[selected_idx]
+
+
+def _crossover_points(size, rng):
+    """Two sorted cut points, both inclusive ends of the copied segment"""
+    cxpoint1 = rng.randint(0, size - 1)
+    cxpoint2 = rng.randint(0, size - 1)
+    if cxpoint1 > cxpoint2:
+        cxpoint1, cxpoint2 = cxpoint2, cxpoint1
+    return cxpoint1, cxpoint2
+
+
+def _ox_child(keep, fill, cxpoint1, cxpoint2):
+    """Child with keep's segment in place and the rest in fill's order"""
+    size = len(keep)
+    child = np.empty_like(keep)
+    child[cxpoint1:cxpoint2 + 1] = keep[cxpoint1:cxpoint2 + 1]
+
+    # Cities already placed by the copied segment
+    placed = np.zeros(int(max(keep.max(), fill.max())) + 1, dtype=bool)
+    placed[keep[cxpoint1:cxpoint2 + 1]] = True
+
+    # Walk fill from just after the segment, wrapping around, and drop the
+    # placed cities; what is left fills the free slots in the same order
+    order = np.roll(fill, -(cxpoint2 + 1))
+    free_slots = np.roll(np.arange(size), -(cxpoint2 + 1))[:size - (cxpoint2 - cxpoint1 + 1)]
+    child[free_slots] = order[~placed[order]]
+    return child
+
+
+def _pmx_child(keep, fill, cxpoint1, cxpoint2):
+    """Child with keep's segment in place and fill's cities mapped around it"""
+    child = fill.copy()
+    segment = keep[cxpoint1:cxpoint2 + 1]
+    child[cxpoint1:cxpoint2 + 1] = segment
+
+    size = int(max(keep.max(), fill.max())) + 1
+    in_segment = np.zeros(size, dtype=bool)
+    in_segment[segment] = True
+    # Maps a city of keep's segment to the city of fill at the same position
+    mapping = np.zeros(size, dtype=keep.dtype)
+    mapping[segment] = fill[cxpoint1:cxpoint2 + 1]
+
+    # Only cities outside the segment that are duplicated by it need fixing
+    outside = np.ones(len(child), dtype=bool)
+    outside[cxpoint1:cxpoint2 + 1] = False
+    for i in np.flatnonzero(outside & in_segment[fill]):
+        city = child[i]
+        while in_segment[city]:
+            city = mapping[city]
+        child[i] = city
+    return child
+
+
+def order_crossover(parent1, parent2, rng):
+    """Order crossover (OX) for permutation encoding, O(n) per child"""
+    cxpoint1, cxpoint2 = _crossover_points(len(parent1), rng)
+    return (_ox_child(parent1, parent2, cxpoint1, cxpoint2),
+            _ox_child(parent2, parent1, cxpoint1, cxpoint2))
+
+
+def pmx_crossover(parent1, parent2, rng):
+    """Partially mapped crossover (PMX) for permutation encoding"""
+    cxpoint1, cxpoint2 = _crossover_points(len(parent1), rng)
+    return (_pmx_child(parent1, parent2, cxpoint1, cxpoint2),
+            _pmx_child(parent2, parent1, cxpoint1, cxpoint2))
+
+
+CROSSOVERS = {
+    "ox": order_crossover,
+    "pmx": pmx_crossover,
+}
+
+
+def mutate(chromosome, rng, neighbor_lists=None):
+    """Swap mutation for permutation encoding
+
+    With neighbor_lists (each city's nearest neighbours), one of a random
+    city's neighbours is swapped into the slot after it, so the mutation
+    tends to create a short edge instead of two random ones.
+    """
+    if neighbor_lists is not None:
+        pos1 = rng.randrange(len(chromosome))
+        near = neighbor_lists[chromosome[pos1]]
+        # Empty when the neighbour is the depot, then fall back to a random swap
+        found = np.flatnonzero(chromosome == near[rng.randrange(len(near))])
+        pos1 = (pos1 + 1) % len(chromosome)
+        if len(found) and pos1 != found[0]:
+            pos2 = found[0]
+            chromosome[pos1], chromosome[pos2] = chromosome[pos2], chromosome[pos1]
+            return chromosome
+
+    pos1, pos2 = rng.sample(range(len(chromosome)), 2)
+    chromosome[pos1], chromosome[pos2] = chromosome[pos2], chromosome[pos1]
+    return chromosome
+
+
+def split_limits(num_customers, params):
+    """(max_vehicles, max_stops, max_length) for optimal splitting under GAParams"""
+    return (params.num_vehicles,
+            params.max_route_stops or auto_route_stops(num_customers, params.num_vehicles),
+            params.max_route_length)
+
+
+def check_split_limits(distances, depot, params):
+    """Raise ValueError when no split under GAParams can serve every customer"""
+    if params.split_method != "optimal":
+        return
+    num_customers = len(distances) - 1
+    max_vehicles, max_stops, max_length = split_limits(num_customers, params)
+    if max_vehicles and max_vehicles * max_stops < num_customers:
+        raise ValueError(f"{max_vehicles} vehicles with at most {max_stops} stops "
+                         f"cannot serve {num_customers} customers")
+    if max_length:
+        round_trips = np.asarray(distances[depot]) + np.asarray(distances[:, depot])
+        longest = float(np.delete(round_trips, depot).max(initial=0.0))
+        if longest > max_length:
+            raise ValueError(f"Max route length {max_length:g} is shorter than the longest "
+                             f"depot round trip ({longest:.2f})")
+
+
+def chromosome_fitness(distances, population, depot, params):
+    """Fitness of every chromosome in a 2-D population under GAParams"""
+    if params.split_method == "optimal":
+        return split_fitness(distances, population, depot, *split_limits(population.shape[1], params))
+    return population_fitness(distances, population, depot, params.num_vehicles)
+
+
+def genetic_algorithm(distances, params=None, depot=0, seed=None, progress=None, candidates=None,
+                      initial_population=None, improvement=None):
+    """Solve VRP using Genetic Algorithm
+
+    Chromosomes are giant tours over all customers. With the "optimal"
+    split method each one is cut into at most num_vehicles routes by
+    optimal_split, otherwise into equal chunks.
+
+    With candidates, an (n, k) array of each city's nearest neighbours,
+    mutation pulls a neighbour next to a random city instead of swapping
+    two random cities.
+
+    initial_population continues from the population of an earlier run
+    (SolverResult.population) instead of starting from random tours.
+    """
+    params = params or GAParams()
+    distances = np.asarray(distances)
+    num_cities = len(distances)
+    rng = random.Random(seed)
+    np_rng = np.random.default_rng(seed)
+    neighbor_lists = np.asarray(candidates).tolist() if candidates is not None and len(candidates[0]) else None
+
+    start_time = time.perf_counter()
+    time_to_best = 0.0
+    evaluations = 0
+
+    crossover = CROSSOVERS.get(params.crossover_method, order_crossover)
+    optimal = params.split_method == "optimal"
+    limits = split_limits(num_cities - 1, params)
+    check_split_limits(distances, depot, params)
+
+    def fitness_function(chromosomes):
+        return chromosome_fitness(distances, chromosomes, depot, params)
+
+    # Elites and uncrossed children repeat chromosomes across generations
+    cache = FitnessCache(params.fitness_cache_size) if params.fitness_cache_size > 0 else None
+
+    # Generate initial population as one int32 row per chromosome (excluding depot)
+    if initial_population is not None:
+        population = np.array(initial_population, dtype=np.int32)
+    else:
+        non_depot_cities = np.array([city for city in range(num_cities) if city != depot], dtype=np.int32)
+        population = np.array([np_rng.permutation(non_depot_cities) for _ in range(params.population_size)],
+                              dtype=np.int32).reshape(params.population_size, len(non_depot_cities))
+    new_population = np.empty_like(population)
+
+    best_solution = None
+    best_fitness = float('inf')
+
+    stop_reason = "iterations"
+    completed = 0
+    for generation in range(params.generations):
+        if progress is not None and generation % 10 == 0 and progress(generation, best_fitness):
+            stop_reason = "cancelled"
+            break
+        completed += 1
+
+        # Evaluate fitness for the whole population at once
+        if cache is not None:
+            misses = cache.misses
+            fitness_scores = cache.evaluate(population, fitness_function)
+            evaluations += cache.misses - misses
+        else:
+            fitness_scores = fitness_function(population)
+            evaluations += len(population)
+
+        # Update best solution if needed
+        elite_idx = int(np.argmin(fitness_scores))
+        if fitness_scores[elite_idx] < best_fitness:
+            best_fitness = float(fitness_scores[elite_idx])
+            if optimal:
+                best_solution = optimal_split(distances, population[elite_idx].copy(), depot, *limits)
+            else:
+                best_solution = split_into_routes(population[elite_idx].copy(), params.num_vehicles)
+            time_to_best = time.perf_counter() - start_time
+            if improvement is not None:
+                improvement(generation, best_fitness, time_to_best,
+                            [[depot] + route.tolist() + [depot] for route in best_solution if len(route)])
+
+        # Elitism: keep the best chromosome
+        new_population[0] = population[elite_idx]
+        filled = 1
+
+        while filled < params.population_size:
+            if params.selection_method == "tournament":
+                parent1 = tournament_selection(population, fitness_scores, rng)
+                parent2 = tournament_selection(population, fitness_scores, rng)
+            else:  # Roulette wheel selection
+                parent1 = roulette_selection(population, fitness_scores, np_rng)
+                parent2 = roulette_selection(population, fitness_scores, np_rng)
+
+            # Crossover
+            if rng.random() < params.crossover_rate:
+                child1, child2 = crossover(parent1, parent2, rng)
+            else:
+                child1, child2 = parent1.copy(), parent2.copy()
+
+            # Mutation
+            if rng.random() < params.mutation_rate:
+                child1 = mutate(child1, rng, neighbor_lists)
+            if rng.random() < params.mutation_rate:
+                child2 = mutate(child2, rng, neighbor_lists)
+
+            new_population[filled] = child1
+            filled += 1
+            if filled < params.population_size:
+                new_population[filled] = child2
+                filled += 1
+
+        # Reuse the old population's buffer for the next generation
+        population, new_population = new_population, population
+
+    # Add depot to start and end of each route
+    routes = [[depot] + route.tolist() + [depot] for route in best_solution or [] if len(route)]
+
+    return SolverResult(
+        cost=best_fitness,
+        routes=routes,
+        elapsed=time.perf_counter() - start_time,
+        time_to_best=time_to_best,
+        iterations=completed,
+        stop_reason=stop_reason,
+        counters={"evaluations": evaluations,
+                  "cache_hits": cache.hits if cache is not None else 0,
+                  "cache_misses": cache.misses if cache is not None else 0},
+        population=population,
+    )
+
+
+def aco_vrp(distances, params=None, depot=0, seed=None, progress=None, candidates=None, pheromone=None,
+            improvement=None):
+    """Solve VRP using Ant Colony Optimization
+
+    With candidates, an (n, k) array of each city's nearest neighbours,
+    each step only scores the unvisited neighbours of the current city and
+    falls back to all unvisited cities once those run out. Sparse
+    pheromone storage keeps trails for those edges only.
+
+    pheromone, an (n, n) float array (an (n, k + 1) SparsePheromone table
+    with sparse storage), continues from an earlier trail instead of
+    initial_pheromone and is updated in place.
+    """
+    params = params or ACOVRPParams()
+    distances = np.asarray(distances)
+    num_cities = len(distances)
+    num_vehicles = params.num_vehicles
+    rng = random.Random(seed)
+    np_rng = np.random.default_rng(seed)
+    if candidates is not None and not len(candidates[0]):
+        candidates = None
+    sparse = params.pheromone_storage == "sparse"
+    if sparse and candidates is None:
+        raise ValueError("Sparse pheromone storage needs candidate lists")
+
+    # Initialize pheromone matrix
+    if pheromone is None:
+        pheromone = (SparsePheromone.new_table(num_cities, len(candidates[0]), params.initial_pheromone) if sparse
+                     else np.ones((num_cities, num_cities)) * params.initial_pheromone)
+    if sparse:
+        pheromone = SparsePheromone(candidates, pheromone)
+
+        def edge_weights(city, options):
+            return (pheromone.lookup(city, options) ** params.alpha
+                    * heuristic_matrix(distances[city, options], params.beta))
+    else:
+        eta_beta = heuristic_matrix(distances, params.beta)
+
+        def edge_weights(city, options):
+            return pheromone[city, options] ** params.alpha * eta_beta[city, options]
+
+    best_solution = None
+    best_distance = float('inf')
+    solutions_built = 0
+
+    start_time = time.perf_counter()
+    time_to_best = 0.0
+
+    # Cities excluding depot
+    non_depot_cities = [i for i in range(num_cities) if i != depot]
+
+    stop_reason = "iterations"
+    completed = 0
+    for iteration in range(params.n_iterations):
+        if progress is not None and iteration % 10 == 0 and progress(iteration, best_distance):
+            stop_reason = "cancelled"
+            break
+        completed += 1
+
+        ant_solutions = []
+        ant_distances = []
+
+        for ant in range(params.n_ants):
+            # Create empty routes for each vehicle
+            routes = [[] for _ in range(num_vehicles)]
+
+            # Cities still to visit
+            to_visit = np.ones(num_cities, dtype=bool)
+            to_visit[depot] = False
+            left = len(non_depot_cities)
+
+            # Assign cities to vehicles using ACO principles
+            for vehicle in range(num_vehicles):
+                if not left:
+                    break
+
+                # Start from depot
+                current_city = depot
+
+                # Build a route for this vehicle
+                route = []
+                while left and len(route) < len(non_depot_cities) // num_vehicles + 2:
+                    options = None
+                    if candidates is not None:
+                        near = candidates[current_city]
+                        near = near[to_visit[near]]
+                        if len(near):
+                            options = near
+                    if options is None:
+                        options = np.flatnonzero(to_visit)
+
+                    # Probability based on pheromone and distance
+                    weights = edge_weights(current_city, options)
+                    cumulative = np.cumsum(weights)
+                    if cumulative[-1] > 0:
+                        city_idx = min(int(np.searchsorted(cumulative, np_rng.random() * cumulative[-1], side='right')),
+                                       len(options) - 1)
+                    else:
+                        # If all probabilities are 0, choose randomly
+                        city_idx = rng.randrange(len(options))
+
+                    next_city = int(options[city_idx])
+                    to_visit[next_city] = False
+                    left -= 1
+                    route.append(next_city)
+                    current_city = next_city
+
+                routes[vehicle] = route
+
+            # Assign any remaining cities
+            for vehicle_index, city in enumerate(np.flatnonzero(to_visit).tolist()):
+                routes[vehicle_index % num_vehicles].append(city)
+
+            # Add depot at start and end of each route
+            full_routes = [[depot] + route + [depot] for route in routes if route]
+
+            total_distance = sum(route_distance(distances, route) for route in full_routes)
+            ant_solutions.append(full_routes)
+            ant_distances.append(total_distance)
+            solutions_built += 1
+
+            # Update best solution if needed
+            if total_distance < best_distance:
+                best_solution = [r[:] for r in full_routes]
+                best_distance = total_distance
+                time_to_best = time.perf_counter() - start_time
+                if improvement is not None:
+                    improvement(iteration, best_distance, time_to_best, best_solution)
+
+        # Update pheromone levels
+        pheromone *= params.decay
+
+        # Add new pheromones from ant trails, plus extra on the best solution (elitist strategy)
+        from_cities = []
+        to_cities = []
+        amounts = []
+        for solution, amount in zip(ant_solutions + [best_solution],
+                                    [1.0 / d for d in ant_distances] + [2.0 / best_distance]):
+            edge_count = len(from_cities)
+            for route in solution:
+                from_cities.extend(route[:-1])
+                to_cities.extend(route[1:])
+            amounts.append(np.full(len(from_cities) - edge_count, amount))
+        if from_cities:
+            deposit_pheromone(pheromone, np.array(from_cities), np.array(to_cities), np.concatenate(amounts))
+
+    return SolverResult(
+        cost=best_distance,
+        routes=best_solution,
+        elapsed=time.perf_counter() - start_time,
+        time_to_best=time_to_best,
+        iterations=completed,
+        stop_reason=stop_reason,
+        counters={"solutions_built": solutions_built},
+    )
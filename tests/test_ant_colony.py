@@ -0,0 +1,63 @@
+"""Ant Colony Optimization for the TSP and the VRP"""
+import numpy as np
+import pytest
+
+import solvers
+from distances import build_distance_matrix, nearest_neighbors
+
+
+@pytest.fixture
+def instance():
+    points = np.random.default_rng(0).random((40, 2)) * 100
+    return build_distance_matrix(points), points
+
+
+def test_aco_tsp_is_seeded_and_returns_a_permutation(instance):
+    distances, points = instance
+    params = solvers.ACOTSPParams(n_iterations=10)
+    first = solvers.aco_tsp(distances, params, seed=4, candidates=nearest_neighbors(points, 8))
+    second = solvers.aco_tsp(distances, params, seed=4, candidates=nearest_neighbors(points, 8))
+    assert first.tour == second.tour
+    assert sorted(first.tour) == list(range(40))
+    assert first.cost == pytest.approx(solvers.tour_distance(distances, first.tour))
+
+
+@pytest.mark.parametrize("solver, params", [
+    (solvers.aco_tsp, solvers.ACOTSPParams),
+    (solvers.aco_vrp, solvers.ACOVRPParams),
+])
+def test_sparse_pheromone_matches_dense_with_every_edge_a_candidate(instance, solver, params):
+    distances, points = instance
+    every_other_city = nearest_neighbors(points, len(points) - 1)
+    dense = solver(distances, params(n_iterations=8, pheromone_storage="dense"), seed=1,
+                   candidates=every_other_city)
+    sparse = solver(distances, params(n_iterations=8, pheromone_storage="sparse"), seed=1,
+                    candidates=every_other_city)
+    assert dense.cost == sparse.cost
+    assert (dense.tour, dense.routes) == (sparse.tour, sparse.routes)
+
+
+def test_sparse_pheromone_needs_candidates(instance):
+    distances, _ = instance
+    with pytest.raises(ValueError):
+        solvers.aco_tsp(distances, solvers.ACOTSPParams(pheromone_storage="sparse"))
+
+
+def test_sparse_pheromone_reads_defaults_off_the_candidate_edges():
+    candidates = np.array([[1, 2], [0, 2], [0, 1], [0, 1]])
+    pheromone = solvers.SparsePheromone(candidates, solvers.SparsePheromone.new_table(4, 2, 0.5))
+    solvers.deposit_pheromone(pheromone, np.array([0, 2]), np.array([3, 3]), np.array([1.0, 2.0]))
+    pheromone *= 0.5
+    # Neither 0->3 nor 2->3 is a candidate edge; of their mirrors only 3->0 is stored
+    assert pheromone.rows([0])[0].tolist() == [0.25, 0.25, 0.25, 0.25]
+    assert pheromone.rows([3])[0].tolist() == [0.75, 0.25, 0.25, 0.25]
+    assert pheromone.lookup(3, np.array([0, 2])).tolist() == [0.75, 0.25]
+
+
+def test_aco_vrp_visits_every_customer(instance):
+    distances, points = instance
+    result = solvers.aco_vrp(distances, solvers.ACOVRPParams(n_iterations=5), depot=3, seed=2,
+                             candidates=nearest_neighbors(points, 8))
+    customers = sorted(city for route in result.routes for city in route[1:-1])
+    assert customers == [city for city in range(40) if city != 3]
+    assert all(route[0] == route[-1] == 3 for route in result.routes)
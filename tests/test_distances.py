@@ -0,0 +1,62 @@
+"""Distance matrices against scalar references"""
+import math
+import os
+
+import numpy as np
+import pytest
+
+import distances
+from distances import EARTH_RADIUS_KM, build_distance_matrix, build_haversine_matrix, open_distance_matrix
+
+
+def great_circle_km(a, b):
+    lat1, lon1, lat2, lon2 = map(math.radians, (*a, *b))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(h))
+
+
+@pytest.mark.parametrize("dtype, tolerance_km", [(np.float64, 1e-9), (np.float32, 0.05)])
+@pytest.mark.parametrize("symmetric", [True, False])
+def test_haversine_matrix_matches_scalar_reference(dtype, tolerance_km, symmetric):
+    rng = np.random.default_rng(0)
+    lat_lon = np.c_[rng.uniform(-60, 60, 40), rng.uniform(-180, 180, 40)]
+    distances = build_haversine_matrix(lat_lon, dtype=dtype, symmetric=symmetric)
+    assert distances.dtype == dtype
+    expected = [[great_circle_km(a, b) for b in lat_lon] for a in lat_lon]
+    np.testing.assert_allclose(distances, expected, rtol=0, atol=tolerance_km)
+    assert (np.diag(distances) == 0).all()
+
+
+def test_matrix_file_is_reused(tmp_path, monkeypatch):
+    points = np.random.default_rng(2).random((20, 2)) * 100
+    first = open_distance_matrix(points, str(tmp_path))
+
+    def rebuild(*args, **kwargs):
+        raise AssertionError("matrix rebuilt instead of reused")
+
+    monkeypatch.setitem(distances.MATRIX_BUILDERS, "euclidean", rebuild)
+    second = open_distance_matrix(points, str(tmp_path))
+    assert second.filename == first.filename
+    np.testing.assert_array_equal(second, first)
+    assert len(os.listdir(tmp_path)) == 1
+
+
+def test_matrix_file_is_keyed_by_dtype(tmp_path):
+    points = np.random.default_rng(3).random((20, 2)) * 100
+    single = open_distance_matrix(points, str(tmp_path), dtype=np.float32)
+    double = open_distance_matrix(points, str(tmp_path), dtype=np.float64)
+    assert single.dtype == np.float32 and double.dtype == np.float64
+    assert single.filename != double.filename
+    np.testing.assert_allclose(double, build_distance_matrix(points))
+
+
+def test_only_the_most_recently_used_matrix_files_are_kept(tmp_path):
+    rng = np.random.default_rng(4)
+    instances = [rng.random((10, 2)) * 100 for _ in range(4)]
+    files = [open_distance_matrix(points, str(tmp_path)).filename for points in instances[:3]]
+    # Distinct, increasing mtimes regardless of the file system's resolution
+    for age, path in enumerate(reversed(files)):
+        os.utime(path, (1e9 - age, 1e9 - age))
+    open_distance_matrix(instances[0], str(tmp_path), keep=3)  # reuse makes it the newest
+    newest = open_distance_matrix(instances[3], str(tmp_path), keep=2).filename
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(path) for path in (files[0], newest))
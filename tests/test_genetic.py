@@ -0,0 +1,106 @@
+"""Crossovers, the optimal (Prins) split and the Genetic Algorithm"""
+import itertools
+import random
+
+import numpy as np
+import pytest
+
+import solvers
+
+
+def points_matrix(n, seed):
+    points = np.random.default_rng(seed).random((n, 2)) * 100
+    return np.hypot(*(points[:, None, :] - points[None, :, :]).transpose(2, 0, 1))
+
+
+@pytest.mark.parametrize("crossover", sorted(solvers.CROSSOVERS))
+def test_crossover_children_are_permutations(crossover):
+    rng = random.Random(0)
+    for size in (2, 3, 8, 25):
+        for _ in range(200):
+            parent1 = np.array(rng.sample(range(1, size + 1), size))
+            parent2 = np.array(rng.sample(range(1, size + 1), size))
+            for child in solvers.CROSSOVERS[crossover](parent1, parent2, rng):
+                assert sorted(child.tolist()) == sorted(parent1.tolist())
+
+
+def brute_force_split(distances, tour, depot, max_vehicles, max_stops, max_length):
+    best = np.inf
+    m = len(tour)
+    for cuts in itertools.product([False, True], repeat=m - 1):
+        bounds = [0] + [i + 1 for i, cut in enumerate(cuts) if cut] + [m]
+        routes = [tour[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+        if max_vehicles and len(routes) > max_vehicles:
+            continue
+        if max_stops and any(len(route) > max_stops for route in routes):
+            continue
+        lengths = [solvers.route_distance(distances, [depot] + list(route) + [depot]) for route in routes]
+        if max_length and any(length > max_length for length in lengths):
+            continue
+        best = min(best, sum(lengths))
+    return best
+
+
+def test_split_matches_brute_force():
+    rng = np.random.default_rng(7)
+    for case in range(150):
+        n = int(rng.integers(3, 9))
+        distances = points_matrix(n, case)
+        tour = rng.permutation(np.arange(1, n))
+        max_vehicles = int(rng.integers(0, 4))
+        max_stops = int(rng.integers(0, 4))
+        max_length = float(rng.choice([0.0, 150.0, 250.0]))
+        expected = brute_force_split(distances, tour, 0, max_vehicles, max_stops, max_length)
+
+        cost = solvers.split_fitness(distances, tour[None, :], 0, max_vehicles or None, max_stops, max_length)[0]
+        assert cost == pytest.approx(expected)
+
+        routes = solvers.optimal_split(distances, tour, 0, max_vehicles or None, max_stops, max_length)
+        if np.isfinite(expected):
+            assert np.concatenate(routes).tolist() == tour.tolist()
+            assert solvers.routes_distance(distances, routes, 0) == pytest.approx(expected)
+        else:
+            assert routes == []
+
+
+@pytest.mark.parametrize("split_method", solvers.SPLIT_METHODS)
+@pytest.mark.parametrize("selection_method", ["tournament", "roulette"])
+def test_genetic_algorithm_is_seeded_and_visits_every_customer(split_method, selection_method):
+    distances = points_matrix(25, 3)
+    params = solvers.GAParams(population_size=30, generations=20, split_method=split_method,
+                              selection_method=selection_method)
+    first = solvers.genetic_algorithm(distances, params, depot=4, seed=11)
+    second = solvers.genetic_algorithm(distances, params, depot=4, seed=11)
+    assert first.routes == second.routes and first.cost == second.cost
+
+    customers = [city for route in first.routes for city in route[1:-1]]
+    assert sorted(customers) == [city for city in range(25) if city != 4]
+    assert all(route[0] == route[-1] == 4 for route in first.routes)
+    assert first.cost == pytest.approx(sum(solvers.route_distance(distances, route) for route in first.routes))
+
+
+def test_fitness_cache_keeps_the_search_unchanged():
+    distances = points_matrix(20, 5)
+    cached = solvers.genetic_algorithm(distances, solvers.GAParams(generations=15), seed=2)
+    uncached = solvers.genetic_algorithm(distances, solvers.GAParams(generations=15, fitness_cache_size=0), seed=2)
+    assert cached.routes == uncached.routes
+    assert cached.counters["cache_hits"] > 0
+
+
+def test_unreachable_route_length_is_rejected_up_front():
+    distances = points_matrix(10, 4)
+    longest = max(distances[0, city] + distances[city, 0] for city in range(1, 10))
+    with pytest.raises(ValueError, match="round trip"):
+        solvers.genetic_algorithm(distances, solvers.GAParams(max_route_length=longest * 0.9))
+    with pytest.raises(ValueError, match="cannot serve"):
+        solvers.genetic_algorithm(distances, solvers.GAParams(num_vehicles=2, max_route_stops=4))
+
+
+def test_roulette_survives_an_all_infeasible_population():
+    population = np.arange(12).reshape(4, 3)
+    rng = np.random.default_rng(0)
+    picked = solvers.roulette_selection(population, np.full(4, np.inf), rng)
+    assert any((picked == row).all() for row in population)
+    # A single feasible chromosome takes all the weight
+    scores = np.array([np.inf, 5.0, np.inf, np.inf])
+    assert all((solvers.roulette_selection(population, scores, rng) == population[1]).all() for _ in range(20))
@@ -0,0 +1,64 @@
+"""O(1) move deltas of Simulated Annealing against full re-evaluation"""
+import random
+
+import numpy as np
+import pytest
+
+import solvers
+
+
+def asymmetric(n, seed):
+    return np.random.default_rng(seed).random((n, n)) * 100
+
+
+def symmetric(n, seed):
+    distances = asymmetric(n, seed)
+    return distances + distances.T
+
+
+def check_moves(name, distances, moves=400, seed=0):
+    sample_move, move_delta, apply_move, _ = solvers.NEIGHBORHOODS[name]
+    rng = random.Random(seed)
+    n = len(distances)
+    dist = distances.item
+
+    def partner(i):
+        j = rng.randrange(n - 1)
+        return j + 1 if j >= i else j
+
+    for _ in range(moves):
+        tour = list(range(n))
+        rng.shuffle(tour)
+        move = sample_move(rng.random, n, partner)
+        before = solvers.tour_distance(distances, tour)
+        delta = move_delta(dist, tour, *move)
+        apply_move(tour, *move)
+        assert sorted(tour) == list(range(n))
+        assert solvers.tour_distance(distances, tour) - before == pytest.approx(delta, abs=1e-9)
+
+
+@pytest.mark.parametrize("name", ["swap", "insert", "or-opt"])
+@pytest.mark.parametrize("n", [4, 5, 12])
+def test_delta_matches_full_evaluation_on_asymmetric_matrix(name, n):
+    check_moves(name, asymmetric(n, n), seed=n)
+
+
+@pytest.mark.parametrize("name", sorted(solvers.NEIGHBORHOODS))
+@pytest.mark.parametrize("n", [4, 5, 12])
+def test_delta_matches_full_evaluation_on_symmetric_matrix(name, n):
+    # 2-opt keeps the length of the reversed segment only when distances are symmetric
+    check_moves(name, symmetric(n, n), seed=n)
+
+
+@pytest.mark.parametrize("name", sorted(solvers.NEIGHBORHOODS))
+def test_reported_cost_matches_returned_tour(name):
+    distances = symmetric(30, 1)
+    result = solvers.simulated_annealing(
+        distances, solvers.SAParams(iterations=5000, neighbor_method=name), seed=3)
+    assert sorted(result.tour) == list(range(30))
+    assert result.cost == pytest.approx(solvers.tour_distance(distances, result.tour))
+
+
+def test_unknown_neighbor_method_is_rejected():
+    with pytest.raises(ValueError, match="2opt"):
+        solvers.simulated_annealing(symmetric(10, 0), solvers.SAParams(neighbor_method="2opt"))
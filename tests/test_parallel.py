@@ -0,0 +1,95 @@
+"""Process-pool solvers are reproducible for a given seed"""
+import numpy as np
+import pytest
+
+import parallel
+import solvers
+from distances import build_distance_matrix, nearest_neighbors, open_distance_matrix
+
+
+@pytest.fixture(scope="module")
+def instance():
+    points = np.random.default_rng(1).random((30, 2)) * 100
+    return build_distance_matrix(points), nearest_neighbors(points, 6)
+
+
+RUNNERS = {
+    "islands": lambda distances, candidates, seed: parallel.island_genetic_algorithm(
+        distances, solvers.GAParams(population_size=20, generations=10),
+        parallel.IslandParams(islands=2, migration_interval=5, workers=2), seed=seed),
+    "colonies": lambda distances, candidates, seed: parallel.multi_colony_aco_tsp(
+        distances, solvers.ACOTSPParams(n_ants=10, n_iterations=10),
+        parallel.ColonyParams(colonies=2, exchange_interval=5, workers=2), seed=seed, candidates=candidates),
+    "multistart": lambda distances, candidates, seed: parallel.multi_start_annealing(
+        distances, solvers.SAParams(iterations=3000, neighbor_method="2-opt"), starts=2, workers=2,
+        seed=seed, candidates=candidates),
+    "tempering": lambda distances, candidates, seed: parallel.parallel_tempering(
+        distances, solvers.SAParams(iterations=3000, neighbor_method="2-opt"),
+        parallel.TemperingParams(replicas=2, exchange_interval=500, workers=2), seed=seed, candidates=candidates),
+}
+
+
+@pytest.mark.parametrize("name", sorted(RUNNERS))
+def test_runner_is_reproducible(instance, name):
+    distances, candidates = instance
+    first = RUNNERS[name](distances, candidates, 5)
+    second = RUNNERS[name](distances, candidates, 5)
+    assert first.cost == second.cost
+    assert (first.tour, first.routes) == (second.tour, second.routes)
+
+
+@pytest.mark.parametrize("name", sorted(RUNNERS))
+def test_memory_mapped_matrix_is_shared_by_file(tmp_path, monkeypatch, name):
+    points = np.random.default_rng(1).random((30, 2)) * 100
+    distances = open_distance_matrix(points, str(tmp_path))
+    copied = []
+    share = parallel.SharedMatrix.__init__
+
+    def spy(self, array):
+        share(self, array)
+        # Pheromone trails go to shared memory, the distance matrix must not
+        copied.append(np.shares_memory(array, distances) and self.shm is not None)
+
+    monkeypatch.setattr(parallel.SharedMatrix, "__init__", spy)
+    result = RUNNERS[name](distances, nearest_neighbors(points, 6), 5)
+    assert np.isfinite(result.cost)
+    assert copied and not any(copied)
+
+
+EMPTY_RUNS = {
+    "islands": lambda distances: parallel.island_genetic_algorithm(
+        distances, solvers.GAParams(generations=0), parallel.IslandParams(islands=2, workers=1)),
+    "colonies tsp": lambda distances: parallel.multi_colony_aco_tsp(
+        distances, solvers.ACOTSPParams(n_iterations=0), parallel.ColonyParams(colonies=2, workers=1)),
+    "colonies vrp": lambda distances: parallel.multi_colony_aco_vrp(
+        distances, solvers.ACOVRPParams(n_iterations=0), parallel.ColonyParams(colonies=2, workers=1)),
+    "tempering": lambda distances: parallel.parallel_tempering(
+        distances, solvers.SAParams(iterations=0), parallel.TemperingParams(replicas=2, workers=1)),
+}
+
+
+@pytest.mark.parametrize("name", sorted(EMPTY_RUNS))
+def test_runner_without_iterations_finds_nothing(instance, name):
+    distances, _ = instance
+    result = EMPTY_RUNS[name](distances)
+    assert result.cost == float('inf')
+    assert not result.tour and not result.routes
+
+
+def test_annealing_process_matches_a_serial_run_and_streams_progress(instance):
+    distances, candidates = instance
+    params = solvers.SAParams(iterations=30000, neighbor_method="2-opt")
+    improvements = []
+    result = parallel.annealing_process(distances, params, seed=3, candidates=candidates,
+                                        improvement=lambda *event: improvements.append(event))
+    serial = solvers.simulated_annealing(distances, params, seed=3, candidates=candidates)
+    assert (result.cost, result.tour) == (serial.cost, serial.tour)
+    assert improvements and improvements[-1][1] == pytest.approx(result.cost)
+
+
+def test_annealing_process_stops_when_progress_asks(instance):
+    distances, candidates = instance
+    result = parallel.annealing_process(distances, solvers.SAParams(iterations=10 ** 7), seed=3,
+                                        progress=lambda iteration, best_cost: iteration >= 5000)
+    assert result.stop_reason == "cancelled"
+    assert result.iterations < 10 ** 6
@@ -0,0 +1,183 @@
+"""OpenRouteService client and its caches"""
+import threading
+import time
+
+import numpy as np
+import pytest
+import requests
+
+import ors_standin
+import routing
+from distances import haversine
+
+
+def stand_in(**options):
+    server, url = ors_standin.serve(**options)
+    client = routing.RouteClient("key", url, requests_per_minute=60000, burst=1000)
+    return server, client
+
+
+def test_leg_cache_evicts_least_recently_used_in_batches(tmp_path):
+    cache = routing.LegCache(str(tmp_path / "legs.sqlite"), max_entries=20)
+    for i in range(20):
+        cache.put(f"leg{i}", [(0.0, 0.0), (1.0, 1.0)], float(i))
+    cache.get("leg0")  # Most recently used now
+    assert len(cache) == cache.count == 20
+
+    cache.put("leg0", [(0.0, 0.0)], 5.0)  # Replacing does not grow the cache
+    assert len(cache) == cache.count == 20
+
+    cache.put("leg20", [(0.0, 0.0)], 20.0)
+    assert len(cache) == cache.count == 18
+    assert cache.get("leg0") is not None and cache.get("leg20") is not None
+    assert cache.get("leg1") is None and cache.get("leg3") is None
+
+    reopened = routing.LegCache(str(tmp_path / "legs.sqlite"), max_entries=20)
+    assert reopened.count == 18
+
+
+def test_leg_cache_drops_expired_entries(tmp_path):
+    cache = routing.LegCache(str(tmp_path / "legs.sqlite"), ttl=0.05)
+    cache.put("old", [(0.0, 0.0), (1.0, 1.0)], 1.0)
+    assert cache.get("old") == ([(0.0, 0.0), (1.0, 1.0)], 1.0)
+    time.sleep(0.1)
+    cache.put("new", [(0.0, 0.0)], 2.0)
+    assert cache.get("old") is None
+    assert cache.get("new") is not None
+    assert len(cache) == cache.count == 1
+
+
+@pytest.mark.parametrize("retry_after, posts", [(0, 2), (3600, 1)])
+def test_retry_after_is_waited_out_only_up_to_the_cap(retry_after, posts):
+    server, client = stand_in(reject=1, retry_after=retry_after)
+    stops = [(48.85, 2.35), (45.76, 4.84), (47.32, 5.04)]
+    start = time.perf_counter()
+    try:
+        legs = client.fetch_paths([[0, 1, 2]], stops)[0]
+    finally:
+        server.shutdown()
+    assert time.perf_counter() - start < routing.MAX_RETRY_AFTER
+    assert server.requests == posts
+    if retry_after <= routing.MAX_RETRY_AFTER:
+        assert all(leg.ok for leg in legs)
+    else:
+        # Handed back for the map to draw direct lines instead
+        assert [leg.status for leg in legs] == [429, 429] and not any(leg.ok for leg in legs)
+
+
+@pytest.fixture
+def points():
+    rng = np.random.default_rng(2)
+    return np.c_[rng.uniform(45, 50, 23), rng.uniform(2, 10, 23)]
+
+
+def test_distance_matrix_is_fetched_in_tiles(points):
+    server, client = stand_in()
+    try:
+        distances = client.distance_matrix(points, tile_size=10)
+    finally:
+        server.shutdown()
+    assert server.requests == 9  # 3 x 3 tiles
+    expected = ors_standin.ROAD_FACTOR * 1000 * haversine(points[:, None], points[None, :])
+    np.testing.assert_allclose(distances, expected)
+
+
+def test_unreachable_pairs_fall_back_to_scaled_great_circle(points):
+    server, client = stand_in(unreachable=points[[4]])
+    try:
+        distances = client.distance_matrix(points, tile_size=10)
+    finally:
+        server.shutdown()
+    great_circle = 1000 * haversine(points[:, None], points[None, :])
+    others = np.arange(len(points)) != 4
+    np.testing.assert_allclose(distances[4, others], routing.UNREACHABLE_FACTOR * great_circle[4, others])
+    np.testing.assert_allclose(distances[others, 4], routing.UNREACHABLE_FACTOR * great_circle[others, 4])
+    np.testing.assert_allclose(distances[np.ix_(others, others)],
+                               ors_standin.ROAD_FACTOR * great_circle[np.ix_(others, others)])
+    assert distances[4, 4] == 0
+
+
+def test_cached_matrix_is_reused_and_cancelled_fetches_resume(tmp_path, points):
+    cache = routing.MatrixCache(str(tmp_path / "matrices.sqlite"))
+    server, client = stand_in()
+    # One tile at a time, the second held back until the first one's progress call cancels
+    client.workers = 1
+    cancelling = threading.Event()
+    fetch_tile = client._matrix_tile
+
+    def held_tile(*args):
+        if server.requests:
+            cancelling.wait(5)
+            time.sleep(0.2)  # Long enough for the remaining tiles to be cancelled
+        return fetch_tile(*args)
+
+    def cancel(done, total):
+        cancelling.set()
+        return True
+
+    try:
+        client._matrix_tile = held_tile
+        assert client.distance_matrix(points, cache, tile_size=10, progress=cancel) is None
+        assert server.requests == 2  # The cancelled call still keeps the tile in flight
+        client._matrix_tile = fetch_tile
+
+        first = client.distance_matrix(points, cache, tile_size=10)
+        assert server.requests == 9
+
+        second = client.distance_matrix(points, cache, tile_size=10)
+        assert server.requests == 9
+    finally:
+        server.shutdown()
+    np.testing.assert_array_equal(first, second)
+
+
+def test_path_geometry_is_split_into_cached_legs(tmp_path):
+    stops = [(48.85, 2.35), (45.76, 4.84), (47.32, 5.04), (46.2, 6.14)]
+    server, client = stand_in()
+    client.cache = routing.LegCache(str(tmp_path / "legs.sqlite"))
+    try:
+        legs = client.fetch_paths([[0, 2, 1, 3]], stops)[0]
+    finally:
+        server.shutdown()
+    assert server.requests == 1
+    assert [(leg.start, leg.end) for leg in legs] == [(0, 2), (2, 1), (1, 3)]
+    for leg in legs:
+        assert leg.ok
+        # Each leg runs from its start city to its end city
+        assert leg.coords[0] == pytest.approx(stops[leg.start]) and leg.coords[-1] == pytest.approx(stops[leg.end])
+        expected = ors_standin.ROAD_FACTOR * 1000 * haversine(np.array(stops[leg.start]), np.array(stops[leg.end]))
+        assert leg.distance == pytest.approx(expected)
+        assert client.cached_leg(leg.start, leg.end, stops).coords == leg.coords
+
+
+def test_paths_beyond_the_waypoint_limit_are_chunked(points):
+    stops = np.tile(points, (6, 1))[:120] + np.arange(120)[:, None] * 1e-3
+    server, client = stand_in()
+    try:
+        long_path, short_path, single_stop = client.fetch_paths(
+            [list(range(120)), [5, 6], [7]], [tuple(stop) for stop in stops])
+    finally:
+        server.shutdown()
+    # 119 legs in requests of at most 49, plus one for the short path
+    assert server.requests == 3 + 1
+    assert [(leg.start, leg.end) for leg in long_path] == [(i, i + 1) for i in range(119)]
+    assert all(leg.ok for leg in long_path + short_path)
+    assert single_stop == []
+
+
+def test_tiles_fetched_before_a_failure_are_cached(tmp_path, points):
+    cache = routing.MatrixCache(str(tmp_path / "matrices.sqlite"))
+    # The first tile is refused for longer than the client waits
+    server, client = stand_in(reject=1, retry_after=3600)
+    try:
+        with pytest.raises(requests.HTTPError):
+            client.distance_matrix(points, cache, tile_size=10)
+        first_call = server.requests
+
+        client.distance_matrix(points, cache, tile_size=10)
+    finally:
+        server.shutdown()
+    # Only the refused tile and those never sent are requested again
+    fetched = first_call - 1
+    assert fetched > 0
+    assert server.requests - first_call == 9 - fetched
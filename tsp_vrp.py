@@ -2,7 +2,6 @@ import tkinter as tk
 from tkinter import ttk, simpledialog, messagebox
 import numpy as np
 import random
-import time
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import math
@@ -13,6 +12,47 @@ from folium.plugins import MarkerCluster
 import webbrowser
 import os
 import json
+import logging
+import multiprocessing
+import queue
+import threading
+from functools import partial
+
+import parallel
+import routing
+import solvers
+from distances import (MATRIX_BUILDERS, nearest_neighbors, nearest_neighbors_from_matrix,
+                       open_distance_matrix)
+from live_plot import LivePlot
+from solution_view import SolutionView
+
+logger = logging.getLogger(__name__)
+
+# Ways to run Simulated Annealing across processes, "off" runs a single chain
+SA_PARALLEL_MODES = ("off", "multistart", "tempering")
+
+# Solvers shown on each tab, and how often the Tk thread checks on them
+TSP_SOLVERS = ("sa", "aco_tsp")
+VRP_SOLVERS = ("ga", "aco_vrp")
+SOLVER_POLL_MS = 50
+
+# Background job fetching the road-distance matrix, cancelled from either tab
+ROAD_MATRIX_JOB = "road_matrix"
+
+# Road legs fetched for the maps and road-distance matrices are kept here across sessions
+ROAD_CACHE_FILE = "road_cache.sqlite"
+
+# What the solvers minimise: straight lines in the plot, great-circle km, or road km from ORS
+DISTANCE_SOURCES = ("euclidean", "geodesic", "road")
+
+# From this many cities on, matrices are float32 files in MATRIX_DIR, memory-mapped
+# and reused whenever the same cities come back
+MEMMAP_MIN_CITIES = 2000
+MATRIX_DIR = "matrices"
+# Matrix files kept in MATRIX_DIR, enough for the TSP and VRP instances in both
+# planar and great-circle form, older ones are deleted as new cities are generated
+MATRIX_KEEP_FILES = 4
+
 
 class OptimizationApp:
     def __init__(self, root):
@@ -22,6 +62,12 @@ class OptimizationApp:
         
         # OpenRouteService API key
         self.ors_api_key = "5b3ce3597851110001cf6248427da3d20b5a4b75ac7e92e78ce2c1e7"  # Replace with your actual API key
+        # Pooled, rate-limited client; point ORS_URL at a local stand-in server for testing
+        self.route_client = routing.RouteClient(self.ors_api_key, os.environ.get("ORS_URL", routing.ORS_URL),
+                                                cache=routing.LegCache(ROAD_CACHE_FILE))
+        self.matrix_cache = routing.MatrixCache(ROAD_CACHE_FILE)
+        self.distance_source_var = tk.StringVar(value=DISTANCE_SOURCES[0])
+        self.matrix_source = None  # Source of the matrix in use or being fetched
         
         # European city bounds (restricted to central Europe only)
         self.min_lon = 2.0    # Western Central Europe
@@ -35,7 +81,13 @@ class OptimizationApp:
             "temperature": 1000.0,  # Higher initial temperature
             "cooling_rate": 0.9995,  # Slower cooling
             "iterations": 100000,   # More iterations
-            "neighbor_method": "swap"
+            "neighbor_method": "swap",
+            "time_limit": 0.0,      # Seconds, 0 = stop after the iterations above
+            "stagnation_limit": 0,  # Moves without improvement before stopping, 0 = off
+            "cooling_schedule": "geometric",
+            "reheat_after": 0,      # Moves without improvement before reheating, 0 = off
+            "parallel_mode": "off", # "multistart" or "tempering" runs replicas in parallel processes
+            "replicas": 4
         }
         
         # ACO TSP parameters - increased iterations and better balance
@@ -45,7 +97,9 @@ class OptimizationApp:
             "decay": 0.9,           # Faster pheromone decay
             "alpha": 1.0,
             "beta": 3.0,            # Higher importance to distance
-            "initial_pheromone": 0.1
+            "initial_pheromone": 0.1,
+            "pheromone_storage": "dense",
+            "colonies": 1
         }
         
         # Genetic Algorithm parameters - increased population and generations
@@ -55,7 +109,13 @@ class OptimizationApp:
             "mutation_rate": 0.2,    # Higher mutation rate
             "crossover_rate": 0.8,
             "num_vehicles": 5,
-            "selection_method": "tournament"
+            "selection_method": "tournament",
+            "crossover_method": "ox",
+            "split_method": "optimal",
+            "max_route_stops": 0,
+            "max_route_length": 0.0,
+            "fitness_cache_size": 4096,
+            "islands": 1
         }
         
         # ACO VRP parameters - increased iterations and adjusted parameters
@@ -66,7 +126,9 @@ class OptimizationApp:
             "alpha": 1.0,
             "beta": 3.0,            # Higher importance to distance
             "num_vehicles": 5,
-            "initial_pheromone": 0.1
+            "initial_pheromone": 0.1,
+            "pheromone_storage": "dense",
+            "colonies": 1
         }
         
         # Create notebook for tabs
@@ -90,6 +152,9 @@ class OptimizationApp:
         self.lat_lon_cities = []  # Store actual lat/lon for map integration
         self.city_names = []     # Store city names
         self.distances = []
+        self.km_distances = np.zeros((0, 0))  # Great-circle km between cities, shared by solvers and maps
+        self.candidates = None   # Nearest neighbours of each city, shared by all solvers
+        self.candidate_k = 10    # Size of the neighbour lists, 0 lets solvers consider every city
         self.num_cities = 100    # Default is now 100 cities
         self.depot_index = 0     # For VRP
         
@@ -99,6 +164,11 @@ class OptimizationApp:
         self.ga_solution = None
         self.aco_vrp_solution = None
         
+        # Solvers run on worker threads and report back through this queue,
+        # which the Tk thread drains in poll_solvers
+        self.solver_events = queue.Queue()
+        self.solver_jobs = {}    # Running solver name -> its cancel event and result handlers
+        
         # For API usage tracking (to avoid exceeding limits)
         self.api_calls = 0
         self.max_api_calls = 40  # Limit API calls to avoid exceeding free tier
@@ -236,7 +306,10 @@ class OptimizationApp:
         self.sa_fig = plt.Figure(figsize=(6, 5), dpi=100)
         self.sa_canvas = FigureCanvasTkAgg(self.sa_fig, self.sa_frame)
         self.sa_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-        self.sa_ax = self.sa_fig.add_subplot(111)
+        # Solution on top, a small cost-vs-time convergence plot below
+        self.sa_ax, self.sa_convergence_ax = self.sa_fig.subplots(
+            2, 1, gridspec_kw={"height_ratios": [4, 1]})
+        self.sa_view = SolutionView(self.sa_ax)
         
         # Metrics for SA
         self.sa_metrics_frame = tk.Frame(self.sa_frame, bg="navy")
@@ -261,7 +334,10 @@ class OptimizationApp:
         self.aco_tsp_fig = plt.Figure(figsize=(6, 5), dpi=100)
         self.aco_tsp_canvas = FigureCanvasTkAgg(self.aco_tsp_fig, self.aco_tsp_frame)
         self.aco_tsp_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-        self.aco_tsp_ax = self.aco_tsp_fig.add_subplot(111)
+        # Solution on top, a small cost-vs-time convergence plot below
+        self.aco_tsp_ax, self.aco_tsp_convergence_ax = self.aco_tsp_fig.subplots(
+            2, 1, gridspec_kw={"height_ratios": [4, 1]})
+        self.aco_tsp_view = SolutionView(self.aco_tsp_ax)
         
         # Metrics for ACO
         self.aco_tsp_metrics_frame = tk.Frame(self.aco_tsp_frame, bg="navy")
@@ -329,6 +405,15 @@ class OptimizationApp:
         solve_btn = tk.Button(right_frame, text="SOLVE", command=self.solve_tsp)
         solve_btn.grid(row=0, column=3, padx=5)
         
+        cancel_btn = tk.Button(right_frame, text="CANCEL", command=lambda: self.cancel_solvers(TSP_SOLVERS + (ROAD_MATRIX_JOB,)))
+        cancel_btn.grid(row=0, column=4, padx=5)
+        
+        tk.Label(right_frame, text="Distances").grid(row=1, column=0, padx=5)
+        distance_combobox = ttk.Combobox(right_frame, textvariable=self.distance_source_var,
+                                         values=DISTANCE_SOURCES, state="readonly", width=10)
+        distance_combobox.grid(row=1, column=1, padx=5)
+        distance_combobox.bind("<<ComboboxSelected>>", lambda event: self.change_distance_source(self.sa_time_var))
+        
         # Configure grid weights
         controls_frame.grid_columnconfigure(0, weight=1)
         controls_frame.grid_columnconfigure(1, weight=2)
@@ -357,7 +442,10 @@ class OptimizationApp:
         self.ga_fig = plt.Figure(figsize=(6, 5), dpi=100)
         self.ga_canvas = FigureCanvasTkAgg(self.ga_fig, self.ga_frame)
         self.ga_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-        self.ga_ax = self.ga_fig.add_subplot(111)
+        # Solution on top, a small cost-vs-time convergence plot below
+        self.ga_ax, self.ga_convergence_ax = self.ga_fig.subplots(
+            2, 1, gridspec_kw={"height_ratios": [4, 1]})
+        self.ga_view = SolutionView(self.ga_ax)
         
         # Metrics for GA
         self.ga_metrics_frame = tk.Frame(self.ga_frame, bg="navy")
@@ -382,7 +470,10 @@ class OptimizationApp:
         self.aco_vrp_fig = plt.Figure(figsize=(6, 5), dpi=100)
         self.aco_vrp_canvas = FigureCanvasTkAgg(self.aco_vrp_fig, self.aco_vrp_frame)
         self.aco_vrp_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-        self.aco_vrp_ax = self.aco_vrp_fig.add_subplot(111)
+        # Solution on top, a small cost-vs-time convergence plot below
+        self.aco_vrp_ax, self.aco_vrp_convergence_ax = self.aco_vrp_fig.subplots(
+            2, 1, gridspec_kw={"height_ratios": [4, 1]})
+        self.aco_vrp_view = SolutionView(self.aco_vrp_ax)
         
         # Metrics for ACO in VRP
         self.aco_vrp_metrics_frame = tk.Frame(self.aco_vrp_frame, bg="navy")
@@ -450,6 +541,15 @@ class OptimizationApp:
         solve_btn = tk.Button(right_frame, text="SOLVE", command=self.solve_vrp)
         solve_btn.grid(row=0, column=3, padx=5)
         
+        cancel_btn = tk.Button(right_frame, text="CANCEL", command=lambda: self.cancel_solvers(VRP_SOLVERS + (ROAD_MATRIX_JOB,)))
+        cancel_btn.grid(row=0, column=4, padx=5)
+        
+        tk.Label(right_frame, text="Distances").grid(row=1, column=0, padx=5)
+        distance_combobox = ttk.Combobox(right_frame, textvariable=self.distance_source_var,
+                                         values=DISTANCE_SOURCES, state="readonly", width=10)
+        distance_combobox.grid(row=1, column=1, padx=5)
+        distance_combobox.bind("<<ComboboxSelected>>", lambda event: self.change_distance_source(self.ga_time_var))
+        
         # Button to change depot city
         change_depot_btn = tk.Button(right_frame, text="CHANGE DEPOT", command=self.change_depot_city)
         change_depot_btn.grid(row=1, column=2, columnspan=2, padx=5, pady=5)
@@ -513,6 +613,9 @@ class OptimizationApp:
         return lat_lon_cities, city_names
     
     def generate_cities(self):
+        if self.solver_jobs:
+            tk.messagebox.showinfo("Error", "Please wait for the running solvers or cancel them first")
+            return
         self.num_cities = int(self.city_combobox.get())
         
         # Generate realistic city locations
@@ -526,53 +629,14 @@ class OptimizationApp:
             self.cities.append((x, y))
         
         # Calculate distance matrix
-        self.distances = np.zeros((self.num_cities, self.num_cities))
-        for i in range(self.num_cities):
-            for j in range(self.num_cities):
-                if i != j:
-                    self.distances[i][j] = np.sqrt((self.cities[i][0] - self.cities[j][0])**2 + 
-                                                  (self.cities[i][1] - self.cities[j][1])**2)
-        
-        # Clear previous plots
-        self.sa_ax.clear()
-        self.aco_tsp_ax.clear()
-        
-        # Plot cities with labels
-        for i, city in enumerate(self.cities):
-            self.sa_ax.plot(city[0], city[1], 'ko')
-            # Add city name for larger datasets
-            if self.num_cities <= 20:  # Only show labels for small datasets
-                self.sa_ax.annotate(f"{i}:{self.city_names[i]}", 
-                                   (city[0], city[1]), 
-                                   xytext=(5, 0), 
-                                   textcoords='offset points',
-                                   fontsize=8)
-            else:
-                self.sa_ax.annotate(f"{i}", 
-                                   (city[0], city[1]), 
-                                   xytext=(5, 0), 
-                                   textcoords='offset points',
-                                   fontsize=8)
-            
-            self.aco_tsp_ax.plot(city[0], city[1], 'ko')
-            # Copy the same labeling for ACO plot
-            if self.num_cities <= 20:
-                self.aco_tsp_ax.annotate(f"{i}:{self.city_names[i]}", 
-                                        (city[0], city[1]), 
-                                        xytext=(5, 0), 
-                                        textcoords='offset points',
-                                        fontsize=8)
-            else:
-                self.aco_tsp_ax.annotate(f"{i}", 
-                                        (city[0], city[1]), 
-                                        xytext=(5, 0), 
-                                        textcoords='offset points',
-                                        fontsize=8)
+        self.build_solver_matrix(self.sa_time_var)
         
-        self.sa_ax.set_xlim(-5, 105)
-        self.sa_ax.set_ylim(-5, 105)
-        self.aco_tsp_ax.set_xlim(-5, 105)
-        self.aco_tsp_ax.set_ylim(-5, 105)
+        # Show the new cities, which also clears previous solutions
+        labels = self.tsp_city_labels()
+        self.sa_view.show_cities(self.cities, labels)
+        self.aco_tsp_view.show_cities(self.cities, labels)
+        self.sa_convergence_ax.clear()
+        self.aco_tsp_convergence_ax.clear()
         
         self.sa_canvas.draw()
         self.aco_tsp_canvas.draw()
@@ -584,7 +648,92 @@ class OptimizationApp:
         # Reset API call counter
         self.api_calls = 0
     
+    def build_solver_matrix(self, status_var):
+        """Distance matrix and neighbour lists for the solvers
+        
+        Euclidean distances between the plotted cities, great-circle km, or
+        road distances in km from the ORS matrix service, cached in
+        ROAD_CACHE_FILE. The great-circle matrix is always built, the maps use it too.
+        Road distances are fetched in the background as a job that Cancel
+        stops; solving waits until it is done, and a failed or cancelled fetch
+        falls back to straight lines. status_var shows how the fetch went.
+        """
+        self.km_distances = self.local_matrix(self.lat_lon_cities, "haversine")
+        self.matrix_source = self.distance_source_var.get()
+        
+        if self.matrix_source == "geodesic":
+            self.distances = self.km_distances
+            self.candidates = (nearest_neighbors_from_matrix(self.distances, self.candidate_k)
+                               if self.candidate_k else None)
+            return
+        
+        self.distances = self.local_matrix(self.cities, "euclidean")
+        self.candidates = nearest_neighbors(self.cities, self.candidate_k) if self.candidate_k else None
+        
+        if self.matrix_source == "road":
+            self.fetch_road_matrix(status_var)
+    
+    def fetch_road_matrix(self, status_var):
+        """Fetch the road-distance matrix on a worker thread, like a solver run"""
+        lat_lon_cities = list(self.lat_lon_cities)
+        
+        def solve(progress, improvement):
+            try:
+                return self.route_client.distance_matrix(lat_lon_cities, self.matrix_cache, progress=progress)
+            except requests.RequestException as e:
+                return e
+        
+        status_var.set("Fetching road distances...")
+        self.start_solver(ROAD_MATRIX_JOB, solve, partial(self.finish_road_matrix, status_var),
+                          status_var, None, None)
+    
+    def finish_road_matrix(self, status_var, road):
+        """Use a fetched road-distance matrix, or keep straight lines if the fetch failed"""
+        if self.matrix_source != "road" or self.distance_source_var.get() != "road":
+            status_var.set("Road distances not used")  # Another source was chosen meanwhile
+            return
+        if road is None or isinstance(road, Exception):
+            # Show the straight lines still in use; tiles fetched so far are cached,
+            # so choosing "road" again resumes
+            self.matrix_source = "euclidean"
+            self.distance_source_var.set(self.matrix_source)
+            if road is None:
+                status_var.set("Road distances cancelled")
+                return
+            status_var.set("Road distances failed")
+            tk.messagebox.showwarning(
+                "Road Distances",
+                f"Could not fetch road distances ({str(road)[:80]}). Using straight lines instead."
+            )
+            return
+        
+        # The solvers assume symmetric costs, so average both directions
+        self.distances = (road + road.T) / 2000
+        self.candidates = (nearest_neighbors_from_matrix(self.distances, self.candidate_k)
+                           if self.candidate_k else None)
+        status_var.set("Road distances ready")
+    
+    def change_distance_source(self, status_var):
+        """Rebuild the solver matrix of the current cities for the chosen distance source"""
+        if not self.cities:
+            return  # Applies to the next generated cities
+        if self.solver_jobs:
+            # Keep showing the source the solvers are using
+            self.distance_source_var.set(self.matrix_source)
+            tk.messagebox.showinfo("Error", "Please wait for the running solvers or cancel them first")
+            return
+        self.build_solver_matrix(status_var)
+    
+    def local_matrix(self, points, metric):
+        """Distance matrix of points, memory-mapped from MATRIX_DIR for large instances"""
+        if len(points) >= MEMMAP_MIN_CITIES:
+            return open_distance_matrix(points, MATRIX_DIR, metric, keep=MATRIX_KEEP_FILES)
+        return MATRIX_BUILDERS[metric](points)
+    
     def generate_cities_vrp(self):
+        if self.solver_jobs:
+            tk.messagebox.showinfo("Error", "Please wait for the running solvers or cancel them first")
+            return
         self.num_cities = int(self.vrp_city_combobox.get())
         
         # Generate realistic city locations
@@ -601,44 +750,13 @@ class OptimizationApp:
         self.depot_index = 0
         
         # Calculate distance matrix
-        self.distances = np.zeros((self.num_cities, self.num_cities))
-        for i in range(self.num_cities):
-            for j in range(self.num_cities):
-                if i != j:
-                    self.distances[i][j] = np.sqrt((self.cities[i][0] - self.cities[j][0])**2 + 
-                                                  (self.cities[i][1] - self.cities[j][1])**2)
-        
-        # Clear previous plots
-        self.ga_ax.clear()
-        self.aco_vrp_ax.clear()
-        
-        # Plot cities without displaying city names
-        for i, city in enumerate(self.cities):
-            if i == self.depot_index:
-                # Mark depot with a different color
-                self.ga_ax.plot(city[0], city[1], 'ro', markersize=10)
-                self.ga_ax.annotate("DEPOT", 
-                                  (city[0], city[1]), 
-                                  xytext=(5, 0), 
-                                  textcoords='offset points',
-                                  fontsize=8,
-                                  weight='bold')
-                
-                self.aco_vrp_ax.plot(city[0], city[1], 'ro', markersize=10)
-                self.aco_vrp_ax.annotate("DEPOT", 
-                                       (city[0], city[1]), 
-                                       xytext=(5, 0), 
-                                       textcoords='offset points',
-                                       fontsize=8,
-                                       weight='bold')
-            else:
-                self.ga_ax.plot(city[0], city[1], 'ko')
-                self.aco_vrp_ax.plot(city[0], city[1], 'ko')
+        self.build_solver_matrix(self.ga_time_var)
         
-        self.ga_ax.set_xlim(-5, 105)
-        self.ga_ax.set_ylim(-5, 105)
-        self.aco_vrp_ax.set_xlim(-5, 105)
-        self.aco_vrp_ax.set_ylim(-5, 105)
+        # Show the new cities with the depot highlighted, which also clears previous solutions
+        self.ga_view.show_cities(self.cities, depot=self.depot_index)
+        self.aco_vrp_view.show_cities(self.cities, depot=self.depot_index)
+        self.ga_convergence_ax.clear()
+        self.aco_vrp_convergence_ax.clear()
         
         self.ga_canvas.draw()
         self.aco_vrp_canvas.draw()
@@ -655,6 +773,9 @@ class OptimizationApp:
         if not self.cities or self.num_cities <= 1:
             tk.messagebox.showinfo("Error", "Please generate cities first")
             return
+        if self.solver_jobs:
+            tk.messagebox.showinfo("Error", "Please wait for the running solvers or cancel them first")
+            return
         
         # Create a more user-friendly interface for selecting the depot city
         depot_window = tk.Toplevel(self.root)
@@ -693,40 +814,8 @@ class OptimizationApp:
     
     def update_depot_display(self):
         """Update the display to show the new depot"""
-        # Update GA plot
-        self.ga_ax.clear()
-        for i, city in enumerate(self.cities):
-            if i == self.depot_index:
-                self.ga_ax.plot(city[0], city[1], 'ro', markersize=10)
-                self.ga_ax.annotate("DEPOT", 
-                                  (city[0], city[1]), 
-                                  xytext=(5, 0), 
-                                  textcoords='offset points',
-                                  fontsize=8,
-                                  weight='bold')
-            else:
-                self.ga_ax.plot(city[0], city[1], 'ko')
-                # No city names displayed
-        
-        # Update ACO plot
-        self.aco_vrp_ax.clear()
-        for i, city in enumerate(self.cities):
-            if i == self.depot_index:
-                self.aco_vrp_ax.plot(city[0], city[1], 'ro', markersize=10)
-                self.aco_vrp_ax.annotate("DEPOT", 
-                                       (city[0], city[1]), 
-                                       xytext=(5, 0), 
-                                       textcoords='offset points',
-                                       fontsize=8,
-                                       weight='bold')
-            else:
-                self.aco_vrp_ax.plot(city[0], city[1], 'ko')
-                # No city names displayed
-        
-        self.ga_ax.set_xlim(-5, 105)
-        self.ga_ax.set_ylim(-5, 105)
-        self.aco_vrp_ax.set_xlim(-5, 105)
-        self.aco_vrp_ax.set_ylim(-5, 105)
+        self.ga_view.show_cities(self.cities, depot=self.depot_index)
+        self.aco_vrp_view.show_cities(self.cities, depot=self.depot_index)
         
         self.ga_canvas.draw()
         self.aco_vrp_canvas.draw()
@@ -805,13 +894,13 @@ class OptimizationApp:
                 title_html.format(title=f"TSP Solution - Simulated Annealing ({len(self.sa_solution)} cities)")
             ))
             # Add paths based on algorithm
-            self.add_route_to_map(m, self.sa_solution, "red", "TSP Route")
+            self.add_routes_to_map(m, [(self.sa_solution, "red", "TSP Route")])
             
         elif algorithm == "aco_tsp":
             m.get_root().html.add_child(folium.Element(
                 title_html.format(title=f"TSP Solution - Ant Colony ({len(self.aco_tsp_solution)} cities)")
             ))
-            self.add_route_to_map(m, self.aco_tsp_solution, "blue", "TSP Route")
+            self.add_routes_to_map(m, [(self.aco_tsp_solution, "blue", "TSP Route")])
             
         elif algorithm == "ga":
             m.get_root().html.add_child(folium.Element(
@@ -820,13 +909,10 @@ class OptimizationApp:
             # For VRP, add multiple routes
             colors = ['red', 'green', 'blue', 'purple', 'orange', 'darkblue', 'cadetblue', 
                      'darkgreen', 'darkred', 'darkpurple']
-            for i, route in enumerate(self.ga_solution):
-                vehicle_num = i + 1
-                self.add_route_to_map(
-                    m, route, 
-                    colors[i % len(colors)], 
-                    f"Vehicle {vehicle_num} Route"
-                )
+            self.add_routes_to_map(m, [
+                (route, colors[i % len(colors)], f"Vehicle {i + 1} Route")
+                for i, route in enumerate(self.ga_solution)
+            ])
                 
         elif algorithm == "aco_vrp":
             m.get_root().html.add_child(folium.Element(
@@ -835,13 +921,10 @@ class OptimizationApp:
             # For VRP, add multiple routes
             colors = ['red', 'green', 'blue', 'purple', 'orange', 'darkblue', 'cadetblue', 
                      'darkgreen', 'darkred', 'darkpurple']
-            for i, route in enumerate(self.aco_vrp_solution):
-                vehicle_num = i + 1
-                self.add_route_to_map(
-                    m, route, 
-                    colors[i % len(colors)], 
-                    f"Vehicle {vehicle_num} Route"
-                )
+            self.add_routes_to_map(m, [
+                (route, colors[i % len(colors)], f"Vehicle {i + 1} Route")
+                for i, route in enumerate(self.aco_vrp_solution)
+            ])
         
         # Add legend for VRP solutions
         if algorithm in ["ga", "aco_vrp"]:
@@ -928,145 +1011,121 @@ class OptimizationApp:
         m.save(map_file)
         webbrowser.open('file://' + os.path.realpath(map_file))
     
-    def add_route_to_map(self, m, route, color, route_name="Route"):
-        """Add a route to the map using OpenRouteService directions"""
-        # Create a feature group for the route
-        route_group = folium.FeatureGroup(name=route_name)
-        m.add_child(route_group)
-        
-        is_vrp = len(route) > 0 and route[0] == route[-1]  # Check if this is a VRP route (starts and ends at depot)
-        
-        for i in range(len(route) - 1):
-            if self.api_calls >= self.max_api_calls:
-                # If we've exceeded our API limit, just use direct lines
-                self.add_direct_line(route_group, route[i], route[i+1], color)
-                continue
+    def add_routes_to_map(self, m, routes):
+        """Add routes to the map using OpenRouteService directions
+
+        routes is a list of (route, color, route_name). The directions
+        requests of all routes are fetched in one concurrent batch.
+        """
+        has_api_key = self.ors_api_key and "YOUR_API_KEY" not in self.ors_api_key
+        
+        # Cached legs cost no API calls, legs that should not be routed are drawn as direct lines
+        plans = []
+        requested = []
+        for route, color, route_name in routes:
+            direct_reasons = {}
+            results = {}
+            for i in range(len(route) - 1):
+                cached = self.route_client.cached_leg(route[i], route[i + 1], self.lat_lon_cities)
                 
-            start_idx = route[i]
-            end_idx = route[i + 1]
-            
-            start_city = self.lat_lon_cities[start_idx]
-            end_city = self.lat_lon_cities[end_idx]
-            
-            # Check if the connection might cross water (approximate check based on distance)
-            lat1, lon1 = start_city
-            lat2, lon2 = end_city
-            R = 6371  # Earth radius in km
-            
-            # Calculate great-circle distance
-            dLat = math.radians(lat2 - lat1)
-            dLon = math.radians(lon2 - lon1)
-            a = (math.sin(dLat/2) * math.sin(dLat/2) +
-                 math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) *
-                 math.sin(dLon/2) * math.sin(dLon/2))
-            c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-            distance = R * c
-            
-            # If distance is too large (possibly crossing sea), use a direct line with warning
-            if distance > 500:  # Stricter distance limit for central Europe (500km is a reasonable max)
-                self.add_direct_line(route_group, start_idx, end_idx, color, "Long distance - may require ferry")
-                continue
-            
-            start_coords = self.lat_lon_cities[start_idx][::-1]  # Convert to [lon, lat] for ORS
-            end_coords = self.lat_lon_cities[end_idx][::-1]  # Convert to [lon, lat] for ORS
+                if cached is not None:
+                    results[i] = cached
+                elif not has_api_key:
+                    direct_reasons[i] = "Direct route"
+                elif self.calculate_direct_distance(route[i], route[i + 1]) > 500:
+                    # If distance is too large (possibly crossing sea), use a direct line with warning
+                    # (stricter distance limit for central Europe, 500km is a reasonable max)
+                    direct_reasons[i] = "Long distance - may require ferry"
+            
+            # Group the remaining consecutive legs into multi-waypoint requests
+            runs = []
+            for i in range(len(route) - 1):
+                if i in results or i in direct_reasons:
+                    continue
+                if runs and runs[-1][-1] == i - 1 and len(runs[-1]) < routing.ORS_MAX_WAYPOINTS - 1:
+                    runs[-1].append(i)
+                else:
+                    runs.append([i])
             
-            try:
-                # Get directions from OpenRouteService
-                url = f"https://api.openrouteservice.org/v2/directions/driving-car"
-                headers = {
-                    'Authorization': self.ors_api_key,
-                    'Content-Type': 'application/json; charset=utf-8'
-                }
-                
-                data = {
-                    "coordinates": [start_coords, end_coords],
-                    "format": "geojson",
-                    "preference": "fastest",  # Use fastest route
-                    "instructions": False,    # We don't need turn instructions
-                    "avoid_features": ["ferries"]  # Avoid ferries/water crossings
-                }
-                
-                # If API key is not valid or not set, use direct line
-                if not self.ors_api_key or "YOUR_API_KEY" in self.ors_api_key:
-                    self.add_direct_line(route_group, start_idx, end_idx, color)
+            for run in runs:
+                if self.api_calls >= self.max_api_calls:
+                    # If we've exceeded our API limit, just use direct lines
+                    direct_reasons.update((i, "Direct route") for i in run)
                     continue
-                
-                # Make API request for routing
                 self.api_calls += 1  # Count API calls
-                response = requests.post(url, json=data, headers=headers)
+                requested.append((run, route, results))
+            plans.append((route, color, route_name, direct_reasons, results))
+        
+        # Fetch the runs of every route concurrently, each returns the legs of its run
+        paths = [[route[i] for i in run] + [route[run[-1] + 1]] for run, route, _ in requested]
+        for (run, _, results), legs in zip(requested, self.route_client.fetch_paths(paths, self.lat_lon_cities)):
+            results.update(zip(run, legs))
+        
+        rate_limited = False
+        for route, color, route_name, direct_reasons, results in plans:
+            # Create a feature group for the route
+            route_group = folium.FeatureGroup(name=route_name)
+            m.add_child(route_group)
+            
+            for i in range(len(route) - 1):
+                start_idx = route[i]
+                end_idx = route[i + 1]
                 
-                if response.status_code == 200:
-                    route_data = response.json()
-                    
-                    # Extract route geometry and distance
-                    route_coords = []
-                    distance = 0
-                    
-                    for feature in route_data['features']:
-                        if feature['geometry']['type'] == 'LineString':
-                            # Convert [lon, lat] to [lat, lon] for folium
-                            route_coords = [(coord[1], coord[0]) for coord in feature['geometry']['coordinates']]
-                            if 'properties' in feature and 'summary' in feature['properties']:
-                                distance = feature['properties']['summary'].get('distance', 0)
-                    
-                    # Add route line to map with popup showing distance
-                    if route_coords:
-                        # Check if route distance is much longer than direct distance
-                        # This can indicate a water crossing with a long detour
-                        direct_distance = self.calculate_direct_distance(start_city, end_city)
-                        
-                        if distance/1000 > direct_distance * 2 and distance/1000 > direct_distance + 200:
-                            # If routed distance is much longer than direct (e.g., routing around water bodies)
-                            self.add_direct_line(route_group, start_idx, end_idx, color, 
-                                               "No direct road route")
-                        else:
-                            # Create a popup with the city names and distance
-                            popup_text = f"<b>{self.city_names[start_idx]} → {self.city_names[end_idx]}</b><br>"
-                            popup_text += f"Distance: {distance/1000:.1f} km"
-                            
-                            # Add the line with popup
-                            folium.PolyLine(
-                                route_coords,
-                                color=color,
-                                weight=4,
-                                opacity=0.8,
-                                popup=folium.Popup(popup_text, max_width=300),
-                                tooltip=f"{self.city_names[start_idx]} → {self.city_names[end_idx]}"
-                            ).add_to(route_group)
-                    else:
-                        # Fallback to direct line if no route found
-                        self.add_direct_line(route_group, start_idx, end_idx, color, "No route found")
-                else:
-                    # Handle API error
-                    print(f"API Error: {response.status_code} - {response.text}")
+                if i in direct_reasons:
+                    self.add_direct_line(route_group, start_idx, end_idx, color, direct_reasons[i])
+                    continue
+                
+                result = results[i]
+                if result.ok:
+                    self.add_road_line(route_group, start_idx, end_idx, result.coords, result.distance, color)
+                elif result.status == 200:
+                    # Fallback to direct line if no route found
+                    self.add_direct_line(route_group, start_idx, end_idx, color, "No route found")
+                elif result.status:
+                    # Handle API error (429s were already retried by the client)
+                    logger.warning("Directions request failed: %s", result.error)
                     self.add_direct_line(route_group, start_idx, end_idx, color, "API error")
-                    
-                    # Show warning if we're hitting rate limits
-                    if response.status_code in [429, 403]:
-                        tk.messagebox.showwarning(
-                            "API Limit Reached", 
-                            "OpenRouteService API rate limit reached. Using direct lines instead."
-                        )
-                        self.api_calls = self.max_api_calls  # Force direct lines for remaining routes
-                        
-            except Exception as e:
-                print(f"Error getting directions: {e}")
-                # Fallback to direct line
-                self.add_direct_line(route_group, start_idx, end_idx, color, f"Error: {str(e)[:30]}")
+                    rate_limited = rate_limited or result.status in [429, 403]
+                else:
+                    logger.warning("Error getting directions: %s", result.error)
+                    self.add_direct_line(route_group, start_idx, end_idx, color, result.error)
+        
+        # Show warning if we're hitting rate limits
+        if rate_limited:
+            tk.messagebox.showwarning(
+                "API Limit Reached", 
+                "OpenRouteService API rate limit reached. Using direct lines instead."
+            )
+    
+    def add_road_line(self, route_group, start_idx, end_idx, route_coords, distance, color):
+        """Add the road geometry of one leg, distance in metres"""
+        # Check if route distance is much longer than direct distance
+        # This can indicate a water crossing with a long detour
+        direct_distance = self.calculate_direct_distance(start_idx, end_idx)
+        
+        if distance/1000 > direct_distance * 2 and distance/1000 > direct_distance + 200:
+            # If routed distance is much longer than direct (e.g., routing around water bodies)
+            self.add_direct_line(route_group, start_idx, end_idx, color, 
+                               "No direct road route")
+            return
+        
+        # Create a popup with the city names and distance
+        popup_text = f"<b>{self.city_names[start_idx]} → {self.city_names[end_idx]}</b><br>"
+        popup_text += f"Distance: {distance/1000:.1f} km"
+        
+        # Add the line with popup
+        folium.PolyLine(
+            route_coords,
+            color=color,
+            weight=4,
+            opacity=0.8,
+            popup=folium.Popup(popup_text, max_width=300),
+            tooltip=f"{self.city_names[start_idx]} → {self.city_names[end_idx]}"
+        ).add_to(route_group)
     
-    def calculate_direct_distance(self, start_city, end_city):
-        """Calculate direct distance between two cities in km"""
-        lat1, lon1 = start_city
-        lat2, lon2 = end_city
-        R = 6371  # Radius of the Earth in km
-        dLat = math.radians(lat2 - lat1)
-        dLon = math.radians(lon2 - lon1)
-        a = (math.sin(dLat/2) * math.sin(dLat/2) +
-             math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) *
-             math.sin(dLon/2) * math.sin(dLon/2))
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-        distance = R * c
-        return distance
+    def calculate_direct_distance(self, start_idx, end_idx):
+        """Direct (great-circle) distance between two cities in km"""
+        return float(self.km_distances[start_idx, end_idx])
     
     def add_direct_line(self, route_group, start_idx, end_idx, color, reason="Direct route"):
         """Add a straight line between two points (fallback when API fails)"""
@@ -1074,7 +1133,7 @@ class OptimizationApp:
         end_city = self.lat_lon_cities[end_idx]
         
         # Calculate straight-line distance (approximate)
-        distance = self.calculate_direct_distance(start_city, end_city)
+        distance = self.calculate_direct_distance(start_idx, end_idx)
         
         # Create popup content
         popup_text = f"<b>{self.city_names[start_idx]} → {self.city_names[end_idx]}</b><br>"
@@ -1093,27 +1152,37 @@ class OptimizationApp:
         ).add_to(route_group)
     
     def solve_tsp(self):
-        """Solve TSP using both SA and ACO"""
+        """Solve TSP using both SA and ACO, each on its own worker thread"""
         if not self.cities:
             tk.messagebox.showinfo("Error", "Please generate cities first")
             return
+        if ROAD_MATRIX_JOB in self.solver_jobs:
+            tk.messagebox.showinfo("Error", "Road distances are still being fetched, please wait or cancel")
+            return
+        if self.solver_jobs:
+            tk.messagebox.showinfo("Error", "Solvers are already running")
+            return
             
         # Reset any previous time variables and show "Solving..." indicator
         self.sa_time_var.set("Solving...")
         self.aco_tsp_time_var.set("Solving...")
         self.root.update()  # Force UI update to show "Solving..." message
         
-        # Run Simulated Annealing
+        # Start Simulated Annealing and Ant Colony Optimization side by side
         self.run_simulated_annealing()
-        
-        # Run Ant Colony Optimization for TSP
         self.run_aco_tsp()
     
     def solve_vrp(self):
-        """Solve VRP using both GA and ACO"""
+        """Solve VRP using both GA and ACO, each on its own worker thread"""
         if not self.cities:
             tk.messagebox.showinfo("Error", "Please generate cities first")
             return
+        if ROAD_MATRIX_JOB in self.solver_jobs:
+            tk.messagebox.showinfo("Error", "Road distances are still being fetched, please wait or cancel")
+            return
+        if self.solver_jobs:
+            tk.messagebox.showinfo("Error", "Solvers are already running")
+            return
         
         # Check if depot is selected
         if self.depot_index is None:
@@ -1125,110 +1194,123 @@ class OptimizationApp:
         self.aco_vrp_time_var.set("Solving...")
         self.root.update()  # Force UI update to show "Solving..." message
         
-        # Run Genetic Algorithm
+        # Start the Genetic Algorithm and Ant Colony Optimization side by side
         self.run_genetic_algorithm()
-        
-        # Run Ant Colony Optimization for VRP
         self.run_aco_vrp()
     
+    def start_solver(self, name, solve, finish, time_var, cost_var, live):
+        """Run solve(progress=..., improvement=...) on a worker thread and hand its result to finish
+        
+        The worker never touches Tk: best-so-far solutions and the final result
+        are queued and applied on the Tk thread by poll_solvers, which streams
+        them into the LivePlot live. Jobs without a cost or plot pass None
+        for cost_var and live.
+        """
+        cancel = threading.Event()
+        self.solver_jobs[name] = {"cancel": cancel, "finish": finish, "live": live,
+                                  "time_var": time_var, "cost_var": cost_var}
+        
+        def progress(iteration, best_cost):
+            self.solver_events.put(("progress", name, best_cost))
+            return cancel.is_set()
+        
+        def improvement(iteration, best_cost, elapsed, solution):
+            self.solver_events.put(("improvement", name, (best_cost, elapsed, solution)))
+        
+        def work():
+            try:
+                self.solver_events.put(("done", name, solve(progress=progress, improvement=improvement)))
+            except Exception as e:
+                self.solver_events.put(("error", name, e))
+        
+        threading.Thread(target=work, daemon=True).start()
+        if len(self.solver_jobs) == 1:
+            self.root.after(SOLVER_POLL_MS, self.poll_solvers)
+    
+    def poll_solvers(self):
+        """Apply the progress and results queued by the solver threads"""
+        while True:
+            try:
+                kind, name, payload = self.solver_events.get_nowait()
+            except queue.Empty:
+                break
+            job = self.solver_jobs.get(name)
+            if job is None:
+                continue
+            if kind == "progress":
+                if job["cost_var"] is not None and math.isfinite(payload):
+                    job["cost_var"].set(f"{payload:.2f}")
+                continue
+            if kind == "improvement":
+                job["live"].add(*payload)
+                job["cost_var"].set(f"{payload[0]:.2f}")
+                continue
+            del self.solver_jobs[name]
+            if job["live"] is not None:
+                job["live"].stop()
+            if kind == "error":
+                job["time_var"].set("Failed")
+                tk.messagebox.showerror("Error", f"Solver failed: {payload}")
+            else:
+                job["finish"](payload)
+        
+        # Redraws are throttled inside LivePlot
+        for job in self.solver_jobs.values():
+            if job["live"] is not None:
+                job["live"].refresh()
+        
+        if self.solver_jobs:
+            self.root.after(SOLVER_POLL_MS, self.poll_solvers)
+    
+    def cancel_solvers(self, names):
+        """Ask running solvers to stop; they finish with their best solution so far"""
+        for name in names:
+            job = self.solver_jobs.get(name)
+            if job is not None:
+                job["cancel"].set()
+                job["time_var"].set("Cancelling...")
+    
+    def show_run_time(self, time_var, result):
+        """Show the run time, marking runs that were cancelled"""
+        cancelled = " (cancelled)" if result.stop_reason == "cancelled" else ""
+        time_var.set(f"{result.elapsed:.2f} sec{cancelled}")
+    
     def run_simulated_annealing(self):
         """Solve TSP using Simulated Annealing"""
         # Clear previous solution
-        self.sa_ax.clear()
-        
-        # Plot cities
-        for i, city in enumerate(self.cities):
-            self.sa_ax.plot(city[0], city[1], 'ko')
-            # Add city name
-            if self.num_cities <= 20:
-                self.sa_ax.annotate(f"{i}:{self.city_names[i]}", 
-                                   (city[0], city[1]), 
-                                   xytext=(5, 0), 
-                                   textcoords='offset points',
-                                   fontsize=8)
-            else:
-                self.sa_ax.annotate(f"{i}", 
-                                   (city[0], city[1]), 
-                                   xytext=(5, 0), 
-                                   textcoords='offset points',
-                                   fontsize=8)
-        
-        # Get parameters
-        temperature = self.sa_params["temperature"]
-        cooling_rate = self.sa_params["cooling_rate"]
-        iterations = self.sa_params["iterations"]
-        
-        # Initial solution: random permutation
-        current_solution = list(range(self.num_cities))
-        random.shuffle(current_solution)
-        current_distance = self.calculate_route_distance(current_solution)
-        
-        best_solution = current_solution[:]
-        best_distance = current_distance
-        
-        # Start time
-        start_time = time.time()
-        
-        # SA algorithm
-        for iteration in range(iterations):
-            if iteration % 1000 == 0:  # Update UI every 1000 iterations
-                self.root.update_idletasks()
-            
-            # Create a new solution by swapping two cities
-            new_solution = current_solution[:]
-            
-            # Use different neighbor generation methods
-            if self.sa_params["neighbor_method"] == "swap":
-                # Swap two random cities
-                i, j = random.sample(range(self.num_cities), 2)
-                new_solution[i], new_solution[j] = new_solution[j], new_solution[i]
-            elif self.sa_params["neighbor_method"] == "insert":
-                # Remove a city and insert it at a different position
-                i = random.randint(0, self.num_cities - 1)
-                j = random.randint(0, self.num_cities - 1)
-                if i != j:
-                    city = new_solution.pop(i)
-                    new_solution.insert(j, city)
-            else:
-                # Default to swap
-                i, j = random.sample(range(self.num_cities), 2)
-                new_solution[i], new_solution[j] = new_solution[j], new_solution[i]
-            
-            # Calculate new distance
-            new_distance = self.calculate_route_distance(new_solution)
-            
-            # Decide if we should accept the new solution
-            delta = new_distance - current_distance
-            if delta < 0 or random.random() < math.exp(-delta / temperature):
-                current_solution = new_solution
-                current_distance = new_distance
-                
-            # Update best solution if needed
-            if new_distance < best_distance:
-                best_solution = new_solution[:]
-                best_distance = new_distance
-            
-            # Cool down
-            temperature *= cooling_rate
-            
-            # Stop if temperature is too low (system is frozen)
-            if temperature < 0.01:
-                break
-        
-        # End time
-        end_time = time.time()
-        execution_time = end_time - start_time
+        self.sa_view.clear_solution()
+        
+        # Run the headless solver in the background
+        sa_params = dict(self.sa_params)
+        mode = sa_params.pop("parallel_mode")
+        replicas = sa_params.pop("replicas")
+        if mode == "multistart":
+            solve = partial(parallel.multi_start_annealing, self.distances, solvers.SAParams(**sa_params),
+                            starts=replicas, candidates=self.candidates)
+        elif mode == "tempering":
+            solve = partial(parallel.parallel_tempering, self.distances, solvers.SAParams(**sa_params),
+                            parallel.TemperingParams(replicas=replicas), candidates=self.candidates)
+        else:
+            # A process of its own, so the pure-Python loop does not hold this process's GIL
+            solve = partial(parallel.annealing_process, self.distances, solvers.SAParams(**sa_params),
+                            candidates=self.candidates)
+        live = LivePlot(self.sa_canvas, self.sa_ax, self.sa_convergence_ax, self.cities)
+        self.start_solver("sa", solve, self.finish_simulated_annealing, self.sa_time_var, self.sa_cost_var, live)
+    
+    def finish_simulated_annealing(self, result):
+        """Show a finished Simulated Annealing run"""
+        best_solution = list(result.tour)
         
         # Update metrics
-        self.sa_time_var.set(f"{execution_time:.2f} sec")
-        self.sa_cost_var.set(f"{best_distance:.2f}")
+        self.show_run_time(self.sa_time_var, result)
+        self.sa_cost_var.set(f"{result.cost:.2f}")
         
         # Add the first city to the end to complete the tour
         if len(best_solution) > 0 and best_solution[0] != best_solution[-1]:
             best_solution.append(best_solution[0])
         
         # Plot best solution
-        self.plot_tsp_solution(self.sa_ax, best_solution)
+        self.plot_tsp_solution(self.sa_view, best_solution)
         self.sa_canvas.draw()
         
         # Save best solution for map display
@@ -1237,122 +1319,33 @@ class OptimizationApp:
     def run_aco_tsp(self):
         """Solve TSP using Ant Colony Optimization"""
         # Clear previous solution
-        self.aco_tsp_ax.clear()
-        
-        # Plot cities
-        for i, city in enumerate(self.cities):
-            self.aco_tsp_ax.plot(city[0], city[1], 'ko')
-            # Add city name
-            if self.num_cities <= 20:
-                self.aco_tsp_ax.annotate(f"{i}:{self.city_names[i]}", 
-                                        (city[0], city[1]), 
-                                        xytext=(5, 0), 
-                                        textcoords='offset points',
-                                        fontsize=8)
-            else:
-                self.aco_tsp_ax.annotate(f"{i}", 
-                                        (city[0], city[1]), 
-                                        xytext=(5, 0), 
-                                        textcoords='offset points',
-                                        fontsize=8)
-        
-        # Get parameters
-        n_ants = self.aco_tsp_params["n_ants"]
-        n_iterations = self.aco_tsp_params["n_iterations"]
-        decay = self.aco_tsp_params["decay"]
-        alpha = self.aco_tsp_params["alpha"]
-        beta = self.aco_tsp_params["beta"]
-        initial_pheromone = self.aco_tsp_params["initial_pheromone"]
-        
-        # Initialize pheromone matrix
-        pheromone = np.ones((self.num_cities, self.num_cities)) * initial_pheromone
-        
-        best_solution = None
-        best_distance = float('inf')
-        
-        # Start time
-        start_time = time.time()
-        
-        # ACO algorithm
-        for iteration in range(n_iterations):
-            if iteration % 10 == 0:  # Update UI every 10 iterations
-                self.root.update_idletasks()
-                
-            # For each ant
-            ant_solutions = []
-            ant_distances = []
-            
-            for ant in range(n_ants):
-                # Start at a random city
-                current_city = random.randint(0, self.num_cities - 1)
-                solution = [current_city]
-                visited = set([current_city])
-                
-                # Visit all cities
-                while len(visited) < self.num_cities:
-                    unvisited = [city for city in range(self.num_cities) if city not in visited]
-                    
-                    # Calculate probabilities for next city
-                    probabilities = []
-                    for city in unvisited:
-                        # Probability based on pheromone and distance
-                        prob = (pheromone[current_city][city] ** alpha) * ((1.0 / max(0.1, self.distances[current_city][city])) ** beta)
-                        probabilities.append(prob)
-                    
-                    # Normalize probabilities
-                    total = sum(probabilities)
-                    if total > 0:
-                        probabilities = [p / total for p in probabilities]
-                        # Choose next city based on probabilities
-                        next_city = np.random.choice(unvisited, p=probabilities)
-                    else:
-                        # If all probabilities are 0, choose randomly
-                        next_city = random.choice(unvisited)
-                    
-                    solution.append(next_city)
-                    visited.add(next_city)
-                    current_city = next_city
-                
-                # Return to starting city to complete the tour
-                solution.append(solution[0])
-                
-                # Calculate total distance
-                distance = self.calculate_route_distance(solution)
-                ant_solutions.append(solution)
-                ant_distances.append(distance)
-                
-                # Update best solution if needed
-                if distance < best_distance:
-                    best_solution = solution[:]
-                    best_distance = distance
-            
-            # Update pheromone levels
-            pheromone *= decay
-            
-            # Add new pheromones from ant trails
-            for ant, solution in enumerate(ant_solutions):
-                pheromone_to_add = 1.0 / ant_distances[ant]
-                for i in range(len(solution) - 1):
-                    pheromone[solution[i]][solution[i+1]] += pheromone_to_add
-                    pheromone[solution[i+1]][solution[i]] += pheromone_to_add  # Symmetric TSP
-            
-            # Elitist strategy: add extra pheromone to best solution
-            if best_solution:
-                elite_pheromone = 2.0 / best_distance
-                for i in range(len(best_solution) - 1):
-                    pheromone[best_solution[i]][best_solution[i+1]] += elite_pheromone
-                    pheromone[best_solution[i+1]][best_solution[i]] += elite_pheromone
-        
-        # End time
-        end_time = time.time()
-        execution_time = end_time - start_time
+        self.aco_tsp_view.clear_solution()
+        
+        # Run the headless solver in the background
+        aco_params = dict(self.aco_tsp_params)
+        colonies = aco_params.pop("colonies")
+        if colonies > 1:
+            solve = partial(parallel.multi_colony_aco_tsp, self.distances, solvers.ACOTSPParams(**aco_params),
+                            parallel.ColonyParams(colonies=colonies), candidates=self.candidates)
+        else:
+            solve = partial(solvers.aco_tsp, self.distances, solvers.ACOTSPParams(**aco_params),
+                            candidates=self.candidates)
+        live = LivePlot(self.aco_tsp_canvas, self.aco_tsp_ax, self.aco_tsp_convergence_ax, self.cities)
+        self.start_solver("aco_tsp", solve, self.finish_aco_tsp, self.aco_tsp_time_var, self.aco_tsp_cost_var, live)
+    
+    def finish_aco_tsp(self, result):
+        """Show a finished Ant Colony Optimization (TSP) run"""
+        if not result.tour:
+            self.aco_tsp_time_var.set("Cancelled")
+            return
+        best_solution = list(result.tour) + [result.tour[0]]
         
         # Update metrics
-        self.aco_tsp_time_var.set(f"{execution_time:.2f} sec")
-        self.aco_tsp_cost_var.set(f"{best_distance:.2f}")
+        self.show_run_time(self.aco_tsp_time_var, result)
+        self.aco_tsp_cost_var.set(f"{result.cost:.2f}")
         
         # Plot best solution
-        self.plot_tsp_solution(self.aco_tsp_ax, best_solution)
+        self.plot_tsp_solution(self.aco_tsp_view, best_solution)
         self.aco_tsp_canvas.draw()
         
         # Save best solution for map display
@@ -1361,478 +1354,90 @@ class OptimizationApp:
     def run_genetic_algorithm(self):
         """Solve VRP using Genetic Algorithm"""
         # Clear previous solution
-        self.ga_ax.clear()
-        
-        # Plot cities with depot highlighted
-        for i, city in enumerate(self.cities):
-            if i == self.depot_index:
-                self.ga_ax.plot(city[0], city[1], 'ro', markersize=10)
-                self.ga_ax.annotate("DEPOT", 
-                                  (city[0], city[1]), 
-                                  xytext=(5, 0), 
-                                  textcoords='offset points',
-                                  fontsize=8,
-                                  weight='bold')
-            else:
-                self.ga_ax.plot(city[0], city[1], 'ko')
-                # No city names displayed
-        
-        # Get parameters
-        population_size = self.ga_params["population_size"]
-        generations = self.ga_params["generations"]
-        mutation_rate = self.ga_params["mutation_rate"]
-        crossover_rate = self.ga_params["crossover_rate"]
-        num_vehicles = self.ga_params["num_vehicles"]
-        
-        # Start time
-        start_time = time.time()
-        
-        # Generate initial population
-        population = []
-        for _ in range(population_size):
-            # Create a random chromosome (excluding depot)
-            chromosome = list(range(self.num_cities))
-            chromosome.remove(self.depot_index)
-            random.shuffle(chromosome)
-            population.append(chromosome)
-        
-        best_solution = None
-        best_fitness = float('inf')
-        
-        # GA algorithm
-        for generation in range(generations):
-            if generation % 10 == 0:  # Update UI every 10 generations
-                self.root.update_idletasks()
-                
-            # Evaluate fitness for each chromosome
-            fitness_scores = []
-            for chromosome in population:
-                # Split chromosome into vehicle routes
-                routes = self.split_into_routes(chromosome, num_vehicles)
-                # Calculate total distance
-                total_distance = 0
-                for route in routes:
-                    if route:  # Check if route is not empty
-                        # Add depot at beginning and end
-                        full_route = [self.depot_index] + route + [self.depot_index]
-                        total_distance += self.calculate_route_distance(full_route)
-                
-                fitness_scores.append(total_distance)
-            
-            # Update best solution if needed
-            min_fitness_idx = fitness_scores.index(min(fitness_scores))
-            if fitness_scores[min_fitness_idx] < best_fitness:
-                best_fitness = fitness_scores[min_fitness_idx]
-                best_solution = self.split_into_routes(population[min_fitness_idx], num_vehicles)
-            
-            # Create new population
-            new_population = []
-            
-            # Elitism: keep the best chromosome
-            elite_idx = fitness_scores.index(min(fitness_scores))
-            new_population.append(population[elite_idx])
-            
-            while len(new_population) < population_size:
-                # Selection: tournament selection
-                if self.ga_params["selection_method"] == "tournament":
-                    parent1 = self.tournament_selection(population, fitness_scores)
-                    parent2 = self.tournament_selection(population, fitness_scores)
-                else:  # Roulette wheel selection
-                    parent1 = self.roulette_selection(population, fitness_scores)
-                    parent2 = self.roulette_selection(population, fitness_scores)
-                
-                # Crossover
-                if random.random() < crossover_rate:
-                    child1, child2 = self.crossover(parent1, parent2)
-                else:
-                    child1, child2 = parent1[:], parent2[:]
-                
-                # Mutation
-                if random.random() < mutation_rate:
-                    child1 = self.mutate(child1)
-                if random.random() < mutation_rate:
-                    child2 = self.mutate(child2)
-                
-                new_population.append(child1)
-                if len(new_population) < population_size:
-                    new_population.append(child2)
-            
-            population = new_population
-        
-        # End time
-        end_time = time.time()
-        execution_time = end_time - start_time
+        self.ga_view.clear_solution()
+        
+        # Run the headless solver in the background
+        ga_params = dict(self.ga_params)
+        islands = ga_params.pop("islands")
+        if islands > 1:
+            solve = partial(parallel.island_genetic_algorithm, self.distances, solvers.GAParams(**ga_params),
+                            parallel.IslandParams(islands=islands), depot=self.depot_index,
+                            candidates=self.candidates)
+        else:
+            solve = partial(solvers.genetic_algorithm, self.distances, solvers.GAParams(**ga_params),
+                            depot=self.depot_index, candidates=self.candidates)
+        live = LivePlot(self.ga_canvas, self.ga_ax, self.ga_convergence_ax, self.cities)
+        self.start_solver("ga", solve, self.finish_genetic_algorithm, self.ga_time_var, self.ga_cost_var, live)
+    
+    def finish_genetic_algorithm(self, result):
+        """Show a finished Genetic Algorithm run"""
+        if not result.routes:
+            self.ga_time_var.set("Cancelled" if result.stop_reason == "cancelled" else "No feasible solution")
+            return
         
         # Update metrics
-        self.ga_time_var.set(f"{execution_time:.2f} sec")
-        self.ga_cost_var.set(f"{best_fitness:.2f}")
-        
-        # Format solution for plotting: add depot to start and end of each route
-        best_solution_with_depot = []
-        for route in best_solution:
-            if route:  # Check if route is not empty
-                best_solution_with_depot.append([self.depot_index] + route + [self.depot_index])
-        
-        # Plot best solution
-        self.plot_vrp_solution(self.ga_ax, best_solution_with_depot)
+        self.show_run_time(self.ga_time_var, result)
+        self.ga_cost_var.set(f"{result.cost:.2f}")
+        lookups = result.counters["cache_hits"] + result.counters["cache_misses"]
+        if lookups:
+            logger.info("GA fitness cache: %d/%d hits (%.0f%%)", result.counters["cache_hits"], lookups,
+                        100 * result.counters["cache_hits"] / lookups)
+        
+        # Plot best solution (routes already start and end at the depot)
+        self.plot_vrp_solution(self.ga_view, result.routes)
         self.ga_canvas.draw()
         
         # Save best solution for map display
-        self.ga_solution = best_solution_with_depot
+        self.ga_solution = result.routes
     
     def run_aco_vrp(self):
         """Solve VRP using Ant Colony Optimization"""
         # Clear previous solution
-        self.aco_vrp_ax.clear()
-        
-        # Plot cities with depot highlighted
-        for i, city in enumerate(self.cities):
-            if i == self.depot_index:
-                self.aco_vrp_ax.plot(city[0], city[1], 'ro', markersize=10)
-                self.aco_vrp_ax.annotate("DEPOT", 
-                                       (city[0], city[1]), 
-                                       xytext=(5, 0), 
-                                       textcoords='offset points',
-                                       fontsize=8,
-                                       weight='bold')
-            else:
-                self.aco_vrp_ax.plot(city[0], city[1], 'ko')
-                # No city names displayed
-        
-        # Get parameters
-        n_ants = self.aco_vrp_params["n_ants"]
-        n_iterations = self.aco_vrp_params["n_iterations"]
-        decay = self.aco_vrp_params["decay"]
-        alpha = self.aco_vrp_params["alpha"]
-        beta = self.aco_vrp_params["beta"]
-        num_vehicles = self.aco_vrp_params["num_vehicles"]
-        initial_pheromone = self.aco_vrp_params["initial_pheromone"]
-        
-        # Initialize pheromone matrix
-        pheromone = np.ones((self.num_cities, self.num_cities)) * initial_pheromone
-        
-        best_solution = None
-        best_distance = float('inf')
-        
-        # Start time
-        start_time = time.time()
-        
-        # Cities excluding depot
-        non_depot_cities = [i for i in range(self.num_cities) if i != self.depot_index]
-        
-        # ACO algorithm with multiple colony approach
-        for iteration in range(n_iterations):
-            if iteration % 10 == 0:  # Update UI every 10 iterations
-                self.root.update_idletasks()
-                
-            # For each ant
-            ant_solutions = []
-            ant_distances = []
-            
-            for ant in range(n_ants):
-                # Create empty routes for each vehicle
-                routes = [[] for _ in range(num_vehicles)]
-                
-                # Make a copy of cities to visit
-                cities_to_visit = non_depot_cities.copy()
-                
-                # Assign cities to vehicles using ACO principles
-                for vehicle in range(num_vehicles):
-                    if not cities_to_visit:
-                        break
-                        
-                    # Start from depot
-                    current_city = self.depot_index
-                    
-                    # Build a route for this vehicle
-                    route = []
-                    while cities_to_visit and len(route) < len(non_depot_cities) // num_vehicles + 2:
-                        # Calculate probabilities for next city
-                        probabilities = []
-                        for city in cities_to_visit:
-                            # Probability based on pheromone and distance
-                            prob = (pheromone[current_city][city] ** alpha) * ((1.0 / max(0.1, self.distances[current_city][city])) ** beta)
-                            probabilities.append(prob)
-                        
-                        # Normalize probabilities
-                        total = sum(probabilities)
-                        if total > 0:
-                            probabilities = [p / total for p in probabilities]
-                            # Choose next city based on probabilities
-                            city_idx = np.random.choice(range(len(cities_to_visit)), p=probabilities)
-                        else:
-                            # If all probabilities are 0, choose randomly
-                            city_idx = random.randrange(len(cities_to_visit))
-                        
-                        next_city = cities_to_visit.pop(city_idx)
-                        route.append(next_city)
-                        current_city = next_city
-                    
-                    # Save this vehicle's route
-                    routes[vehicle] = route
-                
-                # Assign any remaining cities
-                vehicle_index = 0
-                while cities_to_visit:
-                    routes[vehicle_index % num_vehicles].append(cities_to_visit.pop(0))
-                    vehicle_index += 1
-                
-                # Add depot at start and end of each route
-                full_routes = []
-                for route in routes:
-                    if route:  # Check if route is not empty
-                        full_routes.append([self.depot_index] + route + [self.depot_index])
-                
-                # Calculate total distance
-                total_distance = 0
-                for route in full_routes:
-                    total_distance += self.calculate_route_distance(route)
-                
-                ant_solutions.append(full_routes)
-                ant_distances.append(total_distance)
-                
-                # Update best solution if needed
-                if total_distance < best_distance:
-                    best_solution = [r[:] for r in full_routes]
-                    best_distance = total_distance
-            
-            # Update pheromone levels
-            pheromone *= decay
-            
-            # Add new pheromones from ant trails
-            for ant, solution in enumerate(ant_solutions):
-                pheromone_to_add = 1.0 / ant_distances[ant]
-                for route in solution:
-                    for i in range(len(route) - 1):
-                        pheromone[route[i]][route[i+1]] += pheromone_to_add
-                        pheromone[route[i+1]][route[i]] += pheromone_to_add  # Symmetric VRP
-            
-            # Elitist strategy: add extra pheromone to best solution
-            if best_solution:
-                elite_pheromone = 2.0 / best_distance
-                for route in best_solution:
-                    for i in range(len(route) - 1):
-                        pheromone[route[i]][route[i+1]] += elite_pheromone
-                        pheromone[route[i+1]][route[i]] += elite_pheromone
-        
-        # End time
-        end_time = time.time()
-        execution_time = end_time - start_time
+        self.aco_vrp_view.clear_solution()
+        
+        # Run the headless solver in the background
+        aco_params = dict(self.aco_vrp_params)
+        colonies = aco_params.pop("colonies")
+        if colonies > 1:
+            solve = partial(parallel.multi_colony_aco_vrp, self.distances, solvers.ACOVRPParams(**aco_params),
+                            parallel.ColonyParams(colonies=colonies), depot=self.depot_index,
+                            candidates=self.candidates)
+        else:
+            solve = partial(solvers.aco_vrp, self.distances, solvers.ACOVRPParams(**aco_params),
+                            depot=self.depot_index, candidates=self.candidates)
+        live = LivePlot(self.aco_vrp_canvas, self.aco_vrp_ax, self.aco_vrp_convergence_ax, self.cities)
+        self.start_solver("aco_vrp", solve, self.finish_aco_vrp, self.aco_vrp_time_var, self.aco_vrp_cost_var, live)
+    
+    def finish_aco_vrp(self, result):
+        """Show a finished Ant Colony Optimization (VRP) run"""
+        if not result.routes:
+            self.aco_vrp_time_var.set("Cancelled")
+            return
         
         # Update metrics
-        self.aco_vrp_time_var.set(f"{execution_time:.2f} sec")
-        self.aco_vrp_cost_var.set(f"{best_distance:.2f}")
+        self.show_run_time(self.aco_vrp_time_var, result)
+        self.aco_vrp_cost_var.set(f"{result.cost:.2f}")
         
         # Plot best solution
-        self.plot_vrp_solution(self.aco_vrp_ax, best_solution)
+        self.plot_vrp_solution(self.aco_vrp_view, result.routes)
         self.aco_vrp_canvas.draw()
         
         # Save best solution for map display
-        self.aco_vrp_solution = best_solution
+        self.aco_vrp_solution = result.routes
     
-    def calculate_route_distance(self, route):
-        """Calculate the total distance of a route"""
-        total_distance = 0
-        for i in range(len(route) - 1):
-            total_distance += self.distances[route[i]][route[i+1]]
-        return total_distance
+    def tsp_city_labels(self):
+        """City labels for the TSP plots, with names for small instances"""
+        if self.num_cities <= 20:
+            return [f"{i}:{name}" for i, name in enumerate(self.city_names)]
+        return [f"{i}" for i in range(len(self.cities))]
     
-    def plot_tsp_solution(self, ax, solution):
-        """Plot TSP solution on the given axes"""
-        # Plot cities
-        for i, city in enumerate(self.cities):
-            ax.plot(city[0], city[1], 'ko')
-            # Add city name
-            if self.num_cities <= 20:
-                ax.annotate(f"{i}:{self.city_names[i]}", 
-                           (city[0], city[1]), 
-                           xytext=(5, 0), 
-                           textcoords='offset points',
-                           fontsize=8)
-            else:
-                ax.annotate(f"{i}", 
-                           (city[0], city[1]), 
-                           xytext=(5, 0), 
-                           textcoords='offset points',
-                           fontsize=8)
-        
-        # Plot route connections
-        for i in range(len(solution) - 1):
-            city1 = self.cities[solution[i]]
-            city2 = self.cities[solution[i+1]]
-            ax.plot([city1[0], city2[0]], [city1[1], city2[1]], 'b-')
-            
-            # Add direction arrow if we have few cities
-            if self.num_cities <= 20:
-                # Add an arrow in the middle of the line
-                arrow_pos = 0.5  # Position along the line (0.5 = middle)
-                mid_x = city1[0] + arrow_pos * (city2[0] - city1[0])
-                mid_y = city1[1] + arrow_pos * (city2[1] - city1[1])
-                
-                # Direction vector
-                dx = city2[0] - city1[0]
-                dy = city2[1] - city1[1]
-                
-                # Normalize and scale
-                length = np.sqrt(dx**2 + dy**2)
-                dx = dx / length * 5  # Scale arrow size
-                dy = dy / length * 5
-                
-                # Add the arrow
-                ax.arrow(mid_x - dx/2, mid_y - dy/2, dx, dy, 
-                        head_width=1.5, head_length=1.5, fc='blue', ec='blue')
-                
-                # Add sequence number
-                ax.text(mid_x, mid_y, f"{i}", 
-                       fontsize=7, ha='center', va='center',
-                       bbox=dict(facecolor='white', alpha=0.7, edgecolor='none', pad=1))
-        
-        ax.set_xlim(-5, 105)
-        ax.set_ylim(-5, 105)
-    
-    def plot_vrp_solution(self, ax, routes):
-        """Plot VRP solution with multiple routes on given axes"""
-        # Plot cities without names - just dots
-        for i, city in enumerate(self.cities):
-            if i == self.depot_index:
-                ax.plot(city[0], city[1], 'ro', markersize=10)
-                # Only show depot name
-                ax.annotate(f"DEPOT", 
-                           (city[0], city[1]), 
-                           xytext=(5, 0), 
-                           textcoords='offset points',
-                           fontsize=8,
-                           weight='bold')
-            else:
-                ax.plot(city[0], city[1], 'ko')
-                # No city names displayed
-        
-        # Colors for different routes
-        colors = ['red', 'green', 'blue', 'purple', 'orange', 'brown', 'pink', 'gray']
-        
-        # Plot each route with a different color
-        for i, route in enumerate(routes):
-            color = colors[i % len(colors)]
-            # Add text label for the vehicle
-            ax.text(0.02, 0.98 - (0.05 * i), f"Vehicle {i+1}",
-                   horizontalalignment='left',
-                   verticalalignment='top',
-                   transform=ax.transAxes,
-                   color=color,
-                   bbox=dict(facecolor='white', alpha=0.7))
-            
-            # Plot route connections
-            for j in range(len(route) - 1):
-                city1 = self.cities[route[j]]
-                city2 = self.cities[route[j+1]]
-                ax.plot([city1[0], city2[0]], [city1[1], city2[1]], color=color)
-                
-                # Add direction arrow if we have few cities
-                if self.num_cities <= 20:
-                    # Add an arrow in the middle of the line
-                    arrow_pos = 0.5  # Position along the line (0.5 = middle)
-                    mid_x = city1[0] + arrow_pos * (city2[0] - city1[0])
-                    mid_y = city1[1] + arrow_pos * (city2[1] - city1[1])
-                    
-                    # Direction vector
-                    dx = city2[0] - city1[0]
-                    dy = city2[1] - city1[1]
-                    
-                    # Normalize and scale
-                    length = np.sqrt(dx**2 + dy**2)
-                    dx = dx / length * 5  # Scale arrow size
-                    dy = dy / length * 5
-                    
-                    # Add the arrow
-                    ax.arrow(mid_x - dx/2, mid_y - dy/2, dx, dy, 
-                            head_width=1.5, head_length=1.5, fc=color, ec=color)
-        
-        ax.set_xlim(-5, 105)
-        ax.set_ylim(-5, 105)
+    def plot_tsp_solution(self, view, solution):
+        """Plot a closed TSP tour on the given SolutionView"""
+        view.show_tour(solution)
     
-    def split_into_routes(self, chromosome, num_vehicles):
-        """Split a chromosome into multiple vehicle routes"""
-        route_size = len(chromosome) // num_vehicles
-        routes = []
-        
-        for i in range(num_vehicles):
-            start_idx = i * route_size
-            end_idx = (i + 1) * route_size if i < num_vehicles - 1 else len(chromosome)
-            routes.append(chromosome[start_idx:end_idx])
-        
-        return routes
-    
-    def tournament_selection(self, population, fitness_scores, tournament_size=3):
-        """Tournament selection for GA"""
-        tournament_indices = random.sample(range(len(population)), tournament_size)
-        tournament_fitness = [fitness_scores[i] for i in tournament_indices]
-        winner_idx = tournament_indices[tournament_fitness.index(min(tournament_fitness))]
-        return population[winner_idx]
-    
-    def roulette_selection(self, population, fitness_scores):
-        """Roulette wheel selection for GA"""
-        # Since we want to minimize distance, invert fitness scores
-        # Add a small constant to avoid division by zero
-        inverted_scores = [1.0 / (score + 0.1) for score in fitness_scores]
-        total_fitness = sum(inverted_scores)
-        
-        # Normalize to get probabilities
-        selection_probs = [score / total_fitness for score in inverted_scores]
-        
-        # Select based on probabilities
-        selected_idx = np.random.choice(range(len(population)), p=selection_probs)
-        return population[selected_idx]
-    
-    def crossover(self, parent1, parent2):
-        """Order crossover (OX) for permutation encoding"""
-        size = len(parent1)
-        
-        # Choose crossover points
-        cxpoint1 = random.randint(0, size - 1)
-        cxpoint2 = random.randint(0, size - 1)
-        if cxpoint1 > cxpoint2:
-            cxpoint1, cxpoint2 = cxpoint2, cxpoint1
-        
-        # Create children with empty values
-        child1 = [-1] * size
-        child2 = [-1] * size
-        
-        # Copy crossover segment
-        for i in range(cxpoint1, cxpoint2 + 1):
-            child1[i] = parent1[i]
-            child2[i] = parent2[i]
-        
-        # Fill remaining positions for child1
-        current_idx = (cxpoint2 + 1) % size
-        parent_idx = (cxpoint2 + 1) % size
-        
-        while -1 in child1:
-            if parent2[parent_idx] not in child1:
-                child1[current_idx] = parent2[parent_idx]
-                current_idx = (current_idx + 1) % size
-            parent_idx = (parent_idx + 1) % size
-        
-        # Fill remaining positions for child2
-        current_idx = (cxpoint2 + 1) % size
-        parent_idx = (cxpoint2 + 1) % size
-        
-        while -1 in child2:
-            if parent1[parent_idx] not in child2:
-                child2[current_idx] = parent1[parent_idx]
-                current_idx = (current_idx + 1) % size
-            parent_idx = (parent_idx + 1) % size
-        
-        return child1, child2
-    
-    def mutate(self, chromosome):
-        """Swap mutation for permutation encoding"""
-        # Select two random positions
-        pos1, pos2 = random.sample(range(len(chromosome)), 2)
-        
-        # Swap values
-        chromosome[pos1], chromosome[pos2] = chromosome[pos2], chromosome[pos1]
-        
-        return chromosome
+    def plot_vrp_solution(self, view, routes):
+        """Plot VRP solution with one color per route on the given SolutionView"""
+        view.show_routes(routes)
     
     def show_algorithm_params(self, algorithm):
         """Display a window with editable algorithm parameters"""
@@ -1896,8 +1501,14 @@ class OptimizationApp:
             params = [
                 ("Initial Temperature", str(self.sa_params["temperature"]), "Higher values increase the chance of accepting worse solutions early"),
                 ("Cooling Rate", str(self.sa_params["cooling_rate"]), "Controls how quickly the temperature decreases (0-1)"),
-                ("Iterations", str(self.sa_params["iterations"]), "Maximum number of iterations"),
-                ("Neighbor Generation", self.sa_params["neighbor_method"], "Method to generate neighbors (swap/insert)"),
+                ("Iterations", str(self.sa_params["iterations"]), "Maximum number of iterations (ignored when a time limit is set)"),
+                ("Neighbor Generation", self.sa_params["neighbor_method"], "Method to generate neighbors (swap/insert/2-opt/or-opt). 2-opt reverses a segment, or-opt moves a short segment elsewhere"),
+                ("Time Limit (s)", str(self.sa_params["time_limit"]), "Run for exactly this many seconds instead of a fixed number of iterations (0 = off)"),
+                ("Stagnation Limit", str(self.sa_params["stagnation_limit"]), "Stop after this many iterations without a better solution (0 = off)"),
+                ("Cooling Schedule", self.sa_params["cooling_schedule"], "geometric: multiply by the cooling rate each iteration; budget: derive the rate so the temperature bottoms out exactly when the iterations or time run out"),
+                ("Reheat After", str(self.sa_params["reheat_after"]), "Raise the temperature again after this many iterations without a better solution (0 = off)"),
+                ("Parallel Mode", self.sa_params["parallel_mode"], "Run replicas in parallel processes: off, multistart (independent runs) or tempering (replicas at a temperature ladder swap tours)"),
+                ("Replicas", str(self.sa_params["replicas"]), "Number of parallel replicas for multistart or tempering"),
             ]
             
         elif algorithm == "aco_tsp":
@@ -1909,6 +1520,8 @@ class OptimizationApp:
                 ("Alpha (α)", str(self.aco_tsp_params["alpha"]), "Importance of pheromone trails"),
                 ("Beta (β)", str(self.aco_tsp_params["beta"]), "Importance of distances"),
                 ("Initial Pheromone", str(self.aco_tsp_params["initial_pheromone"]), "Initial pheromone on all edges"),
+                ("Pheromone Storage", self.aco_tsp_params["pheromone_storage"], "dense (every edge) or sparse (nearest-neighbour edges only, for very large instances)"),
+                ("Colonies", str(self.aco_tsp_params["colonies"]), "Colonies run in parallel processes, sharing their best tour (1 = single colony)"),
             ]
             
         elif algorithm == "ga":
@@ -1920,6 +1533,12 @@ class OptimizationApp:
                 ("Crossover Rate", str(self.ga_params["crossover_rate"]), "Probability of crossover (0-1)"),
                 ("Number of Vehicles", str(self.ga_params["num_vehicles"]), "Number of vehicles for VRP"),
                 ("Selection Method", self.ga_params["selection_method"], "Method to select parents (tournament/roulette)"),
+                ("Crossover Method", self.ga_params["crossover_method"], "How parents are recombined: ox (order crossover) or pmx (partially mapped crossover)"),
+                ("Route Split", self.ga_params["split_method"], "How a chromosome is cut into routes: optimal (cheapest split) or equal (same-size chunks)"),
+                ("Max Stops per Route", str(self.ga_params["max_route_stops"]), "Customer limit per route for the optimal split (0 = 25% above an even share)"),
+                ("Max Route Length", str(self.ga_params["max_route_length"]), "Length limit per route for the optimal split (0 = no limit)"),
+                ("Fitness Cache Size", str(self.ga_params["fitness_cache_size"]), "Chromosomes whose fitness is remembered between generations (0 = off)"),
+                ("Islands", str(self.ga_params["islands"]), "Populations evolved in parallel processes, exchanging their best chromosomes (1 = single population)"),
             ]
             
         elif algorithm == "aco_vrp":
@@ -1932,8 +1551,20 @@ class OptimizationApp:
                 ("Beta (β)", str(self.aco_vrp_params["beta"]), "Importance of distances"),
                 ("Number of Vehicles", str(self.aco_vrp_params["num_vehicles"]), "Number of vehicles for VRP"),
                 ("Initial Pheromone", str(self.aco_vrp_params["initial_pheromone"]), "Initial pheromone on all edges"),
+                ("Pheromone Storage", self.aco_vrp_params["pheromone_storage"], "dense (every edge) or sparse (nearest-neighbour edges only, for very large instances)"),
+                ("Colonies", str(self.aco_vrp_params["colonies"]), "Colonies run in parallel processes, sharing their best tour (1 = single colony)"),
             ]
             
+        # Parameters that take one of a fixed set of values get a dropdown
+        choices = {
+            "Neighbor Generation": list(solvers.NEIGHBORHOODS),
+            "Cooling Schedule": list(solvers.COOLING_SCHEDULES),
+            "Parallel Mode": list(SA_PARALLEL_MODES),
+            "Crossover Method": list(solvers.CROSSOVERS),
+            "Route Split": list(solvers.SPLIT_METHODS),
+            "Pheromone Storage": list(solvers.PHEROMONE_STORAGES),
+        }
+        
         # Display parameters with editable fields
         for param, current_value, description in params:
             tk.Label(scrollable_frame, text=param, font=("Arial", 10, "bold"), anchor="w").grid(
@@ -1943,7 +1574,11 @@ class OptimizationApp:
             param_var = tk.StringVar(value=current_value)
             self.param_vars[param] = param_var
             
-            entry = tk.Entry(scrollable_frame, textvariable=param_var, width=10)
+            if param in choices:
+                entry = ttk.Combobox(scrollable_frame, textvariable=param_var, values=choices[param],
+                                     state="readonly", width=10)
+            else:
+                entry = tk.Entry(scrollable_frame, textvariable=param_var, width=10)
             entry.grid(row=row, column=1, sticky="w", padx=5, pady=5)
             
             # Description on the next row
@@ -1978,7 +1613,13 @@ class OptimizationApp:
                 "temperature": 1000.0,
                 "cooling_rate": 0.9995,
                 "iterations": 100000,
-                "neighbor_method": "swap"
+                "neighbor_method": "swap",
+                "time_limit": 0.0,
+                "stagnation_limit": 0,
+                "cooling_schedule": "geometric",
+                "reheat_after": 0,
+                "parallel_mode": "off",
+                "replicas": 4
             }
         elif algorithm == "aco_tsp":
             default_params = {
@@ -1987,7 +1628,9 @@ class OptimizationApp:
                 "decay": 0.9,
                 "alpha": 1.0,
                 "beta": 3.0,
-                "initial_pheromone": 0.1
+                "initial_pheromone": 0.1,
+                "pheromone_storage": "dense",
+                "colonies": 1
             }
         elif algorithm == "ga":
             default_params = {
@@ -1996,7 +1639,13 @@ class OptimizationApp:
                 "mutation_rate": 0.2,
                 "crossover_rate": 0.8,
                 "num_vehicles": 5,
-                "selection_method": "tournament"
+                "selection_method": "tournament",
+                "crossover_method": "ox",
+                "split_method": "optimal",
+                "max_route_stops": 0,
+                "max_route_length": 0.0,
+                "fitness_cache_size": 4096,
+                "islands": 1
             }
         elif algorithm == "aco_vrp":
             default_params = {
@@ -2006,7 +1655,9 @@ class OptimizationApp:
                 "alpha": 1.0,
                 "beta": 3.0,
                 "num_vehicles": 5,
-                "initial_pheromone": 0.1
+                "initial_pheromone": 0.1,
+                "pheromone_storage": "dense",
+                "colonies": 1
             }
             
         reset_btn = tk.Button(button_frame, text="Reset to Defaults", 
@@ -2023,12 +1674,30 @@ class OptimizationApp:
                     "cooling_rate": float(self.param_vars["Cooling Rate"].get()),
                     "iterations": int(self.param_vars["Iterations"].get()),
                     "neighbor_method": self.param_vars["Neighbor Generation"].get(),
+                    "time_limit": float(self.param_vars["Time Limit (s)"].get()),
+                    "stagnation_limit": int(self.param_vars["Stagnation Limit"].get()),
+                    "cooling_schedule": self.param_vars["Cooling Schedule"].get(),
+                    "reheat_after": int(self.param_vars["Reheat After"].get()),
+                    "parallel_mode": self.param_vars["Parallel Mode"].get(),
+                    "replicas": int(self.param_vars["Replicas"].get()),
                 }
                 # Validate param ranges
                 if not (0 < self.sa_params["cooling_rate"] < 1):
                     raise ValueError("Cooling Rate must be between 0 and 1")
                 if self.sa_params["iterations"] <= 0:
                     raise ValueError("Iterations must be positive")
+                if self.sa_params["neighbor_method"] not in solvers.NEIGHBORHOODS:
+                    raise ValueError("Neighbor Generation must be one of: " + ", ".join(solvers.NEIGHBORHOODS))
+                if self.sa_params["time_limit"] < 0:
+                    raise ValueError("Time Limit cannot be negative")
+                if self.sa_params["stagnation_limit"] < 0 or self.sa_params["reheat_after"] < 0:
+                    raise ValueError("Stagnation Limit and Reheat After cannot be negative")
+                if self.sa_params["cooling_schedule"] not in solvers.COOLING_SCHEDULES:
+                    raise ValueError("Cooling Schedule must be one of: " + ", ".join(solvers.COOLING_SCHEDULES))
+                if self.sa_params["parallel_mode"] not in SA_PARALLEL_MODES:
+                    raise ValueError("Parallel Mode must be one of: " + ", ".join(SA_PARALLEL_MODES))
+                if self.sa_params["replicas"] <= 0:
+                    raise ValueError("Replicas must be positive")
                 
                 # Show confirmation
                 tk.messagebox.showinfo("Parameters Applied", 
@@ -2042,6 +1711,8 @@ class OptimizationApp:
                     "alpha": float(self.param_vars["Alpha (α)"].get()),
                     "beta": float(self.param_vars["Beta (β)"].get()),
                     "initial_pheromone": float(self.param_vars["Initial Pheromone"].get()),
+                    "pheromone_storage": self.param_vars["Pheromone Storage"].get(),
+                    "colonies": int(self.param_vars["Colonies"].get()),
                 }
                 # Validate param ranges
                 if not (0 < self.aco_tsp_params["decay"] < 1):
@@ -2050,6 +1721,10 @@ class OptimizationApp:
                     raise ValueError("Number of Ants must be positive")
                 if self.aco_tsp_params["n_iterations"] <= 0:
                     raise ValueError("Number of Iterations must be positive")
+                if self.aco_tsp_params["colonies"] <= 0:
+                    raise ValueError("Colonies must be positive")
+                if self.aco_tsp_params["pheromone_storage"] not in solvers.PHEROMONE_STORAGES:
+                    raise ValueError("Pheromone Storage must be one of: " + ", ".join(solvers.PHEROMONE_STORAGES))
                 
                 # Show confirmation
                 tk.messagebox.showinfo("Parameters Applied", 
@@ -2063,6 +1738,12 @@ class OptimizationApp:
                     "crossover_rate": float(self.param_vars["Crossover Rate"].get()),
                     "num_vehicles": int(self.param_vars["Number of Vehicles"].get()),
                     "selection_method": self.param_vars["Selection Method"].get(),
+                    "crossover_method": self.param_vars["Crossover Method"].get(),
+                    "split_method": self.param_vars["Route Split"].get(),
+                    "max_route_stops": int(self.param_vars["Max Stops per Route"].get()),
+                    "max_route_length": float(self.param_vars["Max Route Length"].get()),
+                    "fitness_cache_size": int(self.param_vars["Fitness Cache Size"].get()),
+                    "islands": int(self.param_vars["Islands"].get()),
                 }
                 # Validate param ranges
                 if not (0 <= self.ga_params["mutation_rate"] <= 1):
@@ -2075,6 +1756,16 @@ class OptimizationApp:
                     raise ValueError("Number of Generations must be positive")
                 if self.ga_params["num_vehicles"] <= 0:
                     raise ValueError("Number of Vehicles must be positive")
+                if self.ga_params["crossover_method"] not in solvers.CROSSOVERS:
+                    raise ValueError("Crossover Method must be one of: " + ", ".join(solvers.CROSSOVERS))
+                if self.ga_params["split_method"] not in solvers.SPLIT_METHODS:
+                    raise ValueError("Route Split must be one of: " + ", ".join(solvers.SPLIT_METHODS))
+                if self.ga_params["max_route_stops"] < 0 or self.ga_params["max_route_length"] < 0:
+                    raise ValueError("Route limits must be 0 or positive")
+                if self.ga_params["fitness_cache_size"] < 0:
+                    raise ValueError("Fitness Cache Size must be 0 or positive")
+                if self.ga_params["islands"] <= 0:
+                    raise ValueError("Islands must be positive")
                 
                 # Show confirmation
                 tk.messagebox.showinfo("Parameters Applied", 
@@ -2089,6 +1780,8 @@ class OptimizationApp:
                     "beta": float(self.param_vars["Beta (β)"].get()),
                     "num_vehicles": int(self.param_vars["Number of Vehicles"].get()),
                     "initial_pheromone": float(self.param_vars["Initial Pheromone"].get()),
+                    "pheromone_storage": self.param_vars["Pheromone Storage"].get(),
+                    "colonies": int(self.param_vars["Colonies"].get()),
                 }
                 # Validate param ranges
                 if not (0 < self.aco_vrp_params["decay"] < 1):
@@ -2097,6 +1790,10 @@ class OptimizationApp:
                     raise ValueError("Number of Ants must be positive")
                 if self.aco_vrp_params["n_iterations"] <= 0:
                     raise ValueError("Number of Iterations must be positive")
+                if self.aco_vrp_params["colonies"] <= 0:
+                    raise ValueError("Colonies must be positive")
+                if self.aco_vrp_params["pheromone_storage"] not in solvers.PHEROMONE_STORAGES:
+                    raise ValueError("Pheromone Storage must be one of: " + ", ".join(solvers.PHEROMONE_STORAGES))
                 if self.aco_vrp_params["num_vehicles"] <= 0:
                     raise ValueError("Number of Vehicles must be positive")
                 
@@ -2122,6 +1819,12 @@ class OptimizationApp:
             self.param_vars["Cooling Rate"].set(str(default_params["cooling_rate"]))
             self.param_vars["Iterations"].set(str(default_params["iterations"]))
             self.param_vars["Neighbor Generation"].set(default_params["neighbor_method"])
+            self.param_vars["Time Limit (s)"].set(str(default_params["time_limit"]))
+            self.param_vars["Stagnation Limit"].set(str(default_params["stagnation_limit"]))
+            self.param_vars["Cooling Schedule"].set(default_params["cooling_schedule"])
+            self.param_vars["Reheat After"].set(str(default_params["reheat_after"]))
+            self.param_vars["Parallel Mode"].set(default_params["parallel_mode"])
+            self.param_vars["Replicas"].set(str(default_params["replicas"]))
             
         elif algorithm == "aco_tsp":
             self.aco_tsp_params = default_params.copy()
@@ -2133,6 +1836,8 @@ class OptimizationApp:
             self.param_vars["Alpha (α)"].set(str(default_params["alpha"]))
             self.param_vars["Beta (β)"].set(str(default_params["beta"]))
             self.param_vars["Initial Pheromone"].set(str(default_params["initial_pheromone"]))
+            self.param_vars["Pheromone Storage"].set(default_params["pheromone_storage"])
+            self.param_vars["Colonies"].set(str(default_params["colonies"]))
             
         elif algorithm == "ga":
             self.ga_params = default_params.copy()
@@ -2144,6 +1849,12 @@ class OptimizationApp:
             self.param_vars["Crossover Rate"].set(str(default_params["crossover_rate"]))
             self.param_vars["Number of Vehicles"].set(str(default_params["num_vehicles"]))
             self.param_vars["Selection Method"].set(default_params["selection_method"])
+            self.param_vars["Crossover Method"].set(default_params["crossover_method"])
+            self.param_vars["Route Split"].set(default_params["split_method"])
+            self.param_vars["Max Stops per Route"].set(str(default_params["max_route_stops"]))
+            self.param_vars["Max Route Length"].set(str(default_params["max_route_length"]))
+            self.param_vars["Fitness Cache Size"].set(str(default_params["fitness_cache_size"]))
+            self.param_vars["Islands"].set(str(default_params["islands"]))
             
         elif algorithm == "aco_vrp":
             self.aco_vrp_params = default_params.copy()
@@ -2156,14 +1867,19 @@ class OptimizationApp:
             self.param_vars["Beta (β)"].set(str(default_params["beta"]))
             self.param_vars["Number of Vehicles"].set(str(default_params["num_vehicles"]))
             self.param_vars["Initial Pheromone"].set(str(default_params["initial_pheromone"]))
+            self.param_vars["Pheromone Storage"].set(default_params["pheromone_storage"])
+            self.param_vars["Colonies"].set(str(default_params["colonies"]))
         
         # Show confirmation
         tk.messagebox.showinfo("Parameters Reset", "Parameters have been reset to default values")
 
 def main():
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
     root = tk.Tk()
     app = OptimizationApp(root)
     root.mainloop()
 
 if __name__ == "__main__":
+    # Lets process-pool workers start from a PyInstaller --onefile executable on Windows
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file